@@ -0,0 +1,41 @@
+"""Persisted rating aggregate
+
+Revision ID: 5c0e7d9a41f2
+Revises: 104a3cc11ae8
+Create Date: 2026-10-18 11:03:27.914406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e7d9a41f2'
+down_revision: Union[str, None] = '104a3cc11ae8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('psychologists', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('psychologists', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('psychologists', sa.Column('rating', sa.Float(), server_default='0', nullable=False))
+    # заполняем агрегат по уже существующим отзывам
+    op.execute("""
+        UPDATE psychologists SET
+            rating_sum = COALESCE((SELECT SUM(rating) FROM reviews WHERE reviews.psychologist_id = psychologists.id), 0),
+            rating_count = (SELECT COUNT(id) FROM reviews WHERE reviews.psychologist_id = psychologists.id),
+            rating = COALESCE((SELECT AVG(rating) FROM reviews WHERE reviews.psychologist_id = psychologists.id), 0)
+    """)
+    op.create_index('ix_psychologists_rating_id', 'psychologists', ['rating', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_psychologists_rating_id', table_name='psychologists')
+    op.drop_column('psychologists', 'rating')
+    op.drop_column('psychologists', 'rating_count')
+    op.drop_column('psychologists', 'rating_sum')
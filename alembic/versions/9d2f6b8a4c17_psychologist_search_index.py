@@ -0,0 +1,64 @@
+"""Psychologist search index
+
+Revision ID: 9d2f6b8a4c17
+Revises: e4a8c2f17d35
+Create Date: 2026-10-18 21:58:12.306941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2f6b8a4c17'
+down_revision: Union[str, None] = 'e4a8c2f17d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# части документа: имя, названия и описания специализаций, био (как в app/services/search.py)
+TOPICS = """(SELECT {agg}(s.name, ' ') FROM psychologist_specializations ps
+             JOIN specializations s ON s.id = ps.specialization_id WHERE ps.psychologist_id = p.id)"""
+DETAILS = """(SELECT {agg}(COALESCE(s.description, ''), ' ') FROM psychologist_specializations ps
+              JOIN specializations s ON s.id = ps.specialization_id WHERE ps.psychologist_id = p.id)"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_table(
+            'psychologist_search',
+            sa.Column('psychologist_id', sa.Integer(), nullable=False),
+            sa.Column('document', sa.dialects.postgresql.TSVECTOR(), nullable=False),
+            sa.PrimaryKeyConstraint('psychologist_id'),
+        )
+        op.create_index('ix_psychologist_search_document', 'psychologist_search', ['document'], unique=False, postgresql_using='gin')
+        topics, details = TOPICS.format(agg='string_agg'), DETAILS.format(agg='string_agg')
+        op.execute(f"""
+            INSERT INTO psychologist_search (psychologist_id, document)
+            SELECT p.id,
+                setweight(to_tsvector('russian', COALESCE(u.full_name, '')), 'A')
+                || setweight(to_tsvector('russian', COALESCE({topics}, '')), 'B')
+                || setweight(to_tsvector('russian', COALESCE(p.bio, '')), 'C')
+                || setweight(to_tsvector('russian', COALESCE({details}, '')), 'D')
+            FROM psychologists p JOIN users u ON u.id = p.user_id
+        """)
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE psychologist_search "
+            "USING fts5(name, topics, bio, details, tokenize='unicode61 remove_diacritics 2')"
+        )
+        topics, details = TOPICS.format(agg='group_concat'), DETAILS.format(agg='group_concat')
+        op.execute(f"""
+            INSERT INTO psychologist_search (rowid, name, topics, bio, details)
+            SELECT p.id, u.full_name, COALESCE({topics}, ''), COALESCE(p.bio, ''), COALESCE({details}, '')
+            FROM psychologists p JOIN users u ON u.id = p.user_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_psychologist_search_document', table_name='psychologist_search', postgresql_using='gin')
+    op.drop_table('psychologist_search')
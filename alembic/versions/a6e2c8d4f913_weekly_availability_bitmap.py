@@ -0,0 +1,73 @@
+"""Weekly availability bitmap
+
+Revision ID: a6e2c8d4f913
+Revises: f1b7d3a9c605
+Create Date: 2026-10-18 23:48:30.517204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e2c8d4f913'
+down_revision: Union[str, None] = 'f1b7d3a9c605'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# формат карты — как в app/services/weekly_availability.py на момент миграции:
+# 672 слота по 15 минут, слот i — бит i % 8 байта i // 8, слот входит, только если отработан целиком
+SLOT_MINUTES = 15
+DAY_SLOTS = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * DAY_SLOTS
+
+schedule = sa.table(
+    'schedule',
+    sa.column('psychologist_id', sa.Integer()), sa.column('day_of_week', sa.Integer()),
+    sa.column('start_time', sa.Time()), sa.column('end_time', sa.Time()),
+)
+psychologists = sa.table('psychologists', sa.column('id', sa.Integer()), sa.column('availability', sa.LargeBinary()))
+
+
+def encode_week(rules) -> bytes | None:
+    bits = 0
+    for day_of_week, start, end in rules:
+        first = day_of_week * DAY_SLOTS - (-(start.hour * 60 + start.minute) // SLOT_MINUTES)
+        last = day_of_week * DAY_SLOTS + (end.hour * 60 + end.minute) // SLOT_MINUTES
+        if end <= start:  # через полночь
+            last += DAY_SLOTS
+        if first < last:
+            bits |= ((1 << (last - first)) - 1) << first
+    # ночь с воскресенья на понедельник переносится в начало недели
+    bits = (bits | bits >> WEEK_SLOTS) & ((1 << WEEK_SLOTS) - 1)
+    return bits.to_bytes(WEEK_SLOTS // 8, 'little') if bits else None
+
+
+def backfill(bind) -> None:
+    rules: dict[int, list] = {}
+    for psychologist_id, day_of_week, start, end in bind.execute(
+        sa.select(schedule.c.psychologist_id, schedule.c.day_of_week, schedule.c.start_time, schedule.c.end_time)
+    ):
+        rules.setdefault(psychologist_id, []).append((day_of_week, start, end))
+    # у психологов без расписания карта остаётся NULL — пустая неделя
+    maps = [{'psychologist_id': psychologist_id, 'week': encode_week(own)} for psychologist_id, own in rules.items()]
+    if maps:
+        bind.execute(
+            psychologists.update()
+            .where(psychologists.c.id == sa.bindparam('psychologist_id'))
+            .values(availability=sa.bindparam('week')),
+            maps,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('psychologists', sa.Column('availability', sa.LargeBinary(), nullable=True))
+    backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('psychologists', 'availability')
@@ -0,0 +1,32 @@
+"""Appointment updated_at
+
+Revision ID: e4a8c2f17d35
+Revises: 7b1c5d3e9f20
+Create Date: 2026-10-18 20:26:51.174593
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8c2f17d35'
+down_revision: Union[str, None] = '7b1c5d3e9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('appointments', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # существующим записям — время миграции: первая выдача ленты будет полной
+    op.execute("UPDATE appointments SET updated_at = CURRENT_TIMESTAMP")
+    with op.batch_alter_table('appointments') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('appointments', 'updated_at')
@@ -0,0 +1,89 @@
+"""Review histogram, time-decayed rating and review listing indexes
+
+Revision ID: f1b7d3a9c605
+Revises: 9d2f6b8a4c17
+Create Date: 2026-10-18 23:12:45.208113
+
+"""
+import math
+import os
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d3a9c605'
+down_revision: Union[str, None] = '9d2f6b8a4c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RATINGS = range(1, 6)
+# веса — как в app/services/ratings.py на момент миграции: exp(DECAY_RATE * (created_at - DECAY_EPOCH))
+DECAY_RATE = math.log(2) / (float(os.getenv('REVIEW_HALF_LIFE_DAYS', '180')) * 86400)
+DECAY_EPOCH = datetime(2024, 1, 1)
+STATS = (*(f'rating_count_{rating}' for rating in RATINGS), 'decayed_weight_sum', 'decayed_rating_sum')
+
+reviews = sa.table(
+    'reviews',
+    sa.column('psychologist_id', sa.Integer()), sa.column('rating', sa.Integer()), sa.column('created_at', sa.DateTime()),
+)
+psychologists = sa.table(
+    'psychologists',
+    sa.column('id', sa.Integer()),
+    *(sa.column(f'rating_count_{rating}', sa.Integer()) for rating in RATINGS),
+    sa.column('decayed_weight_sum', sa.Float()), sa.column('decayed_rating_sum', sa.Float()),
+)
+
+
+def backfill(bind) -> None:
+    """Гистограмма и суммы с затуханием одним проходом по отзывам; exp() от времени в SQL у SQLite и Postgres разный."""
+    stats: dict[int, dict] = {}
+    rows = bind.execution_options(stream_results=True).execute(
+        sa.select(reviews.c.psychologist_id, reviews.c.rating, reviews.c.created_at)
+    )
+    for psychologist_id, rating, created_at in rows:
+        if rating not in RATINGS:  # до этой миграции оценка не проверялась; в гистограмму такие не попадают
+            continue
+        row = stats.setdefault(psychologist_id, dict.fromkeys(STATS, 0))
+        weight = math.exp(DECAY_RATE * (created_at - DECAY_EPOCH).total_seconds())
+        row[f'rating_count_{rating}'] += 1
+        row['decayed_weight_sum'] += weight
+        row['decayed_rating_sum'] += rating * weight
+    if stats:
+        bind.execute(
+            psychologists.update()
+            .where(psychologists.c.id == sa.bindparam('psychologist_id'))
+            .values({column: sa.bindparam(f'new_{column}') for column in STATS}),
+            [
+                {'psychologist_id': psychologist_id, **{f'new_{column}': value for column, value in row.items()}}
+                for psychologist_id, row in stats.items()
+            ],
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for rating in RATINGS:
+        op.add_column('psychologists', sa.Column(f'rating_count_{rating}', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('psychologists', sa.Column('decayed_weight_sum', sa.Float(), server_default='0', nullable=False))
+    op.add_column('psychologists', sa.Column('decayed_rating_sum', sa.Float(), server_default='0', nullable=False))
+    backfill(op.get_bind())
+
+    op.create_index('ix_reviews_psychologist_id_created_at', 'reviews', ['psychologist_id', 'created_at'], unique=False)
+    op.create_index('ix_reviews_psychologist_id_rating_created_at', 'reviews', ['psychologist_id', 'rating', 'created_at'], unique=False)
+    # покрывается префиксом новых индексов
+    op.drop_index(op.f('ix_reviews_psychologist_id'), table_name='reviews')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_reviews_psychologist_id'), 'reviews', ['psychologist_id'], unique=False)
+    op.drop_index('ix_reviews_psychologist_id_rating_created_at', table_name='reviews')
+    op.drop_index('ix_reviews_psychologist_id_created_at', table_name='reviews')
+    op.drop_column('psychologists', 'decayed_rating_sum')
+    op.drop_column('psychologists', 'decayed_weight_sum')
+    for rating in reversed(RATINGS):
+        op.drop_column('psychologists', f'rating_count_{rating}')
@@ -1,102 +1,283 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import hashlib
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, exists, literal, func, tuple_
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_time_cursor
+from app.core.response_cache import etag_matches
 from app.models.appointment import Appointment
-from app.models.user import User
 from app.models.psychologist import Psychologist
-from app.schemas.appointment import AppointmentCreate, AppointmentRead
+from app.models.user import User
+from app.schemas.appointment import (
+    AppointmentCreate, AppointmentRead, AppointmentStatusBatch, AppointmentStatusResult, MAX_APPOINTMENT_DURATION,
+    AppointmentPage, AppointmentDayCount, AppointmentView, CalendarFeedToken
+)
 from app.schemas.enums import AppointmentStatus
-from app.core.security import get_current_user
+from app.api.user import get_current_principal, load_principal
+from app.core.security import Principal, create_jwt_token, decode_jwt_claims
+from app.models.schedule import Schedule
+from app.services.appointments import MAX_CALENDAR_RANGE, appointments_filter, can_transition, change_statuses, resolve_view
+from app.services.availability import fits_schedule, to_naive_utc
+from app.services.icalendar import calendar, event
+
+CALENDAR_SCOPE = "calendar"
+# в ленте — все будущие записи и прошедшие не старше CALENDAR_FEED_HISTORY_DAYS
+CALENDAR_FEED_HISTORY = timedelta(days=int(os.getenv("CALENDAR_FEED_HISTORY_DAYS", "90")))
+CALENDAR_FEED_YIELD_PER = 500
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
 # только клиент 
 @router.post("/", response_model=AppointmentRead)
-def create_appointment(
+async def create_appointment(
     appointment_data: AppointmentCreate, 
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
 ) -> AppointmentRead:
     
-    # проверка на существование психолога
-    psychologist = db.query(Psychologist).filter(Psychologist.id == appointment_data.psychologist_id).first()
+    # проверка на существование психолога; блокировка строки (Postgres)
+    # выстраивает конкурирующие брони к одному психологу в очередь
+    psychologist = await db.scalar(
+        select(Psychologist)
+        .where(Psychologist.id == appointment_data.psychologist_id)
+        .with_for_update()
+    )
     if not psychologist:
         raise HTTPException(status_code=404, detail="Психолог не найден")
 
-    # Создаём запись
-    new_appointment = Appointment(
-        client_id=user.id,  # Берём ID текущего клиента
-        psychologist_id=appointment_data.psychologist_id,
-        start_time=appointment_data.start_time,
-        end_time=appointment_data.end_time,
-        price=appointment_data.price,
-        status=AppointmentStatus.pending  # По умолчанию "ожидание"
+    # запись должна целиком попадать в рабочее время психолога
+    rules = (await db.execute(
+        select(Schedule.day_of_week, Schedule.start_time, Schedule.end_time)
+        .where(Schedule.psychologist_id == appointment_data.psychologist_id)
+    )).all()
+    start_time = to_naive_utc(appointment_data.start_time)
+    end_time = to_naive_utc(appointment_data.end_time)
+    if not fits_schedule(rules, start_time, end_time):
+        raise HTTPException(status_code=400, detail="Психолог не работает в это время")
+
+    # активные записи, пересекающиеся с [start_time, end_time); нижняя граница по start_time
+    # держит поиск по индексу (psychologist_id, start_time, end_time) в узком диапазоне
+    overlap = exists().where(
+        Appointment.psychologist_id == psychologist.id,
+        Appointment.status != AppointmentStatus.canceled,
+        Appointment.start_time > start_time - MAX_APPOINTMENT_DURATION,
+        Appointment.start_time < end_time,
+        Appointment.end_time > start_time,
+    )
+
+    # Создаём запись (по умолчанию "ожидание") только если время свободно:
+    # INSERT ... SELECT ... WHERE NOT EXISTS — одна атомарная операция, без окна между проверкой и вставкой
+    values = {
+        "client_id": principal.id,  # Берём ID текущего клиента
+        "psychologist_id": psychologist.id,
+        "start_time": start_time,
+        "end_time": end_time,
+        "price": appointment_data.price,
+        "status": AppointmentStatus.pending,
+    }
+    columns = Appointment.__table__.c
+    new_id = (await db.execute(
+        insert(Appointment)
+        .from_select(
+            list(values),
+            select(*[literal(value, columns[name].type) for name, value in values.items()]).where(~overlap),
+        )
+        .returning(Appointment.id)
+    )).scalar_one_or_none()
+    if new_id is None:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Это время уже занято")
+
+    await db.commit()
+    # ORM-объект отдаём как есть: FastAPI провалидирует и сериализует его один раз по response_model
+    return await db.get(Appointment, new_id)
+
+# список и календарь объявлены до /{appointment_id}, иначе "calendar" разбирался бы как id
+@router.get("/", response_model=AppointmentPage)
+async def list_appointments(
+    start: Optional[datetime] = Query(None, alias="from", description="Начало записи не раньше"),
+    end: Optional[datetime] = Query(None, alias="to", description="Начало записи раньше"),
+    status: Optional[List[AppointmentStatus]] = Query(None),
+    view: Optional[AppointmentView] = Query(None, description="По умолчанию — psychologist, если есть профиль психолога"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+) -> dict:
+    """Свои записи по времени начала, keyset-пагинация по (start_time, id)"""
+    query = select(Appointment).where(*appointments_filter(principal, view, start, end, status))
+    if cursor:
+        query = query.where(tuple_(Appointment.start_time, Appointment.id) > decode_time_cursor(cursor))
+    rows = (await db.scalars(query.order_by(Appointment.start_time, Appointment.id).limit(limit + 1))).all()
+
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1].start_time, items[-1].id) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/calendar", response_model=list[AppointmentDayCount])
+async def appointment_calendar(
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    status: Optional[List[AppointmentStatus]] = Query(None),
+    view: Optional[AppointmentView] = None,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+) -> list[dict]:
+    """Число записей по дням (UTC) и статусам — для сетки календаря; дни без записей не возвращаются"""
+    if to_naive_utc(end) - to_naive_utc(start) > MAX_CALENDAR_RANGE:
+        raise HTTPException(status_code=400, detail=f"Период не длиннее {MAX_CALENDAR_RANGE.days} дней")
+    day = func.date(Appointment.start_time).label("day")
+    rows = await db.execute(
+        select(day, Appointment.status, func.count().label("count"))
+        .where(*appointments_filter(principal, view, start, end, status))
+        .group_by(day, Appointment.status)
+        .order_by(day)
     )
+    days: dict = {}
+    for row in rows:
+        counts = days.setdefault(row.day, {"day": row.day, "total": 0})
+        counts[row.status.value] = row.count
+        counts["total"] += row.count
+    return list(days.values())
 
-    db.add(new_appointment)
-    db.commit()
-    db.refresh(new_appointment)
-    return AppointmentRead.model_validate(new_appointment)
+@router.post("/calendar/token", response_model=CalendarFeedToken)
+async def create_calendar_token(
+    request: Request,
+    view: Optional[AppointmentView] = None,
+    principal: Principal = Depends(get_current_principal)
+) -> dict:
+    """Ссылка на ленту .ics для подписки во внешнем календаре; отзывается вместе с остальными токенами пользователя"""
+    resolve_view(principal, view)  # 403 сразу, а не при первом опросе ленты
+    token = create_jwt_token(principal.id, scope=CALENDAR_SCOPE)
+    url = request.url_for("appointment_feed").include_query_params(token=token, **({"view": view} if view else {}))
+    return {"token": token, "url": str(url)}
+
+@router.get("/calendar.ics", name="appointment_feed", response_class=StreamingResponse)
+async def appointment_feed(
+    request: Request,
+    token: str = Query(..., description="Токен из POST /appointments/calendar/token"),
+    view: Optional[AppointmentView] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Лента iCalendar; ETag — по последнему изменению и числу записей, поэтому опросы без изменений получают 304"""
+    principal = await load_principal(db, decode_jwt_claims(token, scope=CALENDAR_SCOPE))
+    view = resolve_view(principal, view)
+    conditions = appointments_filter(principal, view, start=datetime.utcnow() - CALENDAR_FEED_HISTORY)
+
+    # удаление записи не сдвигает max(updated_at), но меняет count
+    last_change, count = (await db.execute(
+        select(func.max(Appointment.updated_at), func.count()).where(*conditions)
+    )).one()
+    key = f"{principal.id}:{principal.psychologist_id}:{view}:{last_change}:{count}"
+    headers = {"ETag": f'"{hashlib.sha1(key.encode()).hexdigest()}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    counterpart = aliased(User)
+    query = select(
+        Appointment.id, Appointment.start_time, Appointment.end_time, Appointment.status, Appointment.updated_at,
+        counterpart.full_name,
+    )
+    if view == "psychologist":
+        query, summary = query.join(counterpart, counterpart.id == Appointment.client_id), "Консультация: {}"
+    else:
+        query = query.join(Psychologist, Psychologist.id == Appointment.psychologist_id).join(counterpart, counterpart.id == Psychologist.user_id)
+        summary = "Консультация у психолога: {}"
+    # серверный курсор: строки читаются пачками по мере отправки, документ целиком в памяти не собирается
+    rows = await db.stream(
+        query.where(*conditions).order_by(Appointment.start_time, Appointment.id)
+        .execution_options(yield_per=CALENDAR_FEED_YIELD_PER)
+    )
+
+    async def events():
+        async for row in rows:
+            yield event(row.id, row.start_time, row.end_time, row.status, row.updated_at, summary.format(row.full_name))
+
+    return StreamingResponse(
+        calendar("Записи к психологу", events()),
+        media_type="text/calendar; charset=utf-8",
+        headers={**headers, "Content-Disposition": 'inline; filename="appointments.ics"'},
+    )
+
+# пакетная смена статуса (только психолог)
+@router.patch("/status", response_model=list[AppointmentStatusResult])
+async def update_appointment_statuses(
+    batch: AppointmentStatusBatch,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+) -> list[AppointmentStatusResult]:
+    """Психолог меняет статус многих записей за один запрос; итог — по каждому id"""
+    results = await change_statuses(db, principal.psychologist_id, batch.ids, batch.status)
+    await db.commit()
+    return results
 
 # получение одной записи (клиент или психолог)
 @router.get("/{appointment_id}", response_model=AppointmentRead)
-def get_appointment(
+async def get_appointment(
     appointment_id: int, 
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
 ) -> AppointmentRead:
     """Клиент или психолог могут получить только свои записи"""
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
 
     if not appointment:
         raise HTTPException(status_code=404, detail="Запись не найдена")
 
     # Проверяем доступ (или клиент, или психолог)
-    if appointment.client_id != user.id and (not user.psychologist or appointment.psychologist_id != user.psychologist.id):
+    if appointment.client_id != principal.id and appointment.psychologist_id != principal.psychologist_id:
         raise HTTPException(status_code=403, detail="Нет доступа к этой записи")
 
-    return AppointmentRead.model_validate(appointment)
+    return appointment
 
 # Обновление статуса записи (только психолог)
 @router.patch("/{appointment_id}/status", response_model=AppointmentRead)
-def update_appointment_status(
+async def update_appointment_status(
     appointment_id: int, 
     status: AppointmentStatus, 
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
 )-> AppointmentRead:
     """Психолог меняет статус записи"""
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
 
     if not appointment:
         raise HTTPException(status_code=404, detail="Запись не найдена")
 
     # является ли пользователь психологом
-    if not user.psychologist or appointment.psychologist_id != user.psychologist.id:
+    if appointment.psychologist_id != principal.psychologist_id:
         raise HTTPException(status_code=403, detail="Вы не можете менять статус этой записи")
 
+    # те же переходы, что и в пакетном PATCH /appointments/status
+    if not can_transition(appointment.status, status):
+        raise HTTPException(status_code=409, detail=f"Нельзя перевести запись из {appointment.status.value} в {status.value}")
+
     appointment.status = status
-    db.commit()
-    db.refresh(appointment)
-    return AppointmentRead.model_validate(appointment)
+    await db.commit()
+    return appointment
 
 ### Удаление записи (только клиент или психолог)
 @router.delete("/{appointment_id}")
-def delete_appointment(
+async def delete_appointment(
     appointment_id: int, 
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
 ):
     """Клиент может отменить запись, психолог может удалить запись"""
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    appointment = await db.get(Appointment, appointment_id)
 
     if not appointment:
         raise HTTPException(status_code=404, detail="Запись не найдена")
 
     # Только клиент или психолог может удалить запись
-    if appointment.client_id != user.id and (not user.psychologist or appointment.psychologist_id != user.psychologist.id):
+    if appointment.client_id != principal.id and appointment.psychologist_id != principal.psychologist_id:
         raise HTTPException(status_code=403, detail="Вы не можете удалить эту запись")
 
-    db.delete(appointment)
-    db.commit()
+    await db.delete(appointment)
+    await db.commit()
     return {"message": "Запись успешно удалена"}
@@ -1,41 +1,169 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime, timezone
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import select, union_all, tuple_, func
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from app.core.broker import broker
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_time_cursor
+from app.core.serialization import projection
 from app.models.chat import Chat
-from app.schemas.chat import ChatCreate, ChatRead
-from app.core.security import get_current_user
+from app.schemas.chat import ChatCreate, ChatRead, ChatPage, ConversationPage
+from app.core.security import get_current_user, decode_jwt_token
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+def chat_channel(user_id: int) -> str:
+    return f"chat:{user_id}"
+
 @router.post("/", response_model=ChatRead)
-def send_message(
+async def send_message(
     chat_data: ChatCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     sender_id: int = Depends(get_current_user)
-) -> ChatRead:
+) -> Response:
     new_message = Chat(
         sender_id=sender_id,  # из токена
         receiver_id=chat_data.receiver_id,
         message=chat_data.message,
-        sent_at=datetime.now(timezone.utc)
+        sent_at=datetime.utcnow()  # колонка без часового пояса, храним UTC
     )
     db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
-    return ChatRead.model_validate(new_message)
+    await db.commit()
+    await db.refresh(new_message)
+    # один и тот же JSON уходит и в ответ, и подписчикам
+    body = ChatRead.model_validate(new_message).model_dump_json()
+    # только после commit: получатель не должен увидеть сообщение, которого нет в истории
+    await broker.publish(chat_channel(new_message.receiver_id), body)
+    return Response(content=body, media_type="application/json")
 
-@router.get("/", response_model=list[ChatRead])
-def get_user_messages(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=ChatPage)
+async def get_user_messages(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     user_id: int = Depends(get_current_user)
-) -> List[ChatRead]:
-    messages = db.query(Chat).filter(
-        (Chat.sender_id == user_id) | (Chat.receiver_id == user_id)
-    ).all()
-    
-    if not messages:
+) -> dict:
+    """Все сообщения пользователя от новых к старым, keyset по (sent_at, id)."""
+    after = decode_time_cursor(cursor) if cursor else None
+
+    def side(*conditions):
+        # отправленные и полученные ограничиваются по отдельности, как в get_conversation
+        query = select(*projection(Chat, ChatRead)).where(*conditions)
+        if after:
+            query = query.where(tuple_(Chat.sent_at, Chat.id) < after)
+        return query.order_by(Chat.sent_at.desc(), Chat.id.desc()).limit(limit + 1).subquery()
+
+    # сообщение самому себе — только в отправленных
+    sent, received = side(Chat.sender_id == user_id), side(Chat.receiver_id == user_id, Chat.sender_id != user_id)
+    merged = union_all(select(sent), select(received)).subquery()
+    messages = (await db.execute(
+        select(merged).order_by(merged.c.sent_at.desc(), merged.c.id.desc()).limit(limit + 1)
+    )).all()
+
+    if not messages and not cursor:
         raise HTTPException(status_code=404, detail="Сообщения не найдены")
 
-    return [ChatRead.model_validate(msg) for msg in messages]
+    items = messages[:limit]
+    next_cursor = None
+    if len(messages) > limit:
+        next_cursor = encode_cursor(items[-1].sent_at, items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/conversations", response_model=ConversationPage)
+async def get_conversations(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user)
+) -> dict:
+    """Собеседники с последним сообщением, от свежих диалогов к старым."""
+    outgoing = select(Chat.id, Chat.receiver_id.label("counterpart_id"), Chat.sent_at).where(Chat.sender_id == user_id)
+    incoming = select(Chat.id, Chat.sender_id.label("counterpart_id"), Chat.sent_at).where(Chat.receiver_id == user_id)
+    messages = union_all(outgoing, incoming).subquery()
+    ranked = select(
+        messages.c.id,
+        messages.c.counterpart_id,
+        func.row_number().over(
+            partition_by=messages.c.counterpart_id,
+            order_by=(messages.c.sent_at.desc(), messages.c.id.desc()),
+        ).label("position"),
+    ).subquery()
+
+    query = (
+        select(ranked.c.counterpart_id, Chat)
+        .join(Chat, Chat.id == ranked.c.id)
+        .where(ranked.c.position == 1)
+    )
+    if cursor:
+        query = query.where(tuple_(Chat.sent_at, Chat.id) < decode_time_cursor(cursor))
+    rows = (await db.execute(query.order_by(Chat.sent_at.desc(), Chat.id.desc()).limit(limit + 1))).all()
+
+    items = [{"counterpart_id": counterpart_id, "last_message": message} for counterpart_id, message in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]["last_message"]
+        next_cursor = encode_cursor(last.sent_at, last.id)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/conversations/{counterpart_id}", response_model=ChatPage)
+async def get_conversation(
+    counterpart_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user)
+) -> dict:
+    """Переписка с собеседником от новых сообщений к старым, keyset по (sent_at, id)."""
+    after = decode_time_cursor(cursor) if cursor else None
+
+    def direction(sender_id: int, receiver_id: int):
+        # каждая сторона читается своим индексом (sender_id, receiver_id, sent_at, id) и уже ограничена
+        query = select(Chat).where(Chat.sender_id == sender_id, Chat.receiver_id == receiver_id)
+        if after:
+            query = query.where(tuple_(Chat.sent_at, Chat.id) < after)
+        return query.order_by(Chat.sent_at.desc(), Chat.id.desc()).limit(limit + 1).subquery()
+
+    branches = [direction(user_id, counterpart_id)]
+    if counterpart_id != user_id:
+        branches.append(direction(counterpart_id, user_id))
+    merged = aliased(Chat, union_all(*[select(branch) for branch in branches]).subquery())
+    messages = (await db.scalars(
+        select(merged).order_by(merged.sent_at.desc(), merged.id.desc()).limit(limit + 1)
+    )).all()
+
+    items = messages[:limit]
+    next_cursor = None
+    if len(messages) > limit:
+        next_cursor = encode_cursor(items[-1].sent_at, items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
+
+async def _forward(websocket: WebSocket, subscription) -> None:
+    async for message in subscription:
+        await websocket.send_text(message)
+    # очередь переполнилась: клиент отстал, пусть переподключится и дочитает историю
+    await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+@router.websocket("/ws")
+async def chat_updates(websocket: WebSocket, token: str = Query(...)):
+    """Новые входящие сообщения в реальном времени. Токен — тот же JWT, в параметре ?token=."""
+    try:
+        user_id = decode_jwt_token(token)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail)
+        return
+
+    await websocket.accept()
+    async with broker.subscribe(chat_channel(user_id)) as subscription:
+        forwarder = asyncio.create_task(_forward(websocket, subscription))
+        try:
+            # от клиента ничего не ждём, чтение нужно только чтобы заметить отключение
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            forwarder.cancel()
+            await asyncio.gather(forwarder, return_exceptions=True)
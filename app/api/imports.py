@@ -0,0 +1,42 @@
+import os
+from typing import Any
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.schemas.imports import ImportKind, ImportReport
+from app.services.bulk_import import csv_records, from_items, import_records, ndjson_records
+
+# больше — через /import/{kind}/stream: JSON-массив целиком разбирается в памяти
+IMPORT_BATCH_LIMIT = int(os.getenv("IMPORT_BATCH_LIMIT", "10000"))
+
+STREAM_FORMATS = {
+    "text/csv": csv_records,
+    "application/x-ndjson": ndjson_records,
+    "application/jsonl": ndjson_records,
+}
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+@router.post("/{kind}", response_model=ImportReport)
+async def import_batch(
+    kind: ImportKind,
+    items: list[Any] = Body(..., max_length=IMPORT_BATCH_LIMIT),
+    db: AsyncSession = Depends(get_db),
+) -> ImportReport:
+    """Пакет строк JSON-массивом; ошибочные строки попадают в отчёт, остальные импортируются."""
+    return await import_records(db, kind, from_items(items))
+
+@router.post(
+    "/{kind}/stream",
+    response_model=ImportReport,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        media_type: {"schema": {"type": "string"}} for media_type in STREAM_FORMATS
+    }}},
+)
+async def import_stream(kind: ImportKind, request: Request, db: AsyncSession = Depends(get_db)) -> ImportReport:
+    """CSV с заголовком (колонки — поля схемы, специализации через «;») или NDJSON; тело читается потоком."""
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parse = STREAM_FORMATS.get(media_type)
+    if parse is None:
+        raise HTTPException(status_code=415, detail=f"Ожидается Content-Type: {', '.join(STREAM_FORMATS)}")
+    return await import_records(db, kind, parse(request.stream()))
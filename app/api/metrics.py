@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from app.core.broker import broker
+from app.core.cache import cache_stats
+from app.core.metrics import route_metrics
+from app.core.response_cache import response_cache
+from app.core.security import get_current_user
+from app.core.serialization import FastJSONResponse
+from app.services.read_model import catalog
+from app.services.recommendations import recommendations
+
+# подключается только при METRICS_ENABLED (app/main.py) и только с токеном
+router = APIRouter(prefix="/metrics", tags=["Metrics"], dependencies=[Depends(get_current_user)])
+
+@router.get("/", response_class=FastJSONResponse)
+async def get_metrics() -> dict:
+    """Сводка по маршрутам (запросы к БД, время, ожидание пула, медленные запросы), кэшам, брокеру чата, модели чтения каталога и матрице рекомендаций."""
+    return {
+        **route_metrics.snapshot(),
+        "caches": cache_stats(),
+        "response_cache": response_cache.stats(),
+        "broker": broker.stats(),
+        "read_model": catalog.stats(),
+        "recommendations": recommendations.stats(),
+    }
+
+@router.delete("/")
+async def reset_metrics() -> dict:
+    route_metrics.reset()
+    return {"message": "Метрики сброшены"}
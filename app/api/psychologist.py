@@ -1,76 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.response_cache import response_cache
+from app.core.security import invalidate_principal
 from app.models.psychologist import Psychologist
+from app.models.schedule import Schedule
+from app.models.appointment import Appointment
 from app.models.specialization import Specialization
-from app.schemas.psychologist import PsychologistCreate, PsychologistRead
+from app.schemas.psychologist import PsychologistCreate, PsychologistRead, PsychologistPage, PsychologistRecommendation
+from app.schemas.schedule import SlotRead
+from app.schemas.enums import AppointmentStatus
+from app.services.availability import free_slots, to_naive_utc
+from app.services.catalog_cache import PSYCHOLOGIST, invalidate_psychologist
+from app.services.psychologists import CatalogSort, load_profile, psychologist_page
+from app.services.recommendations import RecommendationQuery, recommendations
+from app.services.search import reindex_psychologists, search_page
+from app.services.weekly_availability import available_page
+
+MAX_SLOTS_RANGE = timedelta(days=62)
 
 router = APIRouter(prefix="/psychologists", tags=["Psychologists"])
 
+async def _load_specializations(db: AsyncSession, specialization_ids: list[int]) -> list[Specialization]:
+    return list(await db.scalars(select(Specialization).where(Specialization.id.in_(specialization_ids))))
+
 @router.post("/", response_model=PsychologistRead)
-def create_psychologist(psychologist_data: PsychologistCreate, db: Session = Depends(get_db)) -> PsychologistRead:
+async def create_psychologist(psychologist_data: PsychologistCreate, db: AsyncSession = Depends(get_db)) -> PsychologistRead:
+    specializations = []
+    if psychologist_data.specialization_ids:
+        specializations = await _load_specializations(db, psychologist_data.specialization_ids)
+        if not specializations:
+            raise HTTPException(status_code=400, detail="какие-то специализации не найдены")
 
     new_psychologist = Psychologist(
         user_id=psychologist_data.user_id,
         experience=psychologist_data.experience,
         bio=psychologist_data.bio,
-        price_per_hour=psychologist_data.price_per_hour
+        price_per_hour=psychologist_data.price_per_hour,
+        specializations=specializations,
     )
     db.add(new_psychologist)
-    db.commit()
-    db.refresh(new_psychologist)
-    if psychologist_data.specialization_ids:
-        specializations = db.query(Specialization).filter(
-            Specialization.id.in_(psychologist_data.specialization_ids)
-        ).all()
-        if not specializations:
-            raise HTTPException(status_code=400, detail="какие-то специализации не найдены")
-        
-        new_psychologist.specializations.extend(specializations)
-        db.commit()
-    return new_psychologist
+    await db.flush()
+    await reindex_psychologists(db, [new_psychologist.id])
+    await db.commit()
+    # у пользователя появился профиль психолога — закэшированный principal устарел
+    invalidate_principal(new_psychologist.user_id)
+    await invalidate_psychologist(db, new_psychologist.id)
+    return await load_profile(db, new_psychologist.id)
 
-@router.get("/{psychologist_id}", response_model=PsychologistRead)
-def get_psychologist(psychologist_id: int, db: Session = Depends(get_db)) -> PsychologistRead:
-    psychologist = (
-        db.query(Psychologist)
-        .options(
-            joinedload(Psychologist.user),
-            joinedload(Psychologist.specializations),
-            joinedload(Psychologist.schedule),
-            joinedload(Psychologist.reviews),
-        )
-        .filter(Psychologist.id == psychologist_id)
-        .first()
+@router.get("/", response_model=PsychologistPage)
+async def list_psychologists(
+    specialization_id: Optional[int] = None,
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    min_experience: Optional[int] = Query(None, ge=0),
+    sort: CatalogSort = "-rating",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> PsychologistPage:
+    """Каталог психологов с фильтрами и keyset-пагинацией по (sort, id)."""
+    return await psychologist_page(
+        db,
+        specialization_id=specialization_id,
+        min_price=min_price,
+        max_price=max_price,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
     )
-    if not psychologist:
+
+# /search, /recommendations и /available объявлены до /{psychologist_id}, иначе разбирались бы как id
+@router.get("/search", response_model=PsychologistPage)
+async def search_psychologists(
+    q: str = Query(..., min_length=1, max_length=200, description="Слова из имени, био и специализаций; нужны все"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> PsychologistPage:
+    """Полнотекстовый поиск по релевантности: имя важнее специализаций, специализации важнее био."""
+    return await search_page(db, q, limit, cursor)
+
+@router.get("/recommendations", response_model=list[PsychologistRecommendation])
+async def recommend_psychologists(
+    specialization_ids: list[int] = Query([], description="Нужные специализации; оценка — доля совпавших"),
+    budget: Optional[Decimal] = Query(None, gt=0, description="Бюджет за час"),
+    days: list[int] = Query([], description="Дни недели 0–6 (0 — понедельник); по умолчанию вся неделя"),
+    from_time: Optional[time] = Query(None, alias="from", description="Начало удобного окна в каждый из дней"),
+    to_time: Optional[time] = Query(None, alias="to", description="Конец окна; не позже from — окно через полночь"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+) -> list[PsychologistRecommendation]:
+    """Оценивает всех психологов по специализациям, цене, рейтингу, опыту и расписанию и отдаёт лучших."""
+    if any(day not in range(7) for day in days):
+        raise HTTPException(status_code=400, detail="День недели должен быть от 0 до 6")
+    if (from_time is None) != (to_time is None):
+        raise HTTPException(status_code=400, detail="Окно задаётся парой from и to")
+    query = RecommendationQuery(
+        specialization_ids=tuple(dict.fromkeys(specialization_ids)),
+        budget=float(budget) if budget is not None else None,
+        days=tuple(sorted(set(days))),
+        start=from_time,
+        end=to_time,
+    )
+    return await recommendations.recommend(db, query, limit)
+
+@router.get("/available", response_model=PsychologistPage)
+async def available_psychologists(
+    days: list[int] = Query([], description="Дни недели 0–6 (0 — понедельник); свободен должен быть в каждый; по умолчанию вся неделя"),
+    from_time: time = Query(..., alias="from", description="Начало окна"),
+    to_time: time = Query(..., alias="to", description="Конец окна; не позже from — окно через полночь"),
+    specialization_ids: list[int] = Query([], description="Нужны все перечисленные специализации"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> PsychologistPage:
+    """Кто работает по недельному расписанию всё окно, например во вторник с 18:00 до 20:00; по id."""
+    if any(day not in range(7) for day in days):
+        raise HTTPException(status_code=400, detail="День недели должен быть от 0 до 6")
+    return await available_page(db, sorted(set(days)), from_time, to_time, list(dict.fromkeys(specialization_ids)), limit, cursor)
+
+@router.get("/{psychologist_id}", response_model=PsychologistRead)
+async def get_psychologist(psychologist_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    async def build() -> bytes:
+        psychologist = await load_profile(db, psychologist_id)
+        if not psychologist:
+            raise HTTPException(status_code=404, detail="Психолог не найден")
+        return PsychologistRead.model_validate(psychologist).model_dump_json().encode()
+
+    return await response_cache.respond(request, PSYCHOLOGIST, psychologist_id, build)
+
+@router.get("/{psychologist_id}/slots", response_model=list[SlotRead])
+async def get_free_slots(
+    psychologist_id: int,
+    from_time: datetime = Query(..., alias="from"),
+    to_time: datetime = Query(..., alias="to"),
+    duration: int = Query(60, ge=15, le=480, description="Длительность слота в минутах"),
+    db: AsyncSession = Depends(get_db),
+) -> list[SlotRead]:
+    """Свободные слоты: рабочие окна из расписания минус неотменённые записи."""
+    start, end = to_naive_utc(from_time), to_naive_utc(to_time)
+    if end <= start or end - start > MAX_SLOTS_RANGE:
+        raise HTTPException(status_code=400, detail="Некорректный диапазон дат")
+    if await db.get(Psychologist, psychologist_id) is None:
         raise HTTPException(status_code=404, detail="Психолог не найден")
-    return psychologist
+
+    rules = (await db.execute(
+        select(Schedule.day_of_week, Schedule.start_time, Schedule.end_time)
+        .where(Schedule.psychologist_id == psychologist_id)
+    )).all()
+    busy = (await db.execute(
+        select(Appointment.start_time, Appointment.end_time)
+        .where(
+            Appointment.psychologist_id == psychologist_id,
+            Appointment.status != AppointmentStatus.canceled,
+            Appointment.start_time < end,
+            Appointment.end_time > start,
+        )
+        .order_by(Appointment.start_time)
+    )).all()
+
+    slots = free_slots(rules, busy, start, end, timedelta(minutes=duration))
+    return [SlotRead(start_time=slot_start, end_time=slot_end) for slot_start, slot_end in slots]
 
 @router.put("/{psychologist_id}", response_model=PsychologistRead)
-def update_psychologist(
+async def update_psychologist(
     psychologist_id: int,
     psychologist_data: PsychologistCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    psychologist = db.query(Psychologist).filter(Psychologist.id == psychologist_id).first()
+    # текущие специализации нужны, чтобы заменить список целиком
+    psychologist = await db.get(Psychologist, psychologist_id, options=[selectinload(Psychologist.specializations)])
     if not psychologist:
         raise HTTPException(status_code=404, detail="Психолог не найден")
+    previous_specialization_ids = [specialization.id for specialization in psychologist.specializations]
 
     psychologist.experience = psychologist_data.experience
     psychologist.bio = psychologist_data.bio
     psychologist.price_per_hour = psychologist_data.price_per_hour
 
     if psychologist_data.specialization_ids:
-        specializations = db.query(Specialization).filter(
-            Specialization.id.in_(psychologist_data.specialization_ids)
-        ).all()
+        specializations = await _load_specializations(db, psychologist_data.specialization_ids)
         if not specializations:
             raise HTTPException(status_code=400)
         
         psychologist.specializations = specializations  
     
-    db.commit()
-    db.refresh(psychologist)
+    await db.flush()
+    await reindex_psychologists(db, [psychologist_id])
+    await db.commit()
+    await invalidate_psychologist(db, psychologist_id, specialization_ids=previous_specialization_ids)
 
-    return psychologist
+    return await load_profile(db, psychologist_id)
@@ -1,24 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import List
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_time_cursor
+from app.core.serialization import projection
+from app.models.psychologist import Psychologist
 from app.models.review import Review
-from app.schemas.review import ReviewBase, ReviewRead
+from app.schemas.review import ReviewBase, ReviewRead, ReviewPage, ReviewSort, ReviewSummary
+from app.services.catalog_cache import invalidate_psychologist
+from app.services.ratings import apply_review, review_summary
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
 @router.post("/", response_model=ReviewRead)
-def create_review(review_data: ReviewBase, db: Session = Depends(get_db)) -> ReviewRead:
-    new_review = Review(**review_data.model_dump(), created_at=datetime.utcnow())
+async def create_review(review_data: ReviewBase, db: AsyncSession = Depends(get_db)) -> ReviewRead:
+    # агрегат и сам отзыв фиксируются в одной транзакции
+    created_at = datetime.utcnow()
+    if not await apply_review(db, review_data.psychologist_id, review_data.rating, created_at):
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Психолог не найден")
+    new_review = Review(**review_data.model_dump(), created_at=created_at)
     db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
+    await db.commit()
+    await db.refresh(new_review)
+    # рейтинг и последние отзывы в профиле изменились
+    await invalidate_psychologist(db, new_review.psychologist_id)
     return new_review
 
-@router.get("/{psychologist_id}", response_model=list[ReviewRead])
-def get_reviews(psychologist_id: int, db: Session = Depends(get_db)) ->  List[ReviewRead]:
-    reviews = db.query(Review).filter(Review.psychologist_id == psychologist_id).all()
-    if not reviews:
-        raise HTTPException(status_code=404, detail="Отзывы не найдены")
-    return reviews
+@router.get("/{psychologist_id}", response_model=ReviewPage)
+async def get_reviews(
+    psychologist_id: int,
+    sort: ReviewSort = "-created_at",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> ReviewPage:
+    """Отзывы психолога страницами: keyset по (created_at, id) или (rating, created_at, id)."""
+    by_rating = sort.endswith("rating")
+    key = (Review.rating, Review.created_at, Review.id) if by_rating else (Review.created_at, Review.id)
+    descending = sort.startswith("-")
+
+    # строки колонок вместо ORM-объектов: без identity map и отслеживания изменений
+    query = select(*projection(Review, ReviewRead)).where(Review.psychologist_id == psychologist_id)
+    if cursor:
+        after = decode_time_cursor(cursor, prefix=1 if by_rating else 0)
+        query = query.where(tuple_(*key) < after if descending else tuple_(*key) > after)
+    query = query.order_by(*(column.desc() if descending else column for column in key)).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    if not rows and not cursor and await db.get(Psychologist, psychologist_id) is None:
+        raise HTTPException(status_code=404, detail="Психолог не найден")
+
+    items = rows[:limit]
+    next_cursor = encode_cursor(*(getattr(items[-1], column.key) for column in key)) if len(rows) > limit else None
+    return ReviewPage(items=items, next_cursor=next_cursor)
+
+@router.get("/{psychologist_id}/summary", response_model=ReviewSummary)
+async def get_review_summary(psychologist_id: int, db: AsyncSession = Depends(get_db)) -> ReviewSummary:
+    """Гистограмма оценок и рейтинг с затуханием — из агрегата, который обновляется с каждым отзывом."""
+    summary = await review_summary(db, psychologist_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Психолог не найден")
+    return summary
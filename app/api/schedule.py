@@ -1,33 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.models.schedule import Schedule
 from app.schemas.schedule import ScheduleCreate, ScheduleRead
+from app.core.response_cache import response_cache
+from app.core.serialization import projection
+from app.services.catalog_cache import SCHEDULE, invalidate_psychologist
+from app.services.read_model import catalog
+from app.services.weekly_availability import rebuild_availability
 
 router = APIRouter(prefix="/schedule", tags=["Schedule"])
 
+schedule_list = TypeAdapter(list[ScheduleRead])
+
 @router.post("/", response_model=ScheduleRead)
-def create_schedule(schedule_data: ScheduleCreate, db: Session = Depends(get_db)):
+async def create_schedule(schedule_data: ScheduleCreate, db: AsyncSession = Depends(get_db)):
     if schedule_data.day_of_week not in range(0, 7):
         raise HTTPException(status_code=400)
     new_schedule = Schedule(**schedule_data.model_dump())
     db.add(new_schedule)
-    db.commit()
-    db.refresh(new_schedule)
+    await db.flush()
+    await rebuild_availability(db, [new_schedule.psychologist_id])
+    await db.commit()
+    await db.refresh(new_schedule)
+    await invalidate_psychologist(db, new_schedule.psychologist_id, schedule=True)
     return new_schedule
 
 @router.get("/{psychologist_id}", response_model=list[ScheduleRead])
-def get_schedule(psychologist_id: int, db: Session = Depends(get_db)):
-    schedule = db.query(Schedule).filter(Schedule.psychologist_id == psychologist_id).all()
-    if not schedule:
-        raise HTTPException(status_code=404, detail="Расписание не найдено")
-    return schedule
+async def get_schedule(psychologist_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    async def build() -> bytes:
+        if catalog.ready:
+            schedule = catalog.data.schedule(psychologist_id)
+        else:
+            rows = (await db.execute(select(*projection(Schedule, ScheduleRead)).where(Schedule.psychologist_id == psychologist_id))).all()
+            schedule = schedule_list.validate_python(rows, from_attributes=True)
+        if not schedule:
+            raise HTTPException(status_code=404, detail="Расписание не найдено")
+        return schedule_list.dump_json(schedule)
+
+    return await response_cache.respond(request, SCHEDULE, psychologist_id, build)
 
 @router.delete("/{schedule_id}")
-def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
-    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+async def delete_schedule(schedule_id: int, db: AsyncSession = Depends(get_db)):
+    schedule = await db.get(Schedule, schedule_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Расписание не найдено")
-    db.delete(schedule)
-    db.commit()
+    psychologist_id = schedule.psychologist_id
+    await db.delete(schedule)
+    await db.flush()
+    await rebuild_availability(db, [psychologist_id])
+    await db.commit()
+    await invalidate_psychologist(db, psychologist_id, schedule=True)
     return {"message": "Расписание удалено"}
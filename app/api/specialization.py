@@ -1,27 +1,102 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.response_cache import response_cache
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
 from app.models.specialization import Specialization
-from app.schemas.specialization import SpecializationBase, SpecializationRead
+from app.schemas.psychologist import PsychologistSummary, PsychologistPage
+from app.schemas.specialization import (
+    SpecializationBase, SpecializationRead, SpecializationProfilesRead, SpecializationExpand
+)
+from app.services.catalog_cache import SPECIALIZATION, invalidate_specializations, specialization_key
+from app.services.psychologists import CatalogSort, load_profiles, psychologist_page, summary_query, in_specialization
+from app.services.read_model import catalog
 
 router = APIRouter(prefix="/specializations", tags=["Specializations"])
 
+async def _psychologist_count(db: AsyncSession, specialization_id: int) -> int:
+    return await db.scalar(
+        select(func.count())
+        .select_from(psychologist_specializations)
+        .where(psychologist_specializations.c.specialization_id == specialization_id)
+    )
+
+async def _build_specialization(db: AsyncSession, specialization_id: int, expand: SpecializationExpand | None) -> bytes:
+    # полные профили с отзывами в модели чтения не хранятся
+    if catalog.ready and expand != "psychologists.profile":
+        result = catalog.data.specialization(specialization_id, with_psychologists=expand == "psychologists")
+        if result is None:
+            raise HTTPException(status_code=404, detail="Специализация не найдена")
+        return result.model_dump_json().encode()
+    specialization = await db.get(Specialization, specialization_id)
+    if not specialization:
+        raise HTTPException(status_code=404, detail="Специализация не найдена")
+    fields = {
+        "id": specialization.id,
+        "name": specialization.name,
+        "description": specialization.description,
+        "psychologist_count": await _psychologist_count(db, specialization_id),
+    }
+
+    if expand == "psychologists.profile":
+        member_ids = (await db.scalars(
+            select(psychologist_specializations.c.psychologist_id)
+            .where(psychologist_specializations.c.specialization_id == specialization_id)
+        )).all()
+        result = SpecializationProfilesRead(**fields, psychologists=await load_profiles(db, member_ids))
+    elif expand == "psychologists":
+        rows = (await db.execute(
+            summary_query()
+            .where(in_specialization(specialization_id))
+            .order_by(Psychologist.rating.desc(), Psychologist.id)
+        )).all()
+        result = SpecializationRead(**fields, psychologists=[PsychologistSummary.model_validate(row._mapping) for row in rows])
+    else:
+        result = SpecializationRead(**fields)
+    return result.model_dump_json().encode()
+
 @router.post("/", response_model=SpecializationRead)
-def create_specialization(specialization_data: SpecializationBase, db: Session = Depends(get_db)):
+async def create_specialization(specialization_data: SpecializationBase, db: AsyncSession = Depends(get_db)):
     new_specialization = Specialization(**specialization_data.model_dump())
     db.add(new_specialization)
-    db.commit()
-    db.refresh(new_specialization)
-    return new_specialization
+    await db.commit()
+    await invalidate_specializations([new_specialization.id])
+    return SpecializationRead(
+        id=new_specialization.id,
+        name=new_specialization.name,
+        description=new_specialization.description,
+    )
 
-@router.get("/{specialization_id}", response_model=SpecializationRead)
-def get_specialization(specialization_id: int, db: Session = Depends(get_db)):
-    specialization = (
-        db.query(Specialization)
-        .options(joinedload(Specialization.psychologists))
-        .filter(Specialization.id == specialization_id)
-        .first()
+@router.get("/{specialization_id}", response_model=SpecializationRead | SpecializationProfilesRead)
+async def get_specialization(
+    specialization_id: int,
+    request: Request,
+    expand: Optional[SpecializationExpand] = Query(
+        None, description="psychologists — краткие карточки всех участников, psychologists.profile — полные профили"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """Специализация и число психологов; сами психологи — постранично через /{id}/psychologists."""
+    return await response_cache.respond(
+        request, SPECIALIZATION, specialization_key(specialization_id, expand),
+        lambda: _build_specialization(db, specialization_id, expand),
     )
-    if not specialization:
+
+@router.get("/{specialization_id}/psychologists", response_model=PsychologistPage)
+async def get_specialization_psychologists(
+    specialization_id: int,
+    sort: CatalogSort = "-rating",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> PsychologistPage:
+    if catalog.ready:
+        exists = specialization_id in catalog.data.specializations
+    else:
+        exists = await db.get(Specialization, specialization_id) is not None
+    if not exists:
         raise HTTPException(status_code=404, detail="Специализация не найдена")
-    return specialization
+    return await psychologist_page(db, specialization_id=specialization_id, sort=sort, limit=limit, cursor=cursor)
@@ -1,56 +1,101 @@
 from fastapi import APIRouter, Depends, HTTPException, Security
+from dataclasses import replace
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.security import hash_password, verify_password, create_jwt_token, decode_jwt_token
+from app.core.security import (
+    hash_password_async, verify_password_async, needs_rehash, create_jwt_token, decode_jwt_token, decode_jwt_claims,
+    Principal, principal_cache, invalidate_principal, revoke_user_tokens
+)
 from app.models.user import User
+from app.models.psychologist import Psychologist
 from app.schemas.user import UserCreate, UserRead, UserUpdatePassword
 
 router = APIRouter(prefix="/users", tags=["Users"])
 security = HTTPBearer()
 
 @router.post("/register", response_model=UserRead)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user_data.email).first():
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User.id).where(User.email == user_data.email)):
         raise HTTPException(status_code=400, detail="Email уже используется")
+    # не держим соединение из пула, пока считается bcrypt
+    await db.commit()
     
-    hashed_password = hash_password(user_data.password)
+    # bcrypt нагружает CPU — считается в отдельном пуле, при перегрузке 503
+    hashed_password = await hash_password_async(user_data.password)
     new_user = User(**user_data.model_dump(exclude={"password"}), password_hash=hashed_password)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 @router.post("/login")
-def login(user_data: UserCreate, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_data.email).first()
-    if not user or not verify_password(user_data.password, user.password_hash):
+async def login(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == user_data.email))
+    await db.commit()  # не держим соединение из пула, пока считается bcrypt
+    if not user or not await verify_password_async(user_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Неверный email или пароль")
+
+    # пароль известен только сейчас — переводим старый хэш на текущую стоимость BCRYPT_ROUNDS
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await hash_password_async(user_data.password)
+            await db.commit()
+        except HTTPException:
+            pass  # пул занят — обновим при следующем входе
     
     token = create_jwt_token(user.id)
-    print("Создан токен:", token)
     return {"access_token": token, "token_type": "bearer"}
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security), db: AsyncSession = Depends(get_db)):
     token = credentials.credentials
     user_id = decode_jwt_token(token)
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     return user
 
+async def get_current_principal(credentials: HTTPAuthorizationCredentials = Security(security), db: AsyncSession = Depends(get_db)) -> Principal:
+    """Id пользователя и его профиля психолога; при попадании в кэш к БД не обращается."""
+    return await load_principal(db, decode_jwt_claims(credentials.credentials))
+
+async def load_principal(db: AsyncSession, claims: dict) -> Principal:
+    """Principal по уже проверенным claims — для токенов не из заголовка (например, ?token= ленты)."""
+    user_id = int(claims["sub"])
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = (await db.execute(
+            select(User.id, Psychologist.id)
+            .outerjoin(Psychologist, Psychologist.user_id == User.id)
+            .where(User.id == user_id)
+        )).first()
+        if not row:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        principal = Principal(id=row[0], psychologist_id=row[1], iat=claims["iat"])
+        principal_cache.set(user_id, principal)
+    elif principal.iat != claims["iat"]:
+        # у пользователя может быть несколько токенов, в кэше лежит последний увиденный
+        principal = replace(principal, iat=claims["iat"])
+    return principal
+
 @router.get("/me", response_model=UserRead)
-def get_me(user: User = Depends(get_current_user)):
+async def get_me(user: User = Depends(get_current_user)):
     return user
 
 @router.put("/change-password")
-def change_password(password_data: UserUpdatePassword, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    user.password_hash = hash_password(password_data.new_password)
-    db.commit()
+async def change_password(password_data: UserUpdatePassword, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    await db.commit()  # не держим соединение из пула, пока считается bcrypt
+    user.password_hash = await hash_password_async(password_data.new_password)
+    await db.commit()
+    invalidate_principal(user.id)
+    revoke_user_tokens(user.id)
     return {"message": "Пароль изменён"}
 
 @router.delete("/delete", response_model=dict)
-def delete_user(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    db.delete(user)
-    db.commit()
+async def delete_user(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    await db.delete(user)
+    await db.commit()
+    invalidate_principal(user.id)
+    revoke_user_tokens(user.id)
     return {"message": "Пользователь удалён"}
@@ -0,0 +1,113 @@
+"""Pub/sub для доставки событий подписчикам (WebSocket-соединениям) внутри процесса.
+
+Бэкенд выбирается через CHAT_BROKER; сейчас есть только "memory" — он доставляет
+сообщения лишь соединениям своего процесса. Для нескольких воркеров/узлов нужен
+бэкенд поверх общей шины с тем же интерфейсом Broker, зарегистрированный в BROKERS.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+# сколько недоставленных сообщений может накопиться у одного соединения
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("CHAT_WS_QUEUE_SIZE", "100"))
+
+class Subscription:
+    """Очередь одного подписчика. Итерация заканчивается, если подписчик отстал и был отключён."""
+    __slots__ = ("channel", "queue", "overflowed")
+
+    def __init__(self, channel: Hashable, maxsize: int):
+        self.channel = channel
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> str:
+        message = await self.queue.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+class Broker:
+    """Интерфейс брокера: publish в канал и подписка на канал."""
+
+    async def publish(self, channel: Hashable, message: str) -> int:
+        """Отправляет уже сериализованное сообщение, возвращает число локальных получателей."""
+        raise NotImplementedError
+
+    def subscribe(self, channel: Hashable):
+        """Асинхронный контекстный менеджер, отдающий Subscription."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+class InMemoryBroker(Broker):
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._channels: dict[Hashable, set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.overflowed = 0
+
+    async def publish(self, channel: Hashable, message: str) -> int:
+        self.published += 1
+        subscribers = self._channels.get(channel)
+        if not subscribers:
+            return 0
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # медленного клиента не ждём: отключаем, пропущенное он дочитает из истории
+                self._drop(subscription)
+        return len(subscribers)
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.overflowed += 1
+        subscription.overflowed = True
+        self._unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[subscription.channel]
+
+    @asynccontextmanager
+    async def subscribe(self, channel: Hashable) -> AsyncIterator[Subscription]:
+        subscription = Subscription(channel, self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "channels": len(self._channels),
+            "subscribers": sum(len(subscribers) for subscribers in self._channels.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflowed": self.overflowed,
+        }
+
+BROKERS = {
+    "memory": InMemoryBroker,
+}
+
+def create_broker(name: str) -> Broker:
+    try:
+        return BROKERS[name]()
+    except KeyError:
+        raise RuntimeError(f"Неизвестный CHAT_BROKER: {name!r}, доступны: {', '.join(BROKERS)}")
+
+broker = create_broker(os.getenv("CHAT_BROKER", "memory"))
@@ -0,0 +1,42 @@
+"""Уведомления об изменении данных внутри процесса.
+
+Публикуются после commit, подписчики вызываются по очереди в том же запросе.
+Подписчик может быть корутиной: тогда запрос ждёт, пока тот обновит свои
+данные, и сразу после ответа изменение уже видно. Другие процессы этих событий
+не видят — подписчику нужен и периодический полный пересчёт.
+"""
+import inspect
+import logging
+from typing import Awaitable, Callable, Collection
+
+logger = logging.getLogger(__name__)
+
+# профиль, специализации, рейтинг или расписание психологов; данные — их id
+PSYCHOLOGISTS_CHANGED = "psychologists_changed"
+# специализации, у которых могли измениться название или описание; данные — их id
+SPECIALIZATIONS_CHANGED = "specializations_changed"
+
+Handler = Callable[[Collection[int]], Awaitable[None] | None]
+
+_handlers: dict[str, list[Handler]] = {}
+
+def subscribe(topic: str, handler: Handler) -> Handler:
+    _handlers.setdefault(topic, []).append(handler)
+    return handler
+
+def unsubscribe(topic: str, handler: Handler) -> None:
+    handlers = _handlers.get(topic, [])
+    if handler in handlers:
+        handlers.remove(handler)
+
+async def publish(topic: str, ids: Collection[int]) -> None:
+    """Ошибка подписчика не должна ломать запрос, который уже зафиксировал изменения."""
+    if not ids:
+        return
+    for handler in list(_handlers.get(topic, ())):
+        try:
+            result = handler(ids)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception("Подписчик %r на %s упал", handler, topic)
@@ -0,0 +1,172 @@
+"""Инструментирование SQL: число запросов, время в БД, ожидание пула и поиск N+1 на каждый HTTP-запрос."""
+import heapq
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+DEV_MODE = os.getenv("APP_ENV", "production").lower() in ("dev", "development", "local")
+# /metrics раскрывает SQL и нагрузку по маршрутам: в production подключается только явно
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", str(DEV_MODE)).lower() in ("1", "true", "yes")
+NPLUS1_THRESHOLD = int(os.getenv("DB_NPLUS1_THRESHOLD", "10"))
+SLOWEST_STATEMENTS = 5
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*,?)+\)")
+_SPACES = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    """SQL без различий в числе параметров IN (...) и пробелах — для сравнения "одинаковых" запросов."""
+    return _IN_LIST.sub("(?)", _SPACES.sub(" ", statement)).strip()
+
+class RequestStats:
+    __slots__ = ("query_count", "db_time", "pool_wait", "slowest", "shapes")
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.slowest: list[tuple[float, str]] = []  # min-heap из SLOWEST_STATEMENTS самых долгих
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_time += elapsed
+        if len(self.slowest) < SLOWEST_STATEMENTS:
+            heapq.heappush(self.slowest, (elapsed, statement))
+        elif elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (elapsed, statement))
+        if DEV_MODE:
+            shape = statement_shape(statement)
+            self.shapes[shape] += 1
+            if self.shapes[shape] == NPLUS1_THRESHOLD + 1:
+                logger.warning("Возможный N+1: запрос выполнен больше %s раз за один HTTP-запрос: %s", NPLUS1_THRESHOLD, shape)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries", db-pool;dur={self.pool_wait * 1000:.2f}'
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_db_stats", default=None)
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+class RouteMetrics:
+    """Накопленные метрики по маршрутам для /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict] = {}
+        self._slowest: list[tuple[float, str, str]] = []
+
+    def add(self, route: str, stats: RequestStats, elapsed: float) -> None:
+        with self._lock:
+            item = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "max_queries": 0,
+                "request_time_ms": 0.0, "db_time_ms": 0.0, "pool_wait_ms": 0.0,
+            })
+            item["requests"] += 1
+            item["queries"] += stats.query_count
+            item["max_queries"] = max(item["max_queries"], stats.query_count)
+            item["request_time_ms"] += elapsed * 1000
+            item["db_time_ms"] += stats.db_time * 1000
+            item["pool_wait_ms"] += stats.pool_wait * 1000
+            for duration, statement in stats.slowest:
+                entry = (duration, route, statement)
+                if len(self._slowest) < SLOWEST_STATEMENTS:
+                    heapq.heappush(self._slowest, entry)
+                elif duration > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, entry)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = {}
+            for route, item in self._routes.items():
+                requests = item["requests"]
+                routes[route] = {
+                    **item,
+                    "avg_queries": item["queries"] / requests,
+                    "avg_request_time_ms": item["request_time_ms"] / requests,
+                    "avg_db_time_ms": item["db_time_ms"] / requests,
+                }
+            slowest = [
+                {"duration_ms": duration * 1000, "route": route, "statement": statement}
+                for duration, route, statement in sorted(self._slowest, reverse=True)
+            ]
+        return {"routes": routes, "slowest_statements": slowest}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._slowest.clear()
+
+route_metrics = RouteMetrics()
+
+def instrument_engine(engine: Engine) -> None:
+    """Вешает таймеры на выполнение запросов (для async-движка передавайте engine.sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+class _TimedCheckout:
+    """Учитывает время ожидания свободного соединения из пула."""
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.pool_wait += perf_counter() - started
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+class QueryMetricsMiddleware:
+    """ASGI-middleware: собирает статистику запроса и отдаёт её в Server-Timing и X-DB-Query-Count."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                headers.append((b"x-db-query-count", str(stats.query_count).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            route_metrics.add(f"{scope['method']} {path}", stats, perf_counter() - started)
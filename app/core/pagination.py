@@ -0,0 +1,77 @@
+import base64
+import json
+import math
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+def encode_cursor(*values: Any) -> str:
+    """Упаковывает значения ключа последней строки страницы в непрозрачный курсор."""
+    def _default(value: Any) -> Any:
+        if isinstance(value, Decimal):
+            return str(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"нельзя закодировать {type(value)!r} в курсор")
+
+    raw = json.dumps(list(values), default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    return values
+
+def cursor_id(value: Any) -> int:
+    """Целое из курсора (id, оценка): только int, иначе 400 (True — тоже int в Python, но не число)."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    return value
+
+def decode_keyset_cursor(cursor: str, convert: Callable[[Any], Any]) -> tuple[Any, int]:
+    """Курсор (значение, id) для keyset_after; значение приводится convert, NULL остаётся None."""
+    value, last_id = decode_cursor(cursor, 2)
+    if value is not None:
+        try:
+            value = convert(value)
+            if not math.isfinite(value):
+                raise ValueError(value)
+        except (ValueError, TypeError, InvalidOperation):
+            raise HTTPException(status_code=400, detail="Некорректный курсор")
+    return value, cursor_id(last_id)
+
+def decode_time_cursor(cursor: str, prefix: int = 0) -> tuple:
+    """Курсор (..., datetime, id) для tuple_-сравнения; prefix ведущих значений — целые, как оценка отзыва.
+
+    Время — наивное ISO, как его пишет encode_cursor для колонок без часового пояса.
+    """
+    *head, moment, last_id = decode_cursor(cursor, prefix + 2)
+    try:
+        moment = datetime.fromisoformat(moment)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    if moment.tzinfo is not None:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    return (*(cursor_id(value) for value in head), moment, cursor_id(last_id))
+
+def keyset_after(column, id_column, value: Any, last_id: int, descending: bool):
+    """Условие "строго после (value, last_id)" для ORDER BY column, id с NULL в конце."""
+    if value is None:
+        return and_(column.is_(None), id_column < last_id if descending else id_column > last_id)
+    if descending:
+        after = or_(column < value, and_(column == value, id_column < last_id))
+    else:
+        after = or_(column > value, and_(column == value, id_column > last_id))
+    return or_(after, column.is_(None))
+
+def keyset_order(column, id_column, descending: bool) -> tuple:
+    if descending:
+        return column.desc().nulls_last(), id_column.desc()
+    return column.asc().nulls_last(), id_column.asc()
@@ -0,0 +1,167 @@
+"""Кэш готовых JSON-ответов с ETag и ответом 304 на If-None-Match.
+
+Записи живут не дольше TTL и удаляются явно обработчиками, которые меняют данные
+(после commit). Бэкенд выбирается через RESPONSE_CACHE_BACKEND:
+    memory — LRU в памяти процесса (по умолчанию), у каждого воркера свой;
+    redis  — общий для всех воркеров, нужен пакет redis и RESPONSE_CACHE_URL;
+    none   — без кэширования, ETag и 304 всё равно работают.
+TTL по умолчанию — RESPONSE_CACHE_TTL, для отдельного пространства ключей —
+RESPONSE_CACHE_TTL_<NAMESPACE>, например RESPONSE_CACHE_TTL_SCHEDULE=600.
+"""
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from fastapi import Request, Response
+from app.core.cache import TTLCache
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # нужен только для RESPONSE_CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+
+def ttl_for(namespace: str) -> float:
+    return float(os.getenv(f"RESPONSE_CACHE_TTL_{namespace.upper()}", RESPONSE_CACHE_TTL))
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    etag: str
+    body: bytes
+
+    @classmethod
+    def build(cls, body: bytes) -> "CachedResponse":
+        return cls(etag=f'"{hashlib.sha1(body).hexdigest()}"', body=body)
+
+class MemoryBackend:
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self._cache = TTLCache("response", maxsize=maxsize, ttl=RESPONSE_CACHE_TTL)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._cache.pop(key)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "size": len(self._cache), "maxsize": self._cache.maxsize}
+
+class RedisBackend:
+    """Общий кэш для нескольких воркеров. Ошибки Redis не роняют чтение: запрос идёт в БД."""
+
+    def __init__(self, url: str | None = None):
+        if redis is None:
+            raise RuntimeError("Для RESPONSE_CACHE_BACKEND=redis установите пакет redis")
+        self._client = redis.from_url(url or os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0"))
+        self.errors = 0
+
+    async def get(self, key: str) -> CachedResponse | None:
+        try:
+            raw = await self._client.get(key)
+        except redis.RedisError:
+            self.errors += 1
+            logger.warning("Кэш ответов недоступен", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return CachedResponse(etag=etag.decode("ascii"), body=body)
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        try:
+            await self._client.set(key, value.etag.encode("ascii") + b"\n" + value.body, px=int(ttl * 1000))
+        except redis.RedisError:
+            self.errors += 1
+            logger.warning("Не удалось записать в кэш ответов", exc_info=True)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            # ошибку удаления не глушим: иначе останутся устаревшие ответы до конца TTL
+            await self._client.delete(*keys)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+class NullBackend:
+    async def get(self, key: str) -> CachedResponse | None:
+        return None
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none"}
+
+BACKENDS = {
+    "memory": MemoryBackend,
+    "redis": RedisBackend,
+    "none": NullBackend,
+}
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    async def respond(self, request: Request, namespace: str, key: object, build: Callable[[], Awaitable[bytes]]) -> Response:
+        """Ответ из кэша или собранный build(); build возвращает готовый JSON и может бросить HTTPException."""
+        cache_key = f"{namespace}:{key}"
+        cached = await self.backend.get(cache_key)
+        if cached is None:
+            self.misses += 1
+            cached = CachedResponse.build(await build())
+            await self.backend.set(cache_key, cached, ttl_for(namespace))
+        else:
+            self.hits += 1
+
+        # no-cache: клиент может хранить ответ, но перед использованием переспрашивает через If-None-Match
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, namespace: str, *keys: object) -> None:
+        if keys:
+            self.invalidations += len(keys)
+            await self.backend.delete(*(f"{namespace}:{key}" for key in keys))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+        }
+
+def create_response_cache(name: str) -> ResponseCache:
+    try:
+        return ResponseCache(BACKENDS[name]())
+    except KeyError:
+        raise RuntimeError(f"Неизвестный RESPONSE_CACHE_BACKEND: {name!r}, доступны: {', '.join(BACKENDS)}")
+
+response_cache = create_response_cache(os.getenv("RESPONSE_CACHE_BACKEND", "memory"))
@@ -1,38 +1,145 @@
+import asyncio
 import bcrypt
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.cache import TTLCache
 
 SECRET_KEY = "a-very-strong-secret-key-at-least-256-bits-long"
 ALGORITHM = "HS256"
 TOKEN_EXPIRATION_HOURS = 24
+# токены с scope (лента календаря и т.п.) живут в URL внешних клиентов и не открывают остальной API
+SCOPED_TOKEN_EXPIRATION_DAYS = int(os.getenv("SCOPED_TOKEN_EXPIRATION_DAYS", "365"))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# отдельный пул под bcrypt: вход и регистрация не занимают общий threadpool;
+# HASH_QUEUE_LIMIT — сколько операций может выполняться и ждать одновременно, остальным 503
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(HASH_WORKERS * 8)))
 
 security = HTTPBearer()
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Аутентифицированный пользователь без похода в БД: всё, что нужно проверкам доступа."""
+    id: int
+    psychologist_id: int | None
+    iat: float
+
+# ключ — id пользователя; сбрасывается при смене пароля, удалении и появлении профиля психолога.
+# Кэш локален для процесса, поэтому другие воркеры увидят изменения не позже чем через TTL
+principal_cache = TTLCache(
+    "principal",
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+)
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.pop(user_id)
+
+# проверенные токены: sha256 токена -> claims; запись живёт не дольше exp токена
+jwt_cache = TTLCache(
+    "jwt",
+    maxsize=int(os.getenv("JWT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("JWT_CACHE_TTL", "300")),
+)
+# user_id -> unix-время отзыва: токены, выпущенные не позже этого момента, отклоняются
+# (и из кэша, и при полной проверке). Время дробное, как и iat новых токенов: иначе токен,
+# полученный в ту же секунду после смены пароля, тоже считался бы отозванным.
+# Отзыв действует в пределах процесса
+_revoked_before: dict[int, float] = {}
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
-def create_jwt_token(user_id: int) -> str:
+def needs_rehash(hashed_password: str) -> bool:
+    """Хэш посчитан с другой стоимостью, чем BCRYPT_ROUNDS ($2b$<rounds>$...)."""
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def _run_hashing(func, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Сервер перегружен, повторите попытку позже", headers={"Retry-After": "1"})
+    # слот освобождается по окончании самого хэширования, даже если клиент уже отключился
+    future = _hash_executor.submit(func, *args)
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+def create_jwt_token(user_id: int, scope: str | None = None) -> str:
+    lifetime = timedelta(days=SCOPED_TOKEN_EXPIRATION_DAYS) if scope else timedelta(hours=TOKEN_EXPIRATION_HOURS)
     payload = {
-        "exp": datetime.now(timezone.utc) + timedelta(hours=TOKEN_EXPIRATION_HOURS),
-        "iat": datetime.now(timezone.utc),
+        "exp": datetime.now(timezone.utc) + lifetime,
+        "iat": time.time(),  # NumericDate может быть дробным; целые iat старых токенов сравниваются так же
         "sub": str(user_id)
     }
+    if scope:
+        payload["scope"] = scope
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
-def decode_jwt_token(token: str) -> int:
+def _verify_jwt(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return int(payload["sub"])  # обратно в int
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def decode_jwt_claims(token: str, scope: str | None = None) -> dict:
+    """Claims токена; подпись проверяется один раз, дальше — из кэша до истечения токена.
+
+    scope должен совпасть с claim токена: обычный вызов не примет токен ленты, и наоборот.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = jwt_cache.get(key)
+    now = time.time()
+    if claims is None:
+        claims = _verify_jwt(token)
+        jwt_cache.set(key, claims, ttl=min(claims["exp"] - now, jwt_cache.ttl))
+    elif claims["exp"] <= now:
+        jwt_cache.pop(key)
+        raise HTTPException(status_code=401, detail="Token expired")
+
+    revoked_at = _revoked_before.get(int(claims["sub"]))
+    if revoked_at is not None and claims["iat"] <= revoked_at:
+        jwt_cache.pop(key)
+        raise HTTPException(status_code=401, detail="Token revoked")
+    if claims.get("scope") != scope:
+        raise HTTPException(status_code=401, detail="Invalid token scope")
+    return claims
+
+def revoke_user_tokens(user_id: int) -> None:
+    """Отзывает все уже выпущенные токены пользователя (смена пароля, удаление)."""
+    now = time.time()
+    _revoked_before[user_id] = now
+    # старше срока жизни токенов отметки не нужны: такие токены и так истекли
+    horizon = now - max(TOKEN_EXPIRATION_HOURS * 3600, SCOPED_TOKEN_EXPIRATION_DAYS * 86400)
+    for stale_user_id in [uid for uid, revoked_at in _revoked_before.items() if revoked_at < horizon]:
+        del _revoked_before[stale_user_id]
+
+def decode_jwt_token(token: str) -> int:
+    return int(decode_jwt_claims(token)["sub"])  # обратно в int
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
     """Получение ID текущего пользователя из токена."""
     return decode_jwt_token(credentials.credentials)
@@ -0,0 +1,36 @@
+"""Быстрый путь ответа: одна валидация и сериализация в JSON прямо из строк БД.
+
+Для маршрутов с response_model FastAPI сам валидирует результат и пишет JSON-байты
+через pydantic (Rust), поэтому обработчики возвращают ORM-объекты или строки
+projection(...) как есть — без своего model_validate. Свой response_class у таких
+маршрутов отключает этот путь, поэтому FastJSONResponse — только для ответов-словарей.
+"""
+from decimal import Decimal
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # без orjson — обычный json
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """JSON через orjson (если установлен) для маршрутов без response_model."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS, default=_default)
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"{type(value)!r} не сериализуется в JSON")
+
+def projection(model, schema: type[BaseModel]) -> list:
+    """Колонки модели под поля схемы: select(*projection(Review, ReviewRead)) вернёт строки без ORM-объектов."""
+    columns = model.__table__.c
+    return [columns[name] for name in schema.model_fields]
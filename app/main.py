@@ -1,10 +1,19 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api import (
     user, psychologist, specialization, appointment,
-    chat, schedule, review
+    chat, schedule, review, imports, metrics
 )
+from app.core.metrics import METRICS_ENABLED, QueryMetricsMiddleware
+from app.services.read_model import catalog
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with catalog.running():
+        yield
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(QueryMetricsMiddleware)
 
 app.include_router(user.router)
 app.include_router(psychologist.router)
@@ -13,3 +22,6 @@ app.include_router(appointment.router)
 app.include_router(chat.router)
 app.include_router(schedule.router)
 app.include_router(review.router)
+app.include_router(imports.router)
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
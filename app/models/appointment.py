@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 from decimal import Decimal
-from sqlalchemy import Integer, ForeignKey, DateTime, DECIMAL, Enum
+from sqlalchemy import Integer, ForeignKey, DateTime, DECIMAL, Enum, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.core.database import Base
 from app.schemas.enums import AppointmentStatus
@@ -12,6 +12,12 @@ if TYPE_CHECKING:
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # проверка пересечений при бронировании; префикс (psychologist_id, start_time) — календарь психолога
+        Index("ix_appointments_psychologist_id_start_time_end_time", "psychologist_id", "start_time", "end_time"),
+        # записи клиента по времени: GET /appointments, календарь
+        Index("ix_appointments_client_id_start_time", "client_id", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     client_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -24,6 +30,8 @@ class Appointment(Base):
         nullable=False, 
         default=AppointmentStatus.pending
         )
+    # любое изменение записи (в т.ч. UPDATE в обход ORM) сдвигает updated_at — от него ETag ленты календаря
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     client: Mapped["User"] = relationship("User", back_populates="appointments")
     psychologist: Mapped["Psychologist"] = relationship("Psychologist") # здесь не нужен back_populates
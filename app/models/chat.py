@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, ForeignKey, Text, DateTime
+from sqlalchemy import Integer, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.core.database import Base
 
@@ -9,12 +9,17 @@ if TYPE_CHECKING:
 
 class Chat(Base):
     __tablename__ = "chat"
+    __table_args__ = (
+        # переписка пары в одну сторону, упорядоченная по (sent_at, id); второй индекс — входящие
+        Index("ix_chat_sender_id_receiver_id_sent_at_id", "sender_id", "receiver_id", "sent_at", "id"),
+        Index("ix_chat_receiver_id_sender_id_sent_at_id", "receiver_id", "sender_id", "sent_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     sender_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     receiver_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     message: Mapped[str] = mapped_column(Text, nullable=False)
-    sent_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc))
+    sent_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
 
     sender: Mapped["User"] = relationship("User", foreign_keys=[sender_id], back_populates="chats_sent")
     receiver: Mapped["User"] = relationship("User", foreign_keys=[receiver_id], back_populates="chats_received")
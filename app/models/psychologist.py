@@ -1,8 +1,7 @@
 from typing import List, TYPE_CHECKING
 from decimal import Decimal
-from sqlalchemy import Integer, ForeignKey, String, Float, DECIMAL
+from sqlalchemy import Integer, ForeignKey, String, Float, DECIMAL, Index, LargeBinary
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy.ext.hybrid import hybrid_property
 from app.core.database import Base
 from app.models.psychologist_specialization import psychologist_specializations
 
@@ -14,13 +13,32 @@ if TYPE_CHECKING:
 
 class Psychologist(Base):
     __tablename__ = "psychologists"
+    __table_args__ = (
+        # индексы под сортировку и keyset-пагинацию каталога
+        Index("ix_psychologists_price_per_hour_id", "price_per_hour", "id"),
+        Index("ix_psychologists_experience_id", "experience", "id"),
+        Index("ix_psychologists_rating_id", "rating", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), unique=True)
     experience: Mapped[int] = mapped_column(Integer, nullable=False)
     bio: Mapped[str | None] = mapped_column(String, nullable=True)
-    rating: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # агрегат отзывов, обновляется вместе с каждым новым отзывом (app/services/ratings.py)
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    # гистограмма оценок и суммы для рейтинга с затуханием — обновляются там же
+    rating_count_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    decayed_weight_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    decayed_rating_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
     price_per_hour: Mapped[Decimal | None] = mapped_column(DECIMAL, nullable=True)
+    # недельное расписание битовой картой, пересобирается с каждым его изменением (app/services/weekly_availability.py)
+    availability: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
 
     user: Mapped["User"] = relationship("User", back_populates="psychologist", uselist=False)
     specializations: Mapped[List["Specialization"]] = relationship(
@@ -28,9 +46,3 @@ class Psychologist(Base):
     )
     schedule: Mapped[List["Schedule"]] = relationship("Schedule", back_populates="psychologist")
     reviews: Mapped[List["Review"]] = relationship("Review", back_populates="psychologist")
-
-    @hybrid_property
-    def rating(self) -> float:
-        if not self.reviews:
-            return 0.0
-        return sum(review.rating for review in self.reviews) / len(self.reviews)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, Table, Column
+from sqlalchemy import ForeignKey, Integer, Table, Column, Index
 from sqlalchemy.orm import mapped_column
 from app.core.database import Base
 
@@ -7,4 +7,11 @@ psychologist_specializations = Table(
     Base.metadata,
     Column("psychologist_id", Integer, ForeignKey("psychologists.id"), primary_key=True),
     Column("specialization_id", Integer, ForeignKey("specializations.id"), primary_key=True),
-)
\ No newline at end of file
+)
+
+# выборка психологов по специализации (PK начинается с psychologist_id и здесь не помогает)
+Index(
+    "ix_psychologist_specializations_specialization_id",
+    psychologist_specializations.c.specialization_id,
+    psychologist_specializations.c.psychologist_id,
+)
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, ForeignKey, Text, DateTime
+from sqlalchemy import Integer, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.core.database import Base
 
@@ -10,13 +10,18 @@ if TYPE_CHECKING:
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # keyset-страницы отзывов психолога: новые первыми и по оценке
+        Index("ix_reviews_psychologist_id_created_at", "psychologist_id", "created_at"),
+        Index("ix_reviews_psychologist_id_rating_created_at", "psychologist_id", "rating", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     client_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     psychologist_id: Mapped[int] = mapped_column(ForeignKey("psychologists.id"))
     rating: Mapped[int] = mapped_column(Integer, nullable=False)
     comment: Mapped[str] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
 
     client: Mapped["User"] = relationship("User", back_populates="reviews")
     psychologist: Mapped["Psychologist"] = relationship("Psychologist", back_populates="reviews")
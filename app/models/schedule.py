@@ -10,7 +10,7 @@ class Schedule(Base):
     __tablename__ = "schedule"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    psychologist_id: Mapped[int] = mapped_column(ForeignKey("psychologists.id"))
+    psychologist_id: Mapped[int] = mapped_column(ForeignKey("psychologists.id"), index=True)
     day_of_week: Mapped[int] = mapped_column(Integer, nullable=False)
     start_time: Mapped[Time] = mapped_column(Time, nullable=False)
     end_time: Mapped[Time] = mapped_column(Time, nullable=False)
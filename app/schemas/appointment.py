@@ -1,37 +1,75 @@
-from pydantic import BaseModel, Field, field_validator
-from datetime import datetime, timezone
-from typing import Any
+from pydantic import BaseModel, Field, field_validator, ValidationInfo
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from app.schemas.enums import AppointmentStatus
 
+# ограничение длительности держит проверку пересечений в узком диапазоне индекса
+MAX_APPOINTMENT_DURATION = timedelta(hours=8)
+# записей в одном PATCH /appointments/status
+MAX_STATUS_BATCH = 500
+
+# чьи записи: клиента (client_id) или психолога (psychologist_id)
+AppointmentView = Literal["client", "psychologist"]
+StatusOutcome = Literal["updated", "unchanged", "not_found", "forbidden", "invalid_transition"]
+
 class AppointmentBase(BaseModel):
-    client_id: int
     psychologist_id: int
     start_time: datetime
     end_time: datetime
     price: Decimal = Field(..., gt=0)
 
-    @field_validator("start_time", mode="before")
+class AppointmentCreate(AppointmentBase):
+    status: AppointmentStatus = Field(default=AppointmentStatus.pending, description="Статус записи")
+
+    # проверки только на создании: прошедшие записи должны читаться без ошибок
+    @field_validator("start_time")
     @classmethod
     def validate_start_time(cls, value: datetime) -> datetime:
-        if value <= datetime.now(timezone.utc):
+        now = datetime.now(timezone.utc) if value.tzinfo else datetime.utcnow()
+        if value <= now:
             raise ValueError("Время начала должно быть в будущем")
         return value
 
-    @field_validator("end_time", mode="before")
+    @field_validator("end_time")
     @classmethod
-    def validate_end_time(cls, value: datetime, values: dict[str, Any]) -> datetime:
-        start_time = values.get("start_time")
+    def validate_end_time(cls, value: datetime, info: ValidationInfo) -> datetime:
+        start_time = info.data.get("start_time")
         if start_time and value <= start_time:
             raise ValueError("время окончания должно быть позже начала")
+        if start_time and value - start_time > MAX_APPOINTMENT_DURATION:
+            raise ValueError("запись не может быть длиннее 8 часов")
         return value
 
-class AppointmentCreate(AppointmentBase):
-    status: AppointmentStatus = Field(default=AppointmentStatus.pending, description="Статус записи")
-
 class AppointmentRead(AppointmentBase):
     id: int
+    client_id: int
     status: AppointmentStatus
 
     class Config:
         from_attributes = True
+
+class AppointmentStatusBatch(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_STATUS_BATCH)
+    status: AppointmentStatus
+
+class AppointmentStatusResult(BaseModel):
+    id: int
+    outcome: StatusOutcome
+    status: Optional[AppointmentStatus] = Field(None, description="Текущий статус; для чужих и несуществующих записей — null")
+
+class AppointmentPage(BaseModel):
+    items: List[AppointmentRead]
+    next_cursor: Optional[str] = None
+
+class AppointmentDayCount(BaseModel):
+    """Число записей за день (по UTC) — для календаря."""
+    day: date
+    total: int
+    pending: int = 0
+    confirmed: int = 0
+    canceled: int = 0
+
+class CalendarFeedToken(BaseModel):
+    token: str
+    url: str = Field(..., description="Адрес ленты .ics для подписки во внешнем календаре")
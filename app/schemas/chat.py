@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, timezone
+from typing import List, Optional
 
 class ChatBase(BaseModel):
     sender_id: int
@@ -15,3 +16,15 @@ class ChatRead(ChatBase):
 
     class Config:
         from_attributes = True
+
+class ConversationRead(BaseModel):
+    counterpart_id: int
+    last_message: ChatRead
+
+class ConversationPage(BaseModel):
+    items: List[ConversationRead]
+    next_cursor: Optional[str] = None
+
+class ChatPage(BaseModel):
+    items: List[ChatRead]
+    next_cursor: Optional[str] = None
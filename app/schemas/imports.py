@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal
+from app.schemas.psychologist import PsychologistCreate
+
+ImportKind = Literal["specializations", "psychologists", "schedule"]
+
+class PsychologistImport(PsychologistCreate):
+    """В CSV специализации перечисляются в одной ячейке: «1;4;7»."""
+
+    @field_validator("specialization_ids", mode="before")
+    @classmethod
+    def split_ids(cls, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [part for part in value.replace(",", ";").split(";") if part.strip()]
+        return value
+
+class ImportRowError(BaseModel):
+    row: int = Field(..., description="Номер строки файла (CSV — с заголовком) или элемента массива, с 1")
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    kind: ImportKind
+    received: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = Field(default=[], description="Первые ошибки, не больше IMPORT_MAX_ERRORS")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import time
 from decimal import Decimal
 from typing import List, Optional, TYPE_CHECKING
@@ -8,7 +8,7 @@ from app.schemas.review import ReviewRead
 from app.schemas.appointment import AppointmentRead
 
 if TYPE_CHECKING:
-    from app.schemas.specialization import SpecializationRead
+    from app.schemas.specialization import SpecializationShort
 
 class PsychologistBase(BaseModel):
     experience: int = Field(..., ge=0, description="Опыт работы в годах")
@@ -22,13 +22,42 @@ class PsychologistCreate(PsychologistBase):
 class PsychologistRead(PsychologistBase):
     id: int
     user: UserRead
-    specializations: List["SpecializationRead"] = [] # строка!!!
+    specializations: List["SpecializationShort"] = [] # строка!!!
     schedule: List[ScheduleRead] = []
-    reviews: List[ReviewRead] = []
+    reviews: List[ReviewRead] = Field(default=[], description="Последние отзывы, не все")
+    review_count: int = Field(0, validation_alias=AliasChoices("review_count", "rating_count"))
     rating: float
 
     class Config:
         from_attributes = True
 
-from app.schemas.specialization import SpecializationRead  # Импорт ТОЛЬКО здесь!
+class PsychologistSummary(BaseModel):
+    """Краткая карточка психолога для каталога."""
+    id: int
+    full_name: str
+    experience: int
+    price_per_hour: Optional[Decimal] = None
+    rating: float
+    review_count: int
+
+    class Config:
+        from_attributes = True
+
+class PsychologistPage(BaseModel):
+    items: List[PsychologistSummary]
+    next_cursor: Optional[str] = None
+
+class RecommendationScores(BaseModel):
+    """Составляющие оценки, каждая от 0 до 1."""
+    specializations: float
+    price: float
+    rating: float
+    experience: float
+    schedule: float
+
+class PsychologistRecommendation(PsychologistSummary):
+    score: float = Field(..., description="Взвешенная сумма составляющих, от 0 до 1")
+    scores: RecommendationScores
+
+from app.schemas.specialization import SpecializationShort  # Импорт ТОЛЬКО здесь!
 PsychologistRead.model_rebuild()
\ No newline at end of file
@@ -1,10 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Literal, Optional
+
+# новые первыми по умолчанию; при сортировке по оценке равные — по времени в ту же сторону
+ReviewSort = Literal["-created_at", "created_at", "-rating", "rating"]
 
 class ReviewBase(BaseModel):
     client_id: int
     psychologist_id: int
-    rating: int
+    rating: int = Field(..., ge=1, le=5)
     comment: str | None = None
 
 class ReviewRead(ReviewBase):
@@ -13,3 +17,16 @@ class ReviewRead(ReviewBase):
 
     class Config:
         from_attributes = True
+
+class ReviewPage(BaseModel):
+    items: List[ReviewRead]
+    next_cursor: Optional[str] = None
+
+class ReviewSummary(BaseModel):
+    psychologist_id: int
+    review_count: int
+    rating: float = Field(..., description="Среднее по всем отзывам")
+    histogram: dict[int, int] = Field(..., description="Число отзывов с оценкой 1–5")
+    decayed_rating: Optional[float] = Field(None, description="Среднее, где вес отзыва вдвое меньше каждые half_life_days")
+    recent_weight: float = Field(..., description="Сумма весов отзывов сейчас — сколько «свежих» отзывов стоит за decayed_rating")
+    half_life_days: float
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import time
+from datetime import datetime, time
 
 class ScheduleBase(BaseModel):
     psychologist_id: int
@@ -15,3 +15,7 @@ class ScheduleRead(ScheduleBase):
 
     class Config:
         from_attributes = True
+
+class SlotRead(BaseModel):
+    start_time: datetime
+    end_time: datetime
@@ -1,8 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Literal, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from app.schemas.psychologist import PsychologistRead  # Импорт ТОЛЬКО для аннотаций
+    from app.schemas.psychologist import PsychologistRead, PsychologistSummary  # Импорт ТОЛЬКО для аннотаций
+
+# ?expand= для GET /specializations/{id}: краткие карточки или полные профили участников
+SpecializationExpand = Literal["psychologists", "psychologists.profile"]
 
 class SpecializationBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=255, description="Название специализации")
@@ -11,12 +14,26 @@ class SpecializationBase(BaseModel):
 class SpecializationCreate(SpecializationBase):
     pass
 
+class SpecializationShort(SpecializationBase):
+    """Специализация без списка психологов — для вложения в профиль психолога."""
+    id: int
+
+    class Config:
+        from_attributes = True
+
 class SpecializationRead(SpecializationBase):
+    """Психологи не встраиваются: постранично — /specializations/{id}/psychologists, целиком — ?expand=."""
     id: int
-    psychologists: List["PsychologistRead"] = []  
+    psychologist_count: int = 0
+    psychologists: Optional[List["PsychologistSummary"]] = None
 
     class Config:
         from_attributes = True
 
-from app.schemas.psychologist import PsychologistRead  
+class SpecializationProfilesRead(SpecializationRead):
+    """Ответ с ?expand=psychologists.profile."""
+    psychologists: List["PsychologistRead"] = []
+
+from app.schemas.psychologist import PsychologistRead, PsychologistSummary  
 SpecializationRead.model_rebuild()  
+SpecializationProfilesRead.model_rebuild()
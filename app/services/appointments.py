@@ -0,0 +1,112 @@
+"""Записи клиента и психолога: выборка по периоду, допустимые переходы статусов и пакетное обновление."""
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import Principal
+from app.models.appointment import Appointment
+from app.schemas.appointment import AppointmentView, StatusOutcome
+from app.schemas.enums import AppointmentStatus
+from app.services.availability import to_naive_utc
+
+# дневная сводка считается по всему периоду сразу, поэтому период ограничен
+MAX_CALENDAR_RANGE = timedelta(days=366)
+
+# время отменённой записи могли уже занять, поэтому из canceled выхода нет
+STATUS_TRANSITIONS: dict[AppointmentStatus, frozenset[AppointmentStatus]] = {
+    AppointmentStatus.pending: frozenset({AppointmentStatus.confirmed, AppointmentStatus.canceled}),
+    AppointmentStatus.confirmed: frozenset({AppointmentStatus.canceled}),
+    AppointmentStatus.canceled: frozenset(),
+}
+
+def can_transition(current: AppointmentStatus, target: AppointmentStatus) -> bool:
+    """Повторная установка того же статуса допустима и ничего не меняет."""
+    return current == target or target in STATUS_TRANSITIONS[current]
+
+async def change_statuses(
+    db: AsyncSession,
+    psychologist_id: int | None,
+    appointment_ids: list[int],
+    status: AppointmentStatus,
+) -> list[dict]:
+    """Итог по каждому id в порядке запроса; commit — за вызывающим.
+
+    Проверка владельца и перехода — в WHERE того же UPDATE, поэтому гонки между
+    проверкой и записью нет. Причины отказа читаются одним SELECT и только для
+    не обновлённых id.
+    """
+    ids = list(dict.fromkeys(appointment_ids))
+    sources = [current for current, targets in STATUS_TRANSITIONS.items() if status in targets]
+    updated: set[int] = set()
+    if psychologist_id is not None and sources:
+        updated = set(await db.scalars(
+            update(Appointment)
+            .where(
+                Appointment.id.in_(ids),
+                Appointment.psychologist_id == psychologist_id,
+                Appointment.status.in_(sources),
+            )
+            .values(status=status)
+            .returning(Appointment.id)
+        ))
+
+    rest = [appointment_id for appointment_id in ids if appointment_id not in updated]
+    found = {
+        row.id: row
+        for row in await db.execute(
+            select(Appointment.id, Appointment.psychologist_id, Appointment.status).where(Appointment.id.in_(rest))
+        )
+    } if rest else {}
+
+    results = []
+    for appointment_id in ids:
+        row = found.get(appointment_id)
+        if appointment_id in updated:
+            outcome: StatusOutcome = "updated"
+            current = status
+        elif row is None:
+            outcome, current = "not_found", None
+        elif row.psychologist_id != psychologist_id:
+            outcome, current = "forbidden", None  # чужую запись не раскрываем
+        elif row.status == status:
+            outcome, current = "unchanged", row.status
+        else:
+            outcome, current = "invalid_transition", row.status
+        results.append({"id": appointment_id, "outcome": outcome, "status": current})
+    return results
+
+def resolve_view(principal: Principal, view: AppointmentView | None) -> AppointmentView:
+    if view is None:
+        return "psychologist" if principal.psychologist_id is not None else "client"
+    if view == "psychologist" and principal.psychologist_id is None:
+        raise HTTPException(status_code=403, detail="У пользователя нет профиля психолога")
+    return view
+
+def appointments_filter(
+    principal: Principal,
+    view: AppointmentView | None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    statuses: list[AppointmentStatus] | None = None,
+) -> list:
+    """Условия WHERE для записей пользователя с началом в [start, end).
+
+    view по умолчанию — psychologist, если у пользователя есть профиль психолога.
+    Оба вида идут по индексам (psychologist_id | client_id, start_time).
+    """
+    if resolve_view(principal, view) == "client":
+        conditions = [Appointment.client_id == principal.id]
+    else:
+        conditions = [Appointment.psychologist_id == principal.psychologist_id]
+
+    start = to_naive_utc(start) if start else None
+    end = to_naive_utc(end) if end else None
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="from должно быть раньше to")
+    if start:
+        conditions.append(Appointment.start_time >= start)
+    if end:
+        conditions.append(Appointment.start_time < end)
+    if statuses:
+        conditions.append(Appointment.status.in_(statuses))
+    return conditions
@@ -0,0 +1,88 @@
+"""Свободные окна психолога: недельное расписание минус занятые записи.
+
+Все интервалы полуоткрытые [start, end) и в наивном UTC, как в БД.
+"""
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterable, Sequence
+
+Interval = tuple[datetime, datetime]
+
+def to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def expand_schedule(rules: Iterable[tuple[int, time, time]], start: datetime, end: datetime) -> list[Interval]:
+    """Разворачивает правила (day_of_week, start_time, end_time) в конкретные окна внутри [start, end)."""
+    by_weekday: dict[int, list[tuple[time, time]]] = {}
+    for day_of_week, rule_start, rule_end in rules:
+        by_weekday.setdefault(day_of_week, []).append((rule_start, rule_end))
+
+    windows = []
+    # с предыдущего дня — ночная смена могла начаться до start
+    day = start.date() - timedelta(days=1)
+    while day <= end.date():
+        for rule_start, rule_end in by_weekday.get(day.weekday(), ()):
+            window_start = datetime.combine(day, rule_start)
+            window_end = datetime.combine(day, rule_end)
+            if rule_end <= rule_start:  # смена через полночь
+                window_end += timedelta(days=1)
+            window_start, window_end = max(window_start, start), min(window_end, end)
+            if window_start < window_end:
+                windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return merge_intervals(windows)
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def subtract_intervals(windows: Sequence[Interval], busy: Sequence[Interval]) -> list[Interval]:
+    """Вычитает занятые интервалы из окон; оба списка отсортированы и слиты."""
+    free = []
+    j = 0
+    for window_start, window_end in windows:
+        cursor = window_start
+        # занятые интервалы, закончившиеся до окна, больше не понадобятся
+        while j < len(busy) and busy[j][1] <= window_start:
+            j += 1
+        k = j
+        while k < len(busy) and busy[k][0] < window_end:
+            busy_start, busy_end = busy[k]
+            if busy_start > cursor:
+                free.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            k += 1
+        if cursor < window_end:
+            free.append((cursor, window_end))
+    return free
+
+def split_into_slots(free: Iterable[Interval], duration: timedelta) -> list[Interval]:
+    slots = []
+    for start, end in free:
+        while start + duration <= end:
+            slots.append((start, start + duration))
+            start += duration
+    return slots
+
+def free_slots(
+    rules: Iterable[tuple[int, time, time]],
+    appointments: Iterable[Interval],
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+) -> list[Interval]:
+    windows = expand_schedule(rules, start, end)
+    busy = merge_intervals(appointments)
+    return split_into_slots(subtract_intervals(windows, busy), duration)
+
+def fits_schedule(rules: Iterable[tuple[int, time, time]], start: datetime, end: datetime) -> bool:
+    """Целиком ли интервал попадает в одно рабочее окно."""
+    windows = expand_schedule(rules, start, end)
+    return len(windows) == 1 and windows[0] == (start, end)
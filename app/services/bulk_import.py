@@ -0,0 +1,302 @@
+"""Массовый импорт специализаций, психологов и недельного расписания.
+
+Строки обрабатываются пачками по IMPORT_CHUNK_SIZE: пачка валидируется по схеме,
+проверки по БД делаются одним запросом на пачку, вставка — многострочным INSERT,
+затем commit. Ошибочные строки попадают в отчёт и пропускаются; если пачку
+отклонила сама БД, в отчёт попадают все её принятые строки, следующие пачки
+импортируются дальше. Специализации upsert'ятся по уникальному name.
+"""
+import codecs
+import csv
+import os
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import invalidate_principal
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.schemas.imports import ImportKind, ImportReport, ImportRowError, PsychologistImport
+from app.schemas.schedule import ScheduleCreate
+from app.schemas.specialization import SpecializationCreate
+from app.services.catalog_cache import invalidate_psychologists
+from app.services.search import reindex_psychologists
+from app.services.weekly_availability import rebuild_availability
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _JSONError = orjson.JSONDecodeError
+except ImportError:  # без orjson — обычный json
+    import json
+    _loads = json.loads
+    _JSONError = ValueError
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "2000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+IMPORT_MAX_LINE = int(os.getenv("IMPORT_MAX_LINE", str(1 << 20)))
+
+# (номер строки, поля) или (номер строки, текст ошибки разбора)
+Record = tuple[int, dict | str]
+
+@dataclass
+class Affected:
+    """Что сбросить из кэшей после commit пачки."""
+    psychologists: set[int] = field(default_factory=set)
+    specializations: set[int] = field(default_factory=set)
+    users: set[int] = field(default_factory=set)
+    schedule: bool = False
+
+Fail = Callable[[int, list[str]], None]
+
+def _describe(error: dict) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+def _validate(schema: type[BaseModel], records: list[Record], fail: Fail) -> list[tuple[int, BaseModel]]:
+    valid = []
+    for row, data in records:
+        if isinstance(data, str):
+            fail(row, [data])
+            continue
+        try:
+            valid.append((row, schema.model_validate(data)))
+        except ValidationError as exc:
+            fail(row, [_describe(error) for error in exc.errors()])
+    return valid
+
+# INSERT ... ON CONFLICT есть только в диалектных insert()
+_UPSERT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _upsert_insert(db: AsyncSession, table):
+    dialect = db.bind.dialect.name
+    try:
+        return _UPSERT_INSERT[dialect](table)
+    except KeyError:
+        raise RuntimeError(f"upsert не поддерживается для {dialect!r}, доступны: {', '.join(_UPSERT_INSERT)}")
+
+async def _import_specializations(db: AsyncSession, records: list[Record], fail: Fail) -> tuple[list[int], Affected]:
+    valid = _validate(SpecializationCreate, records, fail)
+    # повтор имени внутри пачки: побеждает последняя строка, как и при повторном импорте
+    by_name = {item.name: item for _, item in valid}
+    if not by_name:
+        return [], Affected()
+
+    table = Specialization.__table__
+    stmt = _upsert_insert(db, table)
+    description = func.coalesce(stmt.excluded.description, table.c.description)  # пустое описание не затирает старое
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={"description": description},
+        where=table.c.description.is_distinct_from(description),
+    ).returning(table.c.id)
+    # RETURNING отдаёт только новые и изменённые строки — их ответы и профили их участников и устарели
+    changed = set((await db.scalars(stmt, [item.model_dump() for item in by_name.values()])).all())
+    members = set(await db.scalars(
+        select(psychologist_specializations.c.psychologist_id)
+        .where(psychologist_specializations.c.specialization_id.in_(changed))
+    )) if changed else set()
+    await reindex_psychologists(db, members)
+    return [row for row, _ in valid], Affected(psychologists=members, specializations=changed)
+
+async def _import_psychologists(db: AsyncSession, records: list[Record], fail: Fail) -> tuple[list[int], Affected]:
+    valid = _validate(PsychologistImport, records, fail)
+    user_ids = {item.user_id for _, item in valid}
+    specialization_ids = {specialization_id for _, item in valid for specialization_id in item.specialization_ids}
+    users = set(await db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+    taken = set(await db.scalars(select(Psychologist.user_id).where(Psychologist.user_id.in_(user_ids)))) if user_ids else set()
+    known = set(await db.scalars(
+        select(Specialization.id).where(Specialization.id.in_(specialization_ids))
+    )) if specialization_ids else set()
+
+    accepted: list[tuple[int, PsychologistImport]] = []
+    for row, item in valid:
+        errors = []
+        if item.user_id not in users:
+            errors.append(f"user_id: пользователь {item.user_id} не найден")
+        elif item.user_id in taken:
+            errors.append(f"user_id: у пользователя {item.user_id} уже есть профиль психолога")
+        missing = sorted(set(item.specialization_ids) - known)
+        if missing:
+            errors.append(f"specialization_ids: не найдены {', '.join(map(str, missing))}")
+        if errors:
+            fail(row, errors)
+            continue
+        taken.add(item.user_id)  # второй профиль того же пользователя в этой же пачке
+        accepted.append((row, item))
+    if not accepted:
+        return [], Affected()
+
+    table = Psychologist.__table__
+    created = dict((await db.execute(
+        insert(table).returning(table.c.user_id, table.c.id),
+        [item.model_dump(exclude={"specialization_ids"}) for _, item in accepted],
+    )).all())
+    links = [
+        {"psychologist_id": created[item.user_id], "specialization_id": specialization_id}
+        for _, item in accepted
+        for specialization_id in set(item.specialization_ids)
+    ]
+    if links:
+        await db.execute(insert(psychologist_specializations), links)
+    await reindex_psychologists(db, created.values())
+    return [row for row, _ in accepted], Affected(
+        psychologists=set(created.values()),
+        specializations={link["specialization_id"] for link in links},
+        users=set(created),
+    )
+
+async def _import_schedule(db: AsyncSession, records: list[Record], fail: Fail) -> tuple[list[int], Affected]:
+    valid = _validate(ScheduleCreate, records, fail)
+    psychologist_ids = {item.psychologist_id for _, item in valid}
+    existing = set(await db.scalars(
+        select(Psychologist.id).where(Psychologist.id.in_(psychologist_ids))
+    )) if psychologist_ids else set()
+
+    accepted: list[tuple[int, ScheduleCreate]] = []
+    for row, item in valid:
+        errors = []
+        if item.day_of_week not in range(0, 7):
+            errors.append("day_of_week: ожидается 0..6, понедельник — 0")
+        if item.psychologist_id not in existing:
+            errors.append(f"psychologist_id: психолог {item.psychologist_id} не найден")
+        if errors:
+            fail(row, errors)
+        else:
+            accepted.append((row, item))
+    if not accepted:
+        return [], Affected()
+
+    await db.execute(insert(Schedule.__table__), [item.model_dump() for _, item in accepted])
+    affected = {item.psychologist_id for _, item in accepted}
+    await rebuild_availability(db, affected)
+    return [row for row, _ in accepted], Affected(psychologists=affected, schedule=True)
+
+Importer = Callable[[AsyncSession, list[Record], Fail], Awaitable[tuple[list[int], Affected]]]
+
+IMPORTERS: dict[str, Importer] = {
+    "specializations": _import_specializations,
+    "psychologists": _import_psychologists,
+    "schedule": _import_schedule,
+}
+
+async def _chunks(records: AsyncIterable[Record], size: int) -> AsyncIterator[list[Record]]:
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def import_records(db: AsyncSession, kind: ImportKind, records: AsyncIterable[Record]) -> ImportReport:
+    """Импортирует поток записей пачками; каждая пачка — отдельная транзакция."""
+    importer = IMPORTERS[kind]
+    report = ImportReport(kind=kind, received=0, imported=0, failed=0)
+    rejected: set[int] = set()  # строки текущей пачки, уже попавшие в отчёт
+
+    def fail(row: int, errors: list[str]) -> None:
+        rejected.add(row)
+        report.failed += 1
+        if len(report.errors) < IMPORT_MAX_ERRORS:
+            report.errors.append(ImportRowError(row=row, errors=errors))
+
+    async for chunk in _chunks(records, IMPORT_CHUNK_SIZE):
+        report.received += len(chunk)
+        rejected.clear()
+        try:
+            rows, affected = await importer(db, chunk, fail)
+            await db.commit()
+        except DBAPIError as exc:
+            await db.rollback()
+            reason = str(exc.orig).splitlines()[0] if exc.orig else str(exc)
+            for row in [row for row, _ in chunk if row not in rejected]:
+                fail(row, [f"пачка отклонена БД: {reason}"])
+            continue
+        report.imported += len(rows)
+        for user_id in affected.users:
+            # у пользователя появился профиль психолога — закэшированный principal устарел
+            invalidate_principal(user_id)
+        await invalidate_psychologists(db, affected.psychologists, affected.schedule, affected.specializations)
+    report.errors.sort(key=lambda error: error.row)
+    return report
+
+async def from_items(items: Iterable[dict]) -> AsyncIterator[Record]:
+    """Элементы JSON-массива с номерами с 1."""
+    for row, item in enumerate(items, 1):
+        yield row, item if isinstance(item, dict) else "ожидается JSON-объект"
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str | None]]:
+    """Строки потока с номерами с 1; None вместо строки длиннее IMPORT_MAX_LINE."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    number = 0
+    skipping = False
+    async for chunk in chunks:
+        *complete, buffer = (buffer + decoder.decode(chunk)).split("\n")
+        for line in complete:
+            number += 1
+            yield number, None if skipping else line.rstrip("\r")
+            skipping = False
+        if len(buffer) > IMPORT_MAX_LINE:
+            buffer, skipping = "", True
+    buffer += decoder.decode(b"", final=True)
+    if buffer or skipping:
+        yield number + 1, None if skipping else buffer.rstrip("\r")
+
+TOO_LONG = f"строка длиннее {IMPORT_MAX_LINE} символов"
+
+async def ndjson_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[Record]:
+    """Одна строка — один JSON-объект; пустые строки пропускаются."""
+    async for number, line in _lines(chunks):
+        if line is None:
+            yield number, TOO_LONG
+        elif line.strip():
+            try:
+                data = _loads(line)
+            except _JSONError as exc:
+                yield number, f"некорректный JSON: {exc}"
+                continue
+            yield number, data if isinstance(data, dict) else "ожидается JSON-объект"
+
+async def csv_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[Record]:
+    """CSV с заголовком; пустая ячейка — None. Поле в кавычках может занимать несколько строк."""
+    header: list[str] | None = None
+    pending, start = None, 0
+    async for number, line in _lines(chunks):
+        if line is None:
+            yield (start if pending is not None else number), TOO_LONG
+            pending = None
+            continue
+        if pending is None:
+            pending, start = line, number
+        else:
+            pending += "\n" + line
+        if pending.count('"') % 2:  # кавычка ещё не закрыта — запись продолжается на следующей строке
+            if len(pending) > IMPORT_MAX_LINE:
+                yield start, TOO_LONG
+                pending = None
+            continue
+        record, pending = pending, None
+        if not record.strip():
+            continue
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as exc:
+            yield start, f"некорректный CSV: {exc}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+        elif len(values) != len(header):
+            yield start, f"ожидалось колонок: {len(header)}, в строке: {len(values)}"
+        else:
+            yield start, {name: value if value != "" else None for name, value in zip(header, values)}
+    if pending is not None:
+        yield start, "незакрытая кавычка"
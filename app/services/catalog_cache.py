@@ -0,0 +1,65 @@
+"""Какие закэшированные ответы каталога устаревают при изменении психолога.
+
+Психолог входит в ответы своих специализаций (число участников, ?expand=),
+поэтому вместе с профилем сбрасываются и они. Вызывать после commit.
+Все изменения каталога проходят через эти функции, поэтому они же публикуют
+события PSYCHOLOGISTS_CHANGED и SPECIALIZATIONS_CHANGED для подписчиков процесса.
+"""
+from typing import Iterable, get_args
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.events import PSYCHOLOGISTS_CHANGED, SPECIALIZATIONS_CHANGED, publish
+from app.core.response_cache import response_cache
+from app.models.psychologist_specialization import psychologist_specializations
+from app.schemas.specialization import SpecializationExpand
+
+PSYCHOLOGIST = "psychologist"
+SPECIALIZATION = "specialization"
+SCHEDULE = "schedule"
+
+def specialization_key(specialization_id: int, expand: SpecializationExpand | None = None) -> str:
+    return f"{specialization_id}:{expand}" if expand else str(specialization_id)
+
+def specialization_keys(specialization_id: int) -> list[str]:
+    """Все варианты ответа специализации (с разными ?expand=)."""
+    return [specialization_key(specialization_id, expand) for expand in (None, *get_args(SpecializationExpand))]
+
+async def invalidate_psychologist(
+    db: AsyncSession,
+    psychologist_id: int,
+    schedule: bool = False,
+    specialization_ids: Iterable[int] = (),
+) -> None:
+    """specialization_ids — дополнительно сбросить, например специализации, из которых психолога убрали."""
+    await invalidate_psychologists(db, [psychologist_id], schedule, specialization_ids)
+
+async def invalidate_psychologists(
+    db: AsyncSession,
+    psychologist_ids: Iterable[int],
+    schedule: bool = False,
+    specialization_ids: Iterable[int] = (),
+) -> None:
+    """То же для пачки психологов: их специализации читаются одним запросом."""
+    psychologist_ids = list(psychologist_ids)
+    specialization_ids = list(specialization_ids)
+    current = await db.scalars(
+        select(psychologist_specializations.c.specialization_id)
+        .where(psychologist_specializations.c.psychologist_id.in_(psychologist_ids))
+        .distinct()
+    ) if psychologist_ids else []
+    await response_cache.invalidate(PSYCHOLOGIST, *psychologist_ids)
+    await response_cache.invalidate(SPECIALIZATION, *(
+        key for specialization_id in {*current, *specialization_ids} for key in specialization_keys(specialization_id)
+    ))
+    if schedule:
+        await response_cache.invalidate(SCHEDULE, *psychologist_ids)
+    await publish(PSYCHOLOGISTS_CHANGED, psychologist_ids)
+    await publish(SPECIALIZATIONS_CHANGED, specialization_ids)
+
+async def invalidate_specializations(specialization_ids: Iterable[int]) -> None:
+    """Изменились сами специализации (название, описание), а не их участники."""
+    specialization_ids = list(specialization_ids)
+    await response_cache.invalidate(SPECIALIZATION, *(
+        key for specialization_id in specialization_ids for key in specialization_keys(specialization_id)
+    ))
+    await publish(SPECIALIZATIONS_CHANGED, specialization_ids)
@@ -0,0 +1,65 @@
+"""Лента записей в формате iCalendar (RFC 5545): календарь собирается построчно, без документа в памяти."""
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator
+from app.schemas.enums import AppointmentStatus
+
+PRODID = "-//SpecialistPickingService//Appointments//RU"
+UID_DOMAIN = "specialist-picking"
+
+# отменённые записи остаются в ленте со STATUS:CANCELLED — так календарь их и удалит
+EVENT_STATUS = {
+    AppointmentStatus.pending: "TENTATIVE",
+    AppointmentStatus.confirmed: "CONFIRMED",
+    AppointmentStatus.canceled: "CANCELLED",
+}
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+def _fold(line: str) -> str:
+    """Строки длиннее 75 октетов переносятся с пробелом в начале продолжения."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:  # не режем символ UTF-8 пополам
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+def _utc(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")  # в БД наивное UTC
+
+def calendar_header(name: str) -> str:
+    return "".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN", "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ))
+
+def event(appointment_id: int, start: datetime, end: datetime, status: AppointmentStatus, updated_at: datetime, summary: str) -> str:
+    return "".join(_fold(line) for line in (
+        "BEGIN:VEVENT",
+        f"UID:appointment-{appointment_id}@{UID_DOMAIN}",
+        f"DTSTAMP:{_utc(updated_at)}",
+        f"LAST-MODIFIED:{_utc(updated_at)}",
+        f"DTSTART:{_utc(start)}",
+        f"DTEND:{_utc(end)}",
+        f"SUMMARY:{_escape(summary)}",
+        f"STATUS:{EVENT_STATUS[status]}",
+        "END:VEVENT",
+    ))
+
+async def calendar(name: str, events: AsyncIterable[str], batch: int = 100) -> AsyncIterator[bytes]:
+    """Поток байтов календаря; события склеиваются по batch, чтобы не писать в сокет на каждое."""
+    yield calendar_header(name).encode("utf-8")
+    buffer = []
+    async for item in events:
+        buffer.append(item)
+        if len(buffer) == batch:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+    buffer.append("END:VCALENDAR\r\n")
+    yield "".join(buffer).encode("utf-8")
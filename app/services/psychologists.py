@@ -0,0 +1,135 @@
+"""Чтение психологов для API: профили с ограниченной вложенностью и страницы кратких карточек."""
+from decimal import Decimal
+from typing import Literal, Sequence
+from sqlalchemy import select, exists, func
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import encode_cursor, decode_keyset_cursor, keyset_after, keyset_order
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.review import Review
+from app.models.user import User
+from app.schemas.psychologist import PsychologistSummary, PsychologistPage
+from app.services.read_model import catalog
+
+# сколько последних отзывов встраивается в профиль; остальные — через /reviews
+PROFILE_REVIEWS_LIMIT = 10
+
+CatalogSort = Literal["-rating", "rating", "-price", "price"]
+
+def _profile_query():
+    return select(Psychologist).options(
+        joinedload(Psychologist.user),  # many-to-one, строк не размножает
+        selectinload(Psychologist.specializations),
+        selectinload(Psychologist.schedule),
+    ).execution_options(populate_existing=True)
+
+async def load_profile(db: AsyncSession, psychologist_id: int) -> Psychologist | None:
+    """Профиль без декартова произведения: коллекции грузятся отдельными selectin-запросами,
+    из отзывов — только PROFILE_REVIEWS_LIMIT последних (их общее число — rating_count)."""
+    psychologist = await db.scalar(_profile_query().where(Psychologist.id == psychologist_id))
+    if psychologist is None:
+        return None
+    latest_reviews = (await db.scalars(
+        select(Review)
+        .where(Review.psychologist_id == psychologist_id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .limit(PROFILE_REVIEWS_LIMIT)
+    )).all()
+    # без истории изменений: иначе flush отвязал бы от психолога отзывы, не попавшие в выборку
+    set_committed_value(psychologist, "reviews", latest_reviews)
+    return psychologist
+
+async def load_profiles(db: AsyncSession, psychologist_ids: Sequence[int]) -> list[Psychologist]:
+    """То же для многих психологов сразу: последние отзывы каждого — одним запросом с row_number()."""
+    if not psychologist_ids:
+        return []
+    psychologists = (await db.scalars(
+        _profile_query().where(Psychologist.id.in_(psychologist_ids)).order_by(Psychologist.id)
+    )).all()
+
+    ranked = select(
+        Review,
+        func.row_number().over(
+            partition_by=Review.psychologist_id,
+            order_by=(Review.created_at.desc(), Review.id.desc()),
+        ).label("position"),
+    ).where(Review.psychologist_id.in_(psychologist_ids)).subquery()
+    latest = aliased(Review, ranked)
+    reviews_by_psychologist: dict[int, list[Review]] = {}
+    for review in await db.scalars(
+        select(latest)
+        .where(ranked.c.position <= PROFILE_REVIEWS_LIMIT)
+        .order_by(ranked.c.psychologist_id, ranked.c.position)
+    ):
+        reviews_by_psychologist.setdefault(review.psychologist_id, []).append(review)
+
+    for psychologist in psychologists:
+        set_committed_value(psychologist, "reviews", reviews_by_psychologist.get(psychologist.id, []))
+    return list(psychologists)
+
+def summary_query():
+    """Колонки краткой карточки PsychologistSummary."""
+    return select(
+        Psychologist.id,
+        User.full_name,
+        Psychologist.experience,
+        Psychologist.price_per_hour,
+        Psychologist.rating,
+        Psychologist.rating_count.label("review_count"),
+    ).join(User, User.id == Psychologist.user_id)
+
+def in_specialization(specialization_id: int):
+    return exists().where(
+        psychologist_specializations.c.specialization_id == specialization_id,
+        psychologist_specializations.c.psychologist_id == Psychologist.id,
+    )
+
+async def psychologist_page(
+    db: AsyncSession,
+    *,
+    specialization_id: int | None = None,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
+    min_rating: float | None = None,
+    min_experience: int | None = None,
+    sort: CatalogSort = "-rating",
+    limit: int = 20,
+    cursor: str | None = None,
+) -> PsychologistPage:
+    """Страница кратких карточек с фильтрами и keyset-пагинацией по (sort, id)."""
+    if catalog.ready:
+        return catalog.data.page(
+            specialization_id=specialization_id, min_price=min_price, max_price=max_price, min_rating=min_rating,
+            min_experience=min_experience, sort=sort, limit=limit, cursor=cursor,
+        )
+    descending = sort.startswith("-")
+    sort_column = Psychologist.rating if sort.endswith("rating") else Psychologist.price_per_hour
+
+    query = summary_query()
+    if specialization_id is not None:
+        query = query.where(in_specialization(specialization_id))
+    if min_price is not None:
+        query = query.where(Psychologist.price_per_hour >= min_price)
+    if max_price is not None:
+        query = query.where(Psychologist.price_per_hour <= max_price)
+    if min_rating is not None:
+        query = query.where(Psychologist.rating >= min_rating)
+    if min_experience is not None:
+        query = query.where(Psychologist.experience >= min_experience)
+
+    if cursor:
+        value, last_id = decode_keyset_cursor(cursor, float if sort.endswith("rating") else Decimal)
+        query = query.where(keyset_after(sort_column, Psychologist.id, value, last_id, descending))
+
+    # берём на одну строку больше, чтобы понять, есть ли следующая страница
+    query = query.order_by(*keyset_order(sort_column, Psychologist.id, descending)).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    items = [PsychologistSummary.model_validate(row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.rating if sort.endswith("rating") else last.price_per_hour, last.id)
+    return PsychologistPage(items=items, next_cursor=next_cursor)
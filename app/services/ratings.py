@@ -0,0 +1,140 @@
+"""Агрегат рейтинга психолога: инкрементальное обновление и пересчёт.
+
+Кроме суммы и числа оценок хранятся гистограмма 1–5 и суммы для рейтинга с
+затуханием: отзыв весит exp(DECAY_RATE * (created_at - DECAY_EPOCH)). Общий
+множитель exp(-DECAY_RATE * (now - DECAY_EPOCH)) в среднем сокращается, поэтому
+суммы только прибавляются и со временем не пересчитываются.
+
+Пересчёт с нуля (если агрегат разошёлся с отзывами или изменили REVIEW_HALF_LIFE_DAYS):
+    python -m app.services.ratings [psychologist_id ...]
+"""
+import math
+import os
+import sys
+from datetime import datetime
+from sqlalchemy import update, select, func, cast, Float, or_, bindparam
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.psychologist import Psychologist
+from app.models.review import Review
+from app.schemas.review import ReviewSummary
+
+RATING_VALUES = range(1, 6)
+REVIEW_HALF_LIFE_DAYS = float(os.getenv("REVIEW_HALF_LIFE_DAYS", "180"))
+DECAY_RATE = math.log(2) / (REVIEW_HALF_LIFE_DAYS * 86400)  # в секундах
+# веса растут от эпохи; до переполнения float при полугодовом полураспаде — сотни лет
+DECAY_EPOCH = datetime(2024, 1, 1)
+
+def histogram_column(rating: int):
+    return getattr(Psychologist, f"rating_count_{rating}")
+
+def decay_weight(created_at: datetime) -> float:
+    return math.exp(DECAY_RATE * (created_at - DECAY_EPOCH).total_seconds())
+
+async def review_summary(db: AsyncSession, psychologist_id: int, now: datetime | None = None) -> ReviewSummary | None:
+    """Сводка из сохранённого агрегата, без чтения отзывов; None, если психолога нет."""
+    row = (await db.execute(
+        select(
+            Psychologist.rating_count, Psychologist.rating, Psychologist.decayed_weight_sum, Psychologist.decayed_rating_sum,
+            *(histogram_column(rating) for rating in RATING_VALUES),
+        ).where(Psychologist.id == psychologist_id)
+    )).first()
+    if row is None:
+        return None
+    return ReviewSummary(
+        psychologist_id=psychologist_id,
+        review_count=row.rating_count,
+        rating=row.rating,
+        histogram={rating: getattr(row, histogram_column(rating).key) for rating in RATING_VALUES},
+        decayed_rating=row.decayed_rating_sum / row.decayed_weight_sum if row.decayed_weight_sum else None,
+        # сохранённые веса отсчитаны от DECAY_EPOCH; к моменту now они меньше в decay_weight(now) раз
+        recent_weight=row.decayed_weight_sum / decay_weight(now or datetime.utcnow()),
+        half_life_days=REVIEW_HALF_LIFE_DAYS,
+    )
+
+async def apply_review(db: AsyncSession, psychologist_id: int, rating: int, created_at: datetime) -> bool:
+    """Добавляет оценку в агрегат одним UPDATE; False, если психолога нет."""
+    weight = decay_weight(created_at)
+    bucket = histogram_column(rating)
+    # SET вычисляется по значениям строки до обновления, поэтому гонок между отзывами нет
+    result = await db.execute(
+        update(Psychologist)
+        .where(Psychologist.id == psychologist_id)
+        .values({
+            Psychologist.rating_sum: Psychologist.rating_sum + rating,
+            Psychologist.rating_count: Psychologist.rating_count + 1,
+            Psychologist.rating: cast(Psychologist.rating_sum + rating, Float) / (Psychologist.rating_count + 1),
+            bucket: bucket + 1,
+            Psychologist.decayed_weight_sum: Psychologist.decayed_weight_sum + weight,
+            Psychologist.decayed_rating_sum: Psychologist.decayed_rating_sum + rating * weight,
+        })
+    )
+    return result.rowcount > 0
+
+def _review_aggregate(column):
+    return (
+        select(column)
+        .where(Review.psychologist_id == Psychologist.id)
+        .correlate(Psychologist)
+        .scalar_subquery()
+    )
+
+def recompute_ratings(db: Session, psychologist_ids: list[int] | None = None) -> int:
+    """Пересчитывает агрегат по таблице отзывов, возвращает число исправленных строк."""
+    review_sum = func.coalesce(_review_aggregate(func.sum(Review.rating)), 0)
+    review_count = _review_aggregate(func.count(Review.id))
+    review_avg = func.coalesce(_review_aggregate(func.avg(Review.rating)), 0.0)
+
+    drifted = or_(Psychologist.rating_sum != review_sum, Psychologist.rating_count != review_count)
+    query = update(Psychologist).where(drifted)
+    if psychologist_ids:
+        query = query.where(Psychologist.id.in_(psychologist_ids))
+    result = db.execute(
+        query.values(rating_sum=review_sum, rating_count=review_count, rating=review_avg),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return result.rowcount
+
+def recompute_review_stats(db: Session, psychologist_ids: list[int] | None = None) -> int:
+    """Гистограмма и суммы с затуханием заново, одним проходом по отзывам; возвращает число психологов с отзывами.
+
+    exp() от времени в SQL у SQLite и Postgres разный, поэтому веса считаются здесь.
+    """
+    zero = {histogram_column(rating).key: 0 for rating in RATING_VALUES}
+    reset = update(Psychologist).values(**zero, decayed_weight_sum=0.0, decayed_rating_sum=0.0)
+    reviews = select(Review.psychologist_id, Review.rating, Review.created_at)
+    if psychologist_ids:
+        reset = reset.where(Psychologist.id.in_(psychologist_ids))
+        reviews = reviews.where(Review.psychologist_id.in_(psychologist_ids))
+    db.execute(reset, execution_options={"synchronize_session": False})
+
+    stats: dict[int, dict] = {}
+    for review in db.execute(reviews.execution_options(yield_per=10_000)):
+        row = stats.setdefault(review.psychologist_id, {**zero, "decayed_weight_sum": 0.0, "decayed_rating_sum": 0.0})
+        weight = decay_weight(review.created_at)
+        row[histogram_column(review.rating).key] += 1
+        row["decayed_weight_sum"] += weight
+        row["decayed_rating_sum"] += review.rating * weight
+    if stats:
+        table = Psychologist.__table__
+        db.execute(
+            update(table).where(table.c.id == bindparam("psychologist_id")).values(
+                {column: bindparam(f"new_{column}") for column in (*zero, "decayed_weight_sum", "decayed_rating_sum")}
+            ),
+            [
+                {"psychologist_id": psychologist_id, **{f"new_{column}": value for column, value in row.items()}}
+                for psychologist_id, row in stats.items()
+            ],
+        )
+    db.commit()
+    return len(stats)
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    with SessionLocal() as session:
+        ids = [int(arg) for arg in sys.argv[1:]] or None
+        fixed = recompute_ratings(session, ids)
+        rated = recompute_review_stats(session, ids)
+    print(f"Пересчитано рейтингов: {fixed}, гистограмм и рейтингов с затуханием: {rated}")
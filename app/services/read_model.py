@@ -0,0 +1,385 @@
+"""Модель чтения каталога в памяти процесса: психологи, их специализации, расписание и рейтинг.
+
+Включается CATALOG_READ_MODEL=1. Тогда каталог, страницы специализаций и
+расписание отдаются из памяти, без запросов к БД. Записи обновляются по
+событиям PSYCHOLOGISTS_CHANGED и SPECIALIZATIONS_CHANGED прямо в изменившем их
+запросе. Раз в CATALOG_RESYNC_SECONDS модель собирается заново — так
+подхватываются изменения из других процессов. Пока модель не загружена,
+всё читается из БД как обычно.
+"""
+import asyncio
+import logging
+import os
+import sys
+from bisect import bisect_right
+from itertools import islice
+from contextlib import asynccontextmanager
+from datetime import time
+from decimal import Decimal
+from time import monotonic, perf_counter
+from typing import Collection
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.core.events import PSYCHOLOGISTS_CHANGED, SPECIALIZATIONS_CHANGED, subscribe
+from app.core.pagination import decode_keyset_cursor, encode_cursor
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.schemas.psychologist import PsychologistPage, PsychologistSummary
+from app.schemas.schedule import ScheduleRead
+from app.schemas.specialization import SpecializationRead
+
+logger = logging.getLogger(__name__)
+
+CATALOG_READ_MODEL = os.getenv("CATALOG_READ_MODEL", "false").lower() in ("1", "true", "yes")
+CATALOG_RESYNC_SECONDS = float(os.getenv("CATALOG_RESYNC_SECONDS", "300"))
+# ширина корзины цен во вторичном индексе; фильтр по цене берёт только пересекающиеся корзины
+PRICE_BUCKET = Decimal(os.getenv("CATALOG_PRICE_BUCKET", "500"))
+# индекс сужает выборку, только если отбирает не больше этой доли каталога
+SELECTIVE_SHARE = 1 / 16
+
+class ScheduleRecord:
+    __slots__ = ("id", "day_of_week", "start_time", "end_time")
+
+    def __init__(self, id: int, day_of_week: int, start_time: time, end_time: time):
+        self.id = id
+        self.day_of_week = day_of_week
+        self.start_time = start_time
+        self.end_time = end_time
+
+class PsychologistRecord:
+    __slots__ = ("id", "full_name", "experience", "price_per_hour", "rating", "review_count", "specialization_ids", "schedule")
+
+    def __init__(self, row, specialization_ids: tuple[int, ...], schedule: tuple[ScheduleRecord, ...]):
+        self.id = row.id
+        self.full_name = row.full_name
+        self.experience = row.experience
+        self.price_per_hour = row.price_per_hour
+        self.rating = row.rating
+        self.review_count = row.review_count
+        self.specialization_ids = specialization_ids
+        self.schedule = schedule
+
+    def summary(self) -> PsychologistSummary:
+        return PsychologistSummary(
+            id=self.id, full_name=self.full_name, experience=self.experience,
+            price_per_hour=self.price_per_hour, rating=self.rating, review_count=self.review_count,
+        )
+
+class SpecializationRecord:
+    __slots__ = ("id", "name", "description")
+
+    def __init__(self, row):
+        self.id = row.id
+        self.name = row.name
+        self.description = row.description
+
+def _price_bucket(price: Decimal | None) -> int | None:
+    return None if price is None else int(price // PRICE_BUCKET)
+
+def _sort_value(record: PsychologistRecord, sort: str):
+    return record.rating if sort.endswith("rating") else record.price_per_hour
+
+def _sort_key(sort: str, value, psychologist_id: int) -> tuple:
+    """Ключ в порядке keyset_order каталога: NULL в конце, равные значения — по id в ту же сторону."""
+    descending = sort.startswith("-")
+    if value is None:
+        return (1, -psychologist_id if descending else psychologist_id)
+    return (0, -value if descending else value, -psychologist_id if descending else psychologist_id)
+
+class CatalogData:
+    """Один снимок каталога с вторичными индексами; полный resync собирает новый и подменяет целиком."""
+
+    def __init__(self):
+        self.psychologists: dict[int, PsychologistRecord] = {}
+        self.specializations: dict[int, SpecializationRecord] = {}
+        self.by_specialization: dict[int, set[int]] = {}
+        self.by_price_bucket: dict[int | None, set[int]] = {}
+        self._orders: dict[str, tuple[list[tuple], list[PsychologistRecord]]] = {}
+
+    def put_psychologist(self, record: PsychologistRecord) -> None:
+        self.drop_psychologist(record.id)
+        self.psychologists[record.id] = record
+        for specialization_id in record.specialization_ids:
+            self.by_specialization.setdefault(specialization_id, set()).add(record.id)
+        self.by_price_bucket.setdefault(_price_bucket(record.price_per_hour), set()).add(record.id)
+
+    def drop_psychologist(self, psychologist_id: int) -> None:
+        old = self.psychologists.pop(psychologist_id, None)
+        self._orders.clear()
+        if old is None:
+            return
+        for specialization_id in old.specialization_ids:
+            self.by_specialization.get(specialization_id, set()).discard(psychologist_id)
+        self.by_price_bucket.get(_price_bucket(old.price_per_hour), set()).discard(psychologist_id)
+
+    def _order(self, sort: str) -> tuple[list[tuple], list[PsychologistRecord]]:
+        """Весь каталог в порядке sort; строится при первом запросе после изменения."""
+        if sort not in self._orders:
+            records = sorted(self.psychologists.values(), key=lambda record: _sort_key(sort, _sort_value(record, sort), record.id))
+            self._orders[sort] = ([_sort_key(sort, _sort_value(record, sort), record.id) for record in records], records)
+        return self._orders[sort]
+
+    def _candidates(self, specialization_id: int | None, min_price: Decimal | None, max_price: Decimal | None) -> set[int] | None:
+        """Самое узкое множество id из вторичных индексов; None — если оно шире SELECTIVE_SHARE каталога.
+
+        Широкое множество дешевле не собирать: страница набирается проходом по
+        готовому порядку сортировки с проверкой условий у каждой записи.
+        """
+        options = []
+        if specialization_id is not None:
+            members = self.by_specialization.get(specialization_id, set())
+            options.append((len(members), lambda: members))
+        if min_price is not None or max_price is not None:
+            low = _price_bucket(min_price) if min_price is not None else None
+            high = _price_bucket(max_price) if max_price is not None else None
+            buckets = [
+                ids for bucket, ids in self.by_price_bucket.items()
+                if bucket is not None and (low is None or bucket >= low) and (high is None or bucket <= high)
+            ]
+            options.append((sum(map(len, buckets)), lambda: set().union(*buckets)))
+        if not options:
+            return None
+        size, build = min(options, key=lambda option: option[0])
+        return build() if size <= SELECTIVE_SHARE * len(self.psychologists) else None
+
+    def page(
+        self,
+        *,
+        specialization_id: int | None = None,
+        min_price: Decimal | None = None,
+        max_price: Decimal | None = None,
+        min_rating: float | None = None,
+        min_experience: int | None = None,
+        sort: str = "-rating",
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> PsychologistPage:
+        """То же, что psychologist_page: фильтры, порядок и курсоры совпадают."""
+        candidates = self._candidates(specialization_id, min_price, max_price)
+        if candidates is None:
+            keys, records = self._order(sort)
+        else:
+            records = sorted(
+                (self.psychologists[psychologist_id] for psychologist_id in candidates),
+                key=lambda record: _sort_key(sort, _sort_value(record, sort), record.id),
+            )
+            keys = [_sort_key(sort, _sort_value(record, sort), record.id) for record in records]
+
+        start = 0
+        if cursor:
+            value, last_id = decode_keyset_cursor(cursor, float if sort.endswith("rating") else Decimal)
+            start = bisect_right(keys, _sort_key(sort, value, last_id))
+
+        items = []
+        for record in islice(records, start, None):
+            if specialization_id is not None and specialization_id not in record.specialization_ids:
+                continue
+            if min_price is not None and (record.price_per_hour is None or record.price_per_hour < min_price):
+                continue
+            if max_price is not None and (record.price_per_hour is None or record.price_per_hour > max_price):
+                continue
+            if min_rating is not None and record.rating < min_rating:
+                continue
+            if min_experience is not None and record.experience < min_experience:
+                continue
+            items.append(record)
+            if len(items) > limit:
+                break
+
+        next_cursor = None
+        if len(items) > limit:
+            last = items[limit - 1]
+            next_cursor = encode_cursor(_sort_value(last, sort), last.id)
+        return PsychologistPage(items=[record.summary() for record in items[:limit]], next_cursor=next_cursor)
+
+    def specialization(self, specialization_id: int, with_psychologists: bool) -> SpecializationRead | None:
+        specialization = self.specializations.get(specialization_id)
+        if specialization is None:
+            return None
+        member_ids = self.by_specialization.get(specialization_id, set())
+        psychologists = None
+        if with_psychologists:
+            members = sorted((self.psychologists[psychologist_id] for psychologist_id in member_ids), key=lambda record: (-record.rating, record.id))
+            psychologists = [record.summary() for record in members]
+        return SpecializationRead(
+            id=specialization.id, name=specialization.name, description=specialization.description,
+            psychologist_count=len(member_ids), psychologists=psychologists,
+        )
+
+    def schedule(self, psychologist_id: int) -> list[ScheduleRead]:
+        record = self.psychologists.get(psychologist_id)
+        if record is None:
+            return []
+        return [
+            ScheduleRead(id=rule.id, psychologist_id=psychologist_id, day_of_week=rule.day_of_week,
+                         start_time=rule.start_time, end_time=rule.end_time)
+            for rule in record.schedule
+        ]
+
+    def memory_bytes(self) -> int:
+        """Приблизительно: сами записи, их строки и кортежи, словари и множества индексов."""
+        size = sum(sys.getsizeof(container) for container in (
+            self.psychologists, self.specializations, self.by_specialization, self.by_price_bucket,
+            *self.by_specialization.values(), *self.by_price_bucket.values(),
+        ))
+        for record in self.psychologists.values():
+            size += sys.getsizeof(record) + sys.getsizeof(record.full_name) + sys.getsizeof(record.specialization_ids)
+            size += sys.getsizeof(record.schedule) + sum(sys.getsizeof(rule) for rule in record.schedule)
+        for record in self.specializations.values():
+            size += sys.getsizeof(record) + sys.getsizeof(record.name) + sys.getsizeof(record.description)
+        for keys, records in self._orders.values():
+            size += sys.getsizeof(keys) + sys.getsizeof(records) + sum(sys.getsizeof(key) for key in keys)
+        return size
+
+def _psychologist_queries():
+    return (
+        select(
+            Psychologist.id, User.full_name, Psychologist.experience, Psychologist.price_per_hour,
+            Psychologist.rating, Psychologist.rating_count.label("review_count"),
+        ).join(User, User.id == Psychologist.user_id),
+        select(psychologist_specializations.c.psychologist_id, psychologist_specializations.c.specialization_id),
+        select(Schedule.id, Schedule.psychologist_id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time)
+        .order_by(Schedule.psychologist_id, Schedule.id),
+    )
+
+async def _load_psychologists(db: AsyncSession, psychologist_ids: Collection[int] | None = None) -> list[PsychologistRecord]:
+    """Записи психологов (всех или psychologist_ids) тремя запросами."""
+    people, links, schedule = _psychologist_queries()
+    if psychologist_ids is not None:
+        people = people.where(Psychologist.id.in_(psychologist_ids))
+        links = links.where(psychologist_specializations.c.psychologist_id.in_(psychologist_ids))
+        schedule = schedule.where(Schedule.psychologist_id.in_(psychologist_ids))
+    specializations_of: dict[int, list[int]] = {}
+    for link in await db.execute(links):
+        specializations_of.setdefault(link.psychologist_id, []).append(link.specialization_id)
+    rules_of: dict[int, list[ScheduleRecord]] = {}
+    for rule in await db.execute(schedule):
+        rules_of.setdefault(rule.psychologist_id, []).append(ScheduleRecord(rule.id, rule.day_of_week, rule.start_time, rule.end_time))
+    return [
+        PsychologistRecord(row, tuple(specializations_of.get(row.id, ())), tuple(rules_of.get(row.id, ())))
+        for row in await db.execute(people)
+    ]
+
+async def _load_specializations(db: AsyncSession, specialization_ids: Collection[int] | None = None) -> list[SpecializationRecord]:
+    query = select(Specialization.id, Specialization.name, Specialization.description)
+    if specialization_ids is not None:
+        query = query.where(Specialization.id.in_(specialization_ids))
+    return [SpecializationRecord(row) for row in await db.execute(query)]
+
+class CatalogReadModel:
+    """Текущий снимок каталога, его обновление по событиям и периодический resync."""
+
+    def __init__(self, enabled: bool = CATALOG_READ_MODEL, resync_seconds: float = CATALOG_RESYNC_SECONDS):
+        self.enabled = enabled
+        self.resync_seconds = resync_seconds
+        self.data: CatalogData | None = None
+        self.loaded_at = 0.0
+        self.resyncs = 0
+        self.last_resync_seconds = 0.0
+        self.refreshed_psychologists = 0
+        # изменения, пришедшие во время resync: новый снимок мог прочитать их до commit
+        self._during_resync: tuple[set[int], set[int]] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.data is not None
+
+    async def resync(self) -> None:
+        """Собирает снимок заново и подменяет текущий."""
+        started = perf_counter()
+        self._during_resync = (set(), set())
+        try:
+            data = CatalogData()
+            async with AsyncSessionLocal() as db:
+                for record in await _load_specializations(db):
+                    data.specializations[record.id] = record
+                for record in await _load_psychologists(db):
+                    data.put_psychologist(record)
+            self.data = data
+            psychologist_ids, specialization_ids = self._during_resync
+        finally:
+            self._during_resync = None
+        await self.refresh_specializations(specialization_ids)
+        await self.refresh_psychologists(psychologist_ids)
+        self.loaded_at = monotonic()
+        self.resyncs += 1
+        self.last_resync_seconds = perf_counter() - started
+
+    async def refresh_psychologists(self, psychologist_ids: Collection[int]) -> None:
+        if self._during_resync is not None:
+            self._during_resync[0].update(psychologist_ids)
+        if self.data is None or not psychologist_ids:
+            return
+        async with AsyncSessionLocal() as db:
+            records = await _load_psychologists(db, list(psychologist_ids))
+        data = self.data
+        for psychologist_id in set(psychologist_ids) - {record.id for record in records}:
+            data.drop_psychologist(psychologist_id)
+        for record in records:
+            data.put_psychologist(record)
+        self.refreshed_psychologists += len(psychologist_ids)
+
+    async def refresh_specializations(self, specialization_ids: Collection[int]) -> None:
+        if self._during_resync is not None:
+            self._during_resync[1].update(specialization_ids)
+        if self.data is None or not specialization_ids:
+            return
+        async with AsyncSessionLocal() as db:
+            records = await _load_specializations(db, list(specialization_ids))
+        data = self.data
+        for specialization_id in set(specialization_ids) - {record.id for record in records}:
+            data.specializations.pop(specialization_id, None)
+        for record in records:
+            data.specializations[record.id] = record
+
+    async def _resync_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.resync_seconds)
+            try:
+                await self.resync()
+            except Exception:
+                logger.exception("Resync модели чтения каталога не удался, обслуживает прежний снимок")
+
+    @asynccontextmanager
+    async def running(self):
+        """Для lifespan приложения: первая загрузка и периодический resync, пока приложение работает."""
+        if not self.enabled:
+            yield
+            return
+        try:
+            await self.resync()
+        except Exception:
+            logger.exception("Модель чтения каталога не загрузилась, каталог читается из БД до следующего resync")
+        task = asyncio.create_task(self._resync_forever())
+        try:
+            yield
+        finally:
+            task.cancel()
+            self.data = None
+
+    def stats(self) -> dict:
+        data = self.data
+        if data is None:
+            return {"enabled": self.enabled, "ready": False}
+        return {
+            "enabled": self.enabled,
+            "ready": True,
+            "psychologists": len(data.psychologists),
+            "specializations": len(data.specializations),
+            "schedule_rules": sum(len(record.schedule) for record in data.psychologists.values()),
+            "price_buckets": len(data.by_price_bucket),
+            "memory_bytes": data.memory_bytes(),
+            "age_seconds": monotonic() - self.loaded_at,
+            "resyncs": self.resyncs,
+            "last_resync_seconds": self.last_resync_seconds,
+            "refreshed_psychologists": self.refreshed_psychologists,
+        }
+
+catalog = CatalogReadModel()
+if catalog.enabled:
+    subscribe(PSYCHOLOGISTS_CHANGED, catalog.refresh_psychologists)
+    subscribe(SPECIALIZATIONS_CHANGED, catalog.refresh_specializations)
@@ -0,0 +1,335 @@
+"""Подбор психологов под запрос клиента: все психологи оцениваются разом по матрице признаков.
+
+Признаки лежат в массивах NumPy: цена, сглаженный рейтинг, опыт, специализации
+и недельная сетка 15-минутных слотов (672 бита в словах uint64) — та же карта
+доступности, что хранится в psychologists.availability. Изменённые
+психологи приходят событием PSYCHOLOGISTS_CHANGED и перечитываются перед
+следующим запросом. Раз в RECOMMENDATIONS_MAX_AGE секунд матрица строится
+заново — так подхватываются изменения из других процессов.
+"""
+import asyncio
+import os
+from dataclasses import dataclass
+from datetime import time
+from time import monotonic, perf_counter
+from typing import Collection, Sequence
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.events import PSYCHOLOGISTS_CHANGED, subscribe
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.schemas.psychologist import PsychologistRecommendation
+from app.services.psychologists import summary_query
+
+try:
+    import numpy as np
+except ImportError:  # без numpy рекомендации отключены, остальной API работает
+    np = None
+
+SLOT_MINUTES = 15
+DAY_SLOTS = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * DAY_SLOTS
+WEEK_WORDS = -(-WEEK_SLOTS // 64)
+
+MAX_AGE = float(os.getenv("RECOMMENDATIONS_MAX_AGE", "300"))
+# если изменилась такая доля психологов, матрица строится заново, а не по строкам
+REBUILD_RATIO = 0.2
+LOAD_BATCH = 5000
+
+WEIGHTS = {"specializations": 0.35, "price": 0.2, "rating": 0.2, "experience": 0.1, "schedule": 0.15}
+# рейтинг сглаживается RATING_PRIOR_COUNT воображаемыми отзывами с оценкой RATING_PRIOR:
+# единственная пятёрка не должна обгонять сотню отзывов со средней 4.8
+RATING_PRIOR = 4.0
+RATING_PRIOR_COUNT = 5
+EXPERIENCE_SATURATION = 20  # лет; больший опыт оценку уже не повышает
+# цена не указана — оценка посередине; выше бюджета оценка падает до 0 к двойному бюджету
+UNKNOWN_PRICE_SCORE = 0.5
+# столько рабочих часов в неделю внутри окна клиента — уже полное покрытие
+COVERAGE_TARGET_SLOTS = 40 * 60 // SLOT_MINUTES
+
+if np is not None and not hasattr(np, "bitwise_count"):  # bitwise_count появился в NumPy 2.0
+    _BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+def _popcount(words):
+    """Число единичных битов по последней оси."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_BITS[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+@dataclass(frozen=True)
+class RecommendationQuery:
+    specialization_ids: tuple[int, ...] = ()
+    budget: float | None = None
+    days: tuple[int, ...] = ()  # пусто — вся неделя
+    start: time | None = None   # окно внутри каждого из days; end <= start — через полночь
+    end: time | None = None
+
+def slot_range(day_of_week: int, start: time, end: time) -> tuple[int, int]:
+    """Полуоткрытый диапазон слотов недели; неполные слоты по краям не считаются."""
+    first = day_of_week * DAY_SLOTS - (-(start.hour * 60 + start.minute) // SLOT_MINUTES)
+    last = day_of_week * DAY_SLOTS + (end.hour * 60 + end.minute) // SLOT_MINUTES
+    if end <= start:  # через полночь, как и в расписании
+        last += DAY_SLOTS
+    return first, last
+
+def week_grid(rows, first, last, count: int):
+    """Недельные сетки (count, WEEK_WORDS) uint64: интервал [first, last) слотов ставится в строку rows."""
+    width = WEEK_SLOTS + DAY_SLOTS  # ночь с воскресенья заходит в следующую неделю
+    rows, first, last = (np.asarray(values, np.int64) for values in (rows, first, last))
+    keep = first < last
+    diff = np.zeros((count, width + 1), np.int16)
+    np.add.at(diff, (rows[keep], first[keep]), 1)
+    np.add.at(diff, (rows[keep], last[keep]), -1)
+    busy = np.cumsum(diff[:, :width], axis=1, dtype=np.int16) > 0
+    week = busy[:, :WEEK_SLOTS]
+    week[:, :DAY_SLOTS] |= busy[:, WEEK_SLOTS:]
+    packed = np.zeros((count, WEEK_WORDS * 8), np.uint8)
+    packed[:, :WEEK_SLOTS // 8] = np.packbits(week, axis=1, bitorder="little")
+    return packed.view(np.uint64)
+
+def decode_weeks(maps):
+    """Карты доступности из БД (bytes или None) в сетки (len, WEEK_WORDS) uint64."""
+    buffer = b"".join((week or b"").ljust(WEEK_WORDS * 8, b"\0") for week in maps)
+    return np.frombuffer(buffer, "<u8").reshape(-1, WEEK_WORDS).astype(np.uint64)
+
+def window_mask(days: Sequence[int], start: time | None, end: time | None):
+    """Сетка окна клиента в том же формате, что и у психологов."""
+    days = days or range(7)
+    if start is None:
+        ranges = [(day * DAY_SLOTS, (day + 1) * DAY_SLOTS) for day in days]
+    else:
+        ranges = [slot_range(day, start, end) for day in days]
+    return week_grid([0] * len(ranges), [first for first, _ in ranges], [last for _, last in ranges], 1)[0]
+
+class FeatureMatrix:
+    """Признаки психологов построчно. Строка удалённого психолога гасится, номера строк не меняются."""
+    _ARRAYS = ("ids", "active", "price", "rating", "experience", "grid", "specializations")
+
+    def __init__(self, capacity: int = 1024, columns: int = 32):
+        self.rows: dict[int, int] = {}     # psychologist_id -> строка
+        self.columns: dict[int, int] = {}  # specialization_id -> столбец
+        self.size = 0
+        self.ids = np.zeros(capacity, np.int64)
+        self.active = np.zeros(capacity, bool)
+        self.price = np.full(capacity, np.nan)
+        self.rating = np.zeros(capacity, np.float32)
+        self.experience = np.zeros(capacity, np.float32)
+        self.grid = np.zeros((capacity, WEEK_WORDS), np.uint64)
+        self.specializations = np.zeros((capacity, columns), bool)
+        self._members = None  # упакованные битовые множества строк по специализациям, строятся по запросу
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self._ARRAYS)
+
+    def _reserve(self, rows: int, columns: int) -> None:
+        capacity, width = self.specializations.shape
+        if rows <= capacity and columns <= width:
+            return
+        while capacity < rows:
+            capacity *= 2
+        while width < columns:
+            width *= 2
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            shape = (capacity, width) if name == "specializations" else (capacity, *old.shape[1:])
+            new = np.full(shape, np.nan) if name == "price" else np.zeros(shape, old.dtype)
+            new[tuple(slice(0, size) for size in old.shape)] = old
+            setattr(self, name, new)
+
+    def update(self, psychologist_ids: Collection[int], people, links) -> None:
+        """Перезаписывает строки психологов из people; из psychologist_ids, кого там нет, — удалены."""
+        self._members = None
+        present = {row.id: position for position, row in enumerate(people)}
+        gone = [self.rows[psychologist_id] for psychologist_id in psychologist_ids
+                if psychologist_id in self.rows and psychologist_id not in present]
+        self.active[gone] = False
+
+        for link in links:
+            self.columns.setdefault(link.specialization_id, len(self.columns))
+        added = [psychologist_id for psychologist_id in present if psychologist_id not in self.rows]
+        self._reserve(self.size + len(added), len(self.columns))
+        for psychologist_id in added:
+            self.rows[psychologist_id] = self.size
+            self.ids[self.size] = psychologist_id
+            self.size += 1
+        if not people:
+            return
+
+        index = np.fromiter((self.rows[row.id] for row in people), np.int64, len(people))
+        self.active[index] = True
+        self.price[index] = [float(row.price_per_hour) if row.price_per_hour is not None else np.nan for row in people]
+        rating_sum = np.fromiter((row.rating_sum for row in people), np.float64, len(people))
+        rating_count = np.fromiter((row.rating_count for row in people), np.float64, len(people))
+        self.rating[index] = (rating_sum + RATING_PRIOR * RATING_PRIOR_COUNT) / (rating_count + RATING_PRIOR_COUNT) / 5
+        experience = np.fromiter((row.experience for row in people), np.float32, len(people))
+        self.experience[index] = np.minimum(experience, EXPERIENCE_SATURATION) / EXPERIENCE_SATURATION
+
+        self.grid[index] = decode_weeks([row.availability for row in people])
+        # связи могли прочитаться и для психологов, созданных между запросами, — их пропускаем
+        links = [link for link in links if link.psychologist_id in present]
+        self.specializations[index] = False
+        self.specializations[
+            [self.rows[link.psychologist_id] for link in links],
+            [self.columns[link.specialization_id] for link in links],
+        ] = True
+
+    def covering(self, window, specialization_ids: Collection[int]):
+        """id активных психологов по возрастанию: сетка покрывает всё окно и есть все specialization_ids."""
+        n = self.size
+        words = np.flatnonzero(window)  # окно в пару часов задевает одно-два слова из WEEK_WORDS
+        wanted = window[words]
+        free = ((self.grid[:n, words] & wanted) == wanted).all(axis=1) & self.active[:n]
+        rows = np.packbits(free, bitorder="little")
+        if specialization_ids:
+            if self._members is None:
+                self._members = np.packbits(self.specializations[:n].T, axis=1, bitorder="little")
+            for specialization_id in specialization_ids:
+                if specialization_id not in self.columns:
+                    return np.zeros(0, np.int64)
+                rows &= self._members[self.columns[specialization_id]]
+        return np.sort(self.ids[np.flatnonzero(np.unpackbits(rows, count=n, bitorder="little"))])
+
+    def top(self, query: RecommendationQuery, window, limit: int) -> list[tuple[int, float, dict[str, float]]]:
+        """Лучшие limit психологов: (id, оценка, составляющие); равные оценки — по id."""
+        n = self.size
+        components = {}
+        if query.specialization_ids:
+            wanted = [self.columns[sid] for sid in query.specialization_ids if sid in self.columns]
+            matched = self.specializations[:n, wanted].sum(axis=1, dtype=np.float32)
+            components["specializations"] = matched / len(query.specialization_ids)
+        else:
+            components["specializations"] = np.ones(n, np.float32)
+
+        if query.budget is None:
+            components["price"] = np.ones(n, np.float32)
+        else:
+            price = self.price[:n]
+            over_budget = np.maximum(price - query.budget, 0) / query.budget
+            components["price"] = np.where(np.isnan(price), UNKNOWN_PRICE_SCORE, np.clip(1 - over_budget, 0, 1))
+
+        components["rating"] = self.rating[:n]
+        components["experience"] = self.experience[:n]
+        target = min(int(_popcount(window)), COVERAGE_TARGET_SLOTS)
+        components["schedule"] = np.minimum(_popcount(self.grid[:n] & window) / target, 1)
+
+        total = sum(WEIGHTS[name] * values for name, values in components.items())
+        total = np.where(self.active[:n], total, -np.inf)
+        k = min(limit, int(np.count_nonzero(self.active[:n])))
+        if k == 0:
+            return []
+        best = np.argpartition(-total, k - 1)[:k]
+        best = best[np.lexsort((self.ids[best], -total[best]))]
+        return [
+            (int(self.ids[row]), round(float(total[row]), 4), {name: round(float(values[row]), 4) for name, values in components.items()})
+            for row in best
+        ]
+
+def _feature_queries():
+    return (
+        select(
+            Psychologist.id, Psychologist.price_per_hour, Psychologist.rating_sum, Psychologist.rating_count,
+            Psychologist.experience, Psychologist.availability,
+        ),
+        select(psychologist_specializations.c.psychologist_id, psychologist_specializations.c.specialization_id),
+    )
+
+async def load_matrix(db: AsyncSession) -> FeatureMatrix:
+    """Матрица всех психологов, пачками по LOAD_BATCH в порядке id."""
+    people_query, links_query = _feature_queries()
+    matrix = FeatureMatrix()
+    last_id = 0
+    while True:
+        people = (await db.execute(
+            people_query.where(Psychologist.id > last_id).order_by(Psychologist.id).limit(LOAD_BATCH)
+        )).all()
+        if not people:
+            return matrix
+        first_id, last_id = people[0].id, people[-1].id
+        links = (await db.execute(
+            links_query.where(psychologist_specializations.c.psychologist_id.between(first_id, last_id))
+        )).all()
+        matrix.update((), people, links)
+
+async def reload_rows(db: AsyncSession, matrix: FeatureMatrix, psychologist_ids: Sequence[int]) -> None:
+    people_query, links_query = _feature_queries()
+    for offset in range(0, len(psychologist_ids), LOAD_BATCH):
+        chunk = psychologist_ids[offset:offset + LOAD_BATCH]
+        people = (await db.execute(people_query.where(Psychologist.id.in_(chunk)))).all()
+        links = (await db.execute(links_query.where(psychologist_specializations.c.psychologist_id.in_(chunk)))).all()
+        matrix.update(chunk, people, links)
+
+class RecommendationEngine:
+    """Матрица признаков процесса и очередь изменённых психологов."""
+
+    def __init__(self):
+        self.matrix: FeatureMatrix | None = None
+        self.built_at = 0.0
+        self.rebuilds = 0
+        self.refreshed_rows = 0
+        self.last_rebuild_seconds = 0.0
+        self._dirty: set[int] = set()
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self, psychologist_ids: Collection[int]) -> None:
+        self._dirty.update(psychologist_ids)
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Догоняет изменения: по строкам, а если их много или матрица устарела — целиком."""
+        async with self._lock:
+            # изменения, пришедшие во время загрузки, останутся в _dirty до следующего запроса
+            dirty, self._dirty = self._dirty, set()
+            try:
+                if (
+                    self.matrix is None
+                    or monotonic() - self.built_at > MAX_AGE
+                    or len(dirty) > REBUILD_RATIO * len(self.matrix.rows)
+                ):
+                    started = perf_counter()
+                    self.matrix = await load_matrix(db)
+                    self.built_at = monotonic()
+                    self.rebuilds += 1
+                    self.last_rebuild_seconds = perf_counter() - started
+                elif dirty:
+                    await reload_rows(db, self.matrix, sorted(dirty))
+                    self.refreshed_rows += len(dirty)
+            except BaseException:
+                self._dirty |= dirty
+                raise
+
+    async def recommend(self, db: AsyncSession, query: RecommendationQuery, limit: int = 20) -> list[PsychologistRecommendation]:
+        if np is None:
+            raise HTTPException(status_code=503, detail="Рекомендации недоступны: не установлен numpy")
+        window = window_mask(query.days, query.start, query.end)
+        if not _popcount(window):
+            raise HTTPException(status_code=400, detail="Окно короче одного слота (15 минут)")
+        await self.refresh(db)
+        ranked = self.matrix.top(query, window, limit)
+        if not ranked:
+            return []
+        cards = {
+            row.id: row._mapping
+            for row in await db.execute(summary_query().where(Psychologist.id.in_([psychologist_id for psychologist_id, _, _ in ranked])))
+        }
+        return [
+            PsychologistRecommendation.model_validate({**cards[psychologist_id], "score": score, "scores": scores})
+            for psychologist_id, score, scores in ranked
+            if psychologist_id in cards  # удалён после последнего обновления матрицы
+        ]
+
+    def stats(self) -> dict:
+        matrix = self.matrix
+        return {
+            "psychologists": int(np.count_nonzero(matrix.active[:matrix.size])) if matrix else 0,
+            "specializations": len(matrix.columns) if matrix else 0,
+            "memory_bytes": matrix.nbytes if matrix else 0,
+            "age_seconds": monotonic() - self.built_at if matrix else None,
+            "pending": len(self._dirty),
+            "rebuilds": self.rebuilds,
+            "refreshed_rows": self.refreshed_rows,
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+        }
+
+recommendations = RecommendationEngine()
+subscribe(PSYCHOLOGISTS_CHANGED, recommendations.mark_dirty)
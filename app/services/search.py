@@ -0,0 +1,217 @@
+"""Полнотекстовый поиск психологов: SQLite FTS5 или Postgres tsvector + GIN за одним интерфейсом.
+
+Документ психолога — имя, названия и описания его специализаций, био. Индекс
+обновляется в транзакции самой записи (reindex_psychologists), а целиком
+пересобирается командой:
+    python -m app.services.search
+"""
+import re
+import sys
+from fastapi import HTTPException
+from sqlalchemy import (
+    Column, Index, Integer, MetaData, Table, Text, bindparam, delete, event, func, insert, literal_column, or_, and_, select,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import Base
+from app.core.pagination import encode_cursor, decode_keyset_cursor
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.schemas.psychologist import PsychologistSummary, PsychologistPage
+from app.services.psychologists import summary_query
+
+SEARCH_TABLE = "psychologist_search"
+MAX_TERMS = 8
+REBUILD_BATCH = 2000
+
+def search_terms(query: str) -> list[str]:
+    """Слова запроса; знаки препинания и операторы языка запросов отбрасываются."""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+class SqliteSearch:
+    """FTS5 с весами колонок в bm25. Стемминга для русского нет, поэтому слова ищутся по префиксу."""
+    table = Table(
+        SEARCH_TABLE, MetaData(),
+        Column("rowid", Integer, primary_key=True),
+        Column("name", Text), Column("topics", Text), Column("bio", Text), Column("details", Text),
+    )
+    weights = (4.0, 2.0, 1.0, 0.5)  # name, topics, bio, details
+
+    def create(self, conn) -> None:
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(name, topics, bio, details, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, conn) -> None:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def delete(self, psychologist_ids: list[int]):
+        return delete(self.table).where(self.table.c.rowid.in_(psychologist_ids))
+
+    def insert(self):
+        return insert(self.table).values(rowid=bindparam("id"))
+
+    def matches(self, terms: list[str]):
+        """(psychologist_id, score) документов со всеми словами; больший score — лучше."""
+        fts = literal_column(SEARCH_TABLE)
+        return select(
+            self.table.c.rowid.label("psychologist_id"),
+            (-func.bm25(fts, *self.weights)).label("score"),
+        ).where(fts.op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+
+class PostgresSearch:
+    """tsvector с весами A–D под GIN-индексом; словоформы — конфигурацией russian, префиксы — :*."""
+    table = Table(
+        SEARCH_TABLE, MetaData(),
+        Column("psychologist_id", Integer, primary_key=True),
+        Column("document", TSVECTOR, nullable=False),
+        Index("ix_psychologist_search_document", "document", postgresql_using="gin"),
+    )
+    config = literal_column("'russian'::regconfig")
+
+    def create(self, conn) -> None:
+        self.table.create(conn, checkfirst=True)
+
+    def drop(self, conn) -> None:
+        self.table.drop(conn, checkfirst=True)
+
+    def delete(self, psychologist_ids: list[int]):
+        return delete(self.table).where(self.table.c.psychologist_id.in_(psychologist_ids))
+
+    def insert(self):
+        weighted = [
+            func.setweight(func.to_tsvector(self.config, func.coalesce(bindparam(field, type_=Text), "")), weight)
+            for field, weight in (("name", "A"), ("topics", "B"), ("bio", "C"), ("details", "D"))
+        ]
+        document = weighted[0]
+        for part in weighted[1:]:
+            document = document.op("||")(part)
+        return insert(self.table).values(psychologist_id=bindparam("id"), document=document)
+
+    def matches(self, terms: list[str]):
+        query = func.to_tsquery(self.config, " & ".join(f"{term}:*" for term in terms))
+        return select(
+            self.table.c.psychologist_id,
+            func.ts_rank_cd(self.table.c.document, query).label("score"),
+        ).where(self.table.c.document.op("@@")(query))
+
+BACKENDS = {
+    "sqlite": SqliteSearch,
+    "postgresql": PostgresSearch,
+}
+
+def search_backend(dialect: str):
+    try:
+        return BACKENDS[dialect]()
+    except KeyError:
+        raise RuntimeError(f"Полнотекстовый поиск не поддерживается для {dialect!r}, доступны: {', '.join(BACKENDS)}")
+
+# индекс поиска создаётся вместе со схемой (create_all), хотя и не входит в Base.metadata
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    if connection.dialect.name in BACKENDS:
+        search_backend(connection.dialect.name).create(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name in BACKENDS:
+        search_backend(connection.dialect.name).drop(connection)
+
+def _document_queries(psychologist_ids: list[int] | None):
+    people = select(Psychologist.id, User.full_name, Psychologist.bio).join(User, User.id == Psychologist.user_id)
+    topics = (
+        select(psychologist_specializations.c.psychologist_id, Specialization.name, Specialization.description)
+        .join(Specialization, Specialization.id == psychologist_specializations.c.specialization_id)
+    )
+    if psychologist_ids is not None:
+        people = people.where(Psychologist.id.in_(psychologist_ids))
+        topics = topics.where(psychologist_specializations.c.psychologist_id.in_(psychologist_ids))
+    return people, topics
+
+def _documents(people, topics) -> list[dict]:
+    by_psychologist: dict[int, list] = {}
+    for row in topics:
+        by_psychologist.setdefault(row.psychologist_id, []).append(row)
+    documents = []
+    for row in people:
+        own = by_psychologist.get(row.id, [])
+        documents.append({
+            "id": row.id,
+            "name": row.full_name,
+            "topics": " ".join(topic.name for topic in own),
+            "bio": row.bio or "",
+            "details": " ".join(topic.description or "" for topic in own),
+        })
+    return documents
+
+async def reindex_psychologists(db: AsyncSession, psychologist_ids) -> None:
+    """Пересобирает документы психологов; удалённые просто пропадают из индекса. Вызывать до commit."""
+    psychologist_ids = list(psychologist_ids)
+    if not psychologist_ids:
+        return
+    backend = search_backend(db.bind.dialect.name)
+    people, topics = _document_queries(psychologist_ids)
+    documents = _documents((await db.execute(people)).all(), (await db.execute(topics)).all())
+    await db.execute(backend.delete(psychologist_ids))
+    if documents:
+        await db.execute(backend.insert(), documents)
+
+async def search_page(db: AsyncSession, q: str, limit: int = 20, cursor: str | None = None) -> PsychologistPage:
+    """Страница кратких карточек по релевантности; keyset по (score, id) внутри самого поиска."""
+    terms = search_terms(q)
+    if not terms:
+        return PsychologistPage(items=[])
+    hits = search_backend(db.bind.dialect.name).matches(terms).subquery()
+    # ранжирование и LIMIT — в подзапросе по индексу, к карточкам присоединяется только страница
+    page = select(hits.c.psychologist_id, hits.c.score)
+    if cursor:
+        score, last_id = decode_keyset_cursor(cursor, float)
+        if score is None:  # у найденного документа оценка есть всегда
+            raise HTTPException(status_code=400, detail="Некорректный курсор")
+        page = page.where(or_(hits.c.score < score, and_(hits.c.score == score, hits.c.psychologist_id > last_id)))
+    page = page.order_by(hits.c.score.desc(), hits.c.psychologist_id).limit(limit + 1).subquery()
+
+    rows = (await db.execute(
+        summary_query()
+        .add_columns(page.c.score)
+        .join(page, page.c.psychologist_id == Psychologist.id)
+        .order_by(page.c.score.desc(), page.c.psychologist_id)
+    )).all()
+    items = [PsychologistSummary.model_validate(row._mapping) for row in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1].score, rows[limit - 1].id) if len(rows) > limit else None
+    return PsychologistPage(items=items, next_cursor=next_cursor)
+
+def rebuild(db: Session) -> int:
+    """Индекс с нуля по всем психологам; возвращает число документов."""
+    connection = db.connection()
+    backend = search_backend(connection.dialect.name)
+    backend.drop(connection)
+    backend.create(connection)
+    total = 0
+    last_id = 0
+    while True:
+        ids = list(db.scalars(
+            select(Psychologist.id).where(Psychologist.id > last_id).order_by(Psychologist.id).limit(REBUILD_BATCH)
+        ))
+        if not ids:
+            break
+        people, topics = _document_queries(ids)
+        documents = _documents(db.execute(people).all(), db.execute(topics).all())
+        db.execute(backend.insert(), documents)
+        total += len(documents)
+        last_id = ids[-1]
+    db.commit()
+    return total
+
+if __name__ == "__main__":
+    import app.main  # noqa: F401 — регистрирует все модели
+    from app.core.database import SessionLocal
+
+    if len(sys.argv) > 1:
+        sys.exit("использование: python -m app.services.search")
+    with SessionLocal() as session:
+        print(f"Проиндексировано психологов: {rebuild(session)}")
@@ -0,0 +1,130 @@
+"""Недельная доступность психолога битовой картой: 672 слота по 15 минут, бит на слот.
+
+Карта хранится в psychologists.availability (84 байта, слот i — бит i % 8 байта
+i // 8) и пересобирается в транзакции каждого изменения расписания
+(rebuild_availability). Из неё же строится сетка матрицы признаков
+(app/services/recommendations.py), по которой ищутся психологи, свободные в
+заданное окно недели. Пересборка всех карт, если они разошлись с расписанием:
+    python -m app.services.weekly_availability
+"""
+import sys
+from datetime import time
+from typing import Iterable, Sequence
+from fastapi import HTTPException
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import cursor_id, encode_cursor, decode_cursor
+from app.models.psychologist import Psychologist
+from app.models.schedule import Schedule
+from app.schemas.psychologist import PsychologistPage, PsychologistSummary
+from app.services.psychologists import summary_query
+from app.services.recommendations import DAY_SLOTS, SLOT_MINUTES, WEEK_SLOTS, WEEK_WORDS, np, recommendations, slot_range
+
+WEEK_BYTES = WEEK_SLOTS // 8
+REBUILD_BATCH = 5000
+
+def _week_bits(ranges: Iterable[tuple[int, int]]) -> int:
+    bits = 0
+    for first, last in ranges:
+        if first < last:
+            bits |= ((1 << (last - first)) - 1) << first
+    # ночь с воскресенья на понедельник переносится в начало недели
+    return (bits | bits >> WEEK_SLOTS) & ((1 << WEEK_SLOTS) - 1)
+
+def encode_week(rules: Iterable[tuple[int, time, time]]) -> bytes | None:
+    """Карта по правилам (day_of_week, start_time, end_time); слот входит, только если отработан целиком."""
+    bits = _week_bits(slot_range(*rule) for rule in rules)
+    return bits.to_bytes(WEEK_BYTES, "little") if bits else None
+
+def window_bits(days: Sequence[int], start: time, end: time) -> bytes:
+    """Окно запроса в том же формате; неполные слоты по краям входят — свободен значит на всё окно."""
+    start_minutes, end_minutes = start.hour * 60 + start.minute, end.hour * 60 + end.minute
+    ranges = []
+    for day in days or range(7):
+        first = day * DAY_SLOTS + start_minutes // SLOT_MINUTES
+        last = day * DAY_SLOTS - (-end_minutes // SLOT_MINUTES)
+        if end <= start:  # через полночь, как и в расписании
+            last += DAY_SLOTS
+        ranges.append((first, last))
+    return _week_bits(ranges).to_bytes(WEEK_BYTES, "little")
+
+def _maps(psychologist_ids: Sequence[int], rules) -> list[dict]:
+    by_psychologist: dict[int, list] = {psychologist_id: [] for psychologist_id in psychologist_ids}
+    for rule in rules:
+        by_psychologist[rule.psychologist_id].append((rule.day_of_week, rule.start_time, rule.end_time))
+    return [
+        {"psychologist_id": psychologist_id, "new_availability": encode_week(own)}
+        for psychologist_id, own in by_psychologist.items()
+    ]
+
+def _queries(psychologist_ids: Sequence[int]):
+    table = Psychologist.__table__
+    return (
+        select(Schedule.psychologist_id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time)
+        .where(Schedule.psychologist_id.in_(psychologist_ids)),
+        update(table).where(table.c.id == bindparam("psychologist_id")).values(availability=bindparam("new_availability")),
+    )
+
+async def rebuild_availability(db: AsyncSession, psychologist_ids) -> None:
+    """Пересобирает карты психологов по их расписанию. Вызывать до commit."""
+    psychologist_ids = sorted(set(psychologist_ids))
+    if not psychologist_ids:
+        return
+    rules_query, store = _queries(psychologist_ids)
+    await db.execute(store, _maps(psychologist_ids, (await db.execute(rules_query)).all()))
+
+def rebuild(db: Session) -> int:
+    """Карты всех психологов заново; возвращает число психологов с расписанием."""
+    total = 0
+    last_id = 0
+    while True:
+        ids = list(db.scalars(
+            select(Psychologist.id).where(Psychologist.id > last_id).order_by(Psychologist.id).limit(REBUILD_BATCH)
+        ))
+        if not ids:
+            break
+        rules_query, store = _queries(ids)
+        maps = _maps(ids, db.execute(rules_query).all())
+        db.execute(store, maps)
+        total += sum(1 for row in maps if row["new_availability"])
+        last_id = ids[-1]
+    db.commit()
+    return total
+
+async def available_page(
+    db: AsyncSession,
+    days: Sequence[int],
+    start: time,
+    end: time,
+    specialization_ids: Sequence[int] = (),
+    limit: int = 20,
+    cursor: str | None = None,
+) -> PsychologistPage:
+    """Психологи, чьё расписание покрывает окно в каждый из days и у кого есть все specialization_ids; по id."""
+    if np is None:
+        raise HTTPException(status_code=503, detail="Поиск по расписанию недоступен: не установлен numpy")
+    window = np.frombuffer(window_bits(days, start, end).ljust(WEEK_WORDS * 8, b"\0"), "<u8").astype(np.uint64)
+    await recommendations.refresh(db)
+    ids = recommendations.matrix.covering(window, specialization_ids)
+    if cursor:
+        last_id = cursor_id(decode_cursor(cursor, 1)[0])
+        ids = ids[np.searchsorted(ids, last_id, side="right"):]
+    page = [int(psychologist_id) for psychologist_id in ids[:limit + 1]]
+    if not page:
+        return PsychologistPage(items=[])
+    # удалённые после последнего обновления матрицы просто не найдутся
+    rows = (await db.execute(summary_query().where(Psychologist.id.in_(page[:limit])).order_by(Psychologist.id))).all()
+    return PsychologistPage(
+        items=[PsychologistSummary.model_validate(row._mapping) for row in rows],
+        next_cursor=encode_cursor(page[limit - 1]) if len(page) > limit else None,
+    )
+
+if __name__ == "__main__":
+    import app.main  # noqa: F401 — регистрирует все модели
+    from app.core.database import SessionLocal
+
+    if len(sys.argv) > 1:
+        sys.exit("использование: python -m app.services.weekly_availability")
+    with SessionLocal() as session:
+        print(f"Пересобрано карт доступности: {rebuild(session)}")
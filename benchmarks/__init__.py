@@ -0,0 +1,7 @@
+"""Бенчмарки и нагрузочные прогоны; запуск — python -m benchmarks.<модуль>.
+
+    datagen   — синтетические данные нужного объёма
+    load      — сценарии по всем роутерам, p50/p95/p99 и rps, результаты в JSON
+    compare   — сравнение двух прогонов load
+Остальные модули — точечные замеры отдельных оптимизаций.
+"""
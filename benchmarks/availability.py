@@ -0,0 +1,118 @@
+"""Кто свободен в окно недели (/psychologists/available) на --psychologists психологах (по умолчанию 50k).
+
+Данные — генератор benchmarks.datagen. Сравниваются: перебор всех правил Schedule
+со сравнением Time в Python (как без карт), пересечение битовых карт в матрице
+(без БД) и весь запрос через приложение. В конце — пересборка всех карт из расписания.
+
+    python -m benchmarks.availability
+    DB_ADMIN=postgresql://... python -m benchmarks.availability --psychologists 50000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import time as day_time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/availability.db")
+
+import httpx
+import numpy as np
+from sqlalchemy import func, select
+from app.main import app
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, engine
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.schedule import Schedule
+from app.services.recommendations import WEEK_WORDS, recommendations
+from app.services.weekly_availability import rebuild, window_bits
+from benchmarks.datagen import generate
+
+QUERIES = {
+    "вторник 18:00–20:00": {"days": [1], "from": "18:00", "to": "20:00"},
+    "вторник вечер + специализация": {"days": [1], "from": "18:00", "to": "20:00", "specialization_ids": [3]},
+    "суббота утро + 2 специализации": {"days": [5], "from": "09:00", "to": "11:30", "specialization_ids": [1, 2]},
+    "пн, ср, пт 10:00–13:00": {"days": [0, 2, 4], "from": "10:00", "to": "13:00"},
+}
+
+def _percentiles(timings: list[float]) -> tuple[float, float]:
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[-1]
+
+def _scan(rules: list, links: dict[int, set[int]], params: dict) -> list[int]:
+    """Перебор правил: психолог свободен, если в каждый из дней одно правило целиком накрывает окно."""
+    start, end = day_time.fromisoformat(params["from"]), day_time.fromisoformat(params["to"])
+    wanted = set(params.get("specialization_ids", ()))
+    covered: dict[int, set[int]] = {}
+    for psychologist_id, day_of_week, rule_start, rule_end in rules:
+        if day_of_week in params["days"] and rule_start <= start and (end <= rule_end or rule_end <= rule_start):
+            covered.setdefault(psychologist_id, set()).add(day_of_week)
+    return sorted(
+        psychologist_id for psychologist_id, days in covered.items()
+        if len(days) == len(params["days"]) and wanted <= links.get(psychologist_id, set())
+    )
+
+async def run(args) -> None:
+    async with AsyncSessionLocal() as db:
+        await recommendations.refresh(db)
+    matrix = recommendations.matrix
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        rules = db.execute(select(Schedule.psychologist_id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time)).all()
+        links: dict[int, set[int]] = {}
+        for psychologist_id, specialization_id in db.execute(select(psychologist_specializations)).all():
+            links.setdefault(psychologist_id, set()).add(specialization_id)
+        load_ms = (time.perf_counter() - started) * 1000
+    print(f"матрица: {matrix.size} психологов, сетки {matrix.grid[:matrix.size].nbytes / 2**20:.1f} МиБ; "
+          f"чтение {len(rules)} правил для перебора: {load_ms:.0f} мс")
+
+    print(f"{'запрос':<34}{'найдено':>9}{'перебор p50':>13}{'карты p50':>11}{'p95, мс':>9}{'HTTP p50':>10}{'p95, мс':>9}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, params in QUERIES.items():
+            specialization_ids = params.get("specialization_ids", ())
+            scan = []
+            for _ in range(max(1, args.repeat // 10)):
+                started = time.perf_counter()
+                expected = _scan(rules, links, params)
+                scan.append((time.perf_counter() - started) * 1000)
+            bitmap = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                window = np.frombuffer(window_bits(params["days"], day_time.fromisoformat(params["from"]),
+                                                   day_time.fromisoformat(params["to"])).ljust(WEEK_WORDS * 8, b"\0"), "<u8")
+                found = matrix.covering(window.astype(np.uint64), specialization_ids)
+                bitmap.append((time.perf_counter() - started) * 1000)
+            # правила в генераторе не пересекаются, поэтому перебор по одному правилу точен
+            assert found.tolist() == expected, name
+            http = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = await client.get("/psychologists/available", params=params)
+                http.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            (bitmap_p50, bitmap_p95), (http_p50, http_p95) = _percentiles(bitmap), _percentiles(http)
+            print(f"{name:<34}{len(found):>9}{statistics.median(scan):>13.1f}{bitmap_p50:>11.2f}{bitmap_p95:>9.2f}"
+                  f"{http_p50:>10.1f}{http_p95:>9.1f}")
+
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        rebuilt = rebuild(db)
+        print(f"пересборка карт из расписания: {rebuilt} психологов за {time.perf_counter() - started:.2f} c")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--psychologists", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Psychologist))
+    if existing < args.psychologists:
+        generate({"clients": 1_000, "psychologists": args.psychologists - existing, "reviews": 0,
+                  "messages": 0, "appointments": 0}, args.seed)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Конкурентное бронирование: N параллельных клиентов бьются за одни и те же слоты.
+
+Проверяет, что в итоге нет пересекающихся активных записей, и печатает пропускную способность.
+По умолчанию работает на временной SQLite; для Postgres задайте DB_ADMIN (база будет заполнена тестовыми данными):
+
+    python -m benchmarks.booking_concurrency --writers 50 --attempts 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, time as dt_time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/booking.db")
+
+import httpx
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
+from app.main import app
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import create_jwt_token
+from app.models.appointment import Appointment
+from app.models.psychologist import Psychologist
+from app.models.schedule import Schedule
+from app.models.user import User
+from app.schemas.enums import AppointmentStatus
+
+def seed(writers: int, psychologists: int) -> tuple[list[int], list[int]]:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        stamp = time.time_ns()
+        clients = [
+            User(email=f"client{stamp}-{i}@bench.local", password_hash="-", full_name=f"Client {i}", phone="0")
+            for i in range(writers)
+        ]
+        owners = [
+            User(email=f"psy{stamp}-{i}@bench.local", password_hash="-", full_name=f"Psychologist {i}", phone="0")
+            for i in range(psychologists)
+        ]
+        db.add_all(clients + owners)
+        db.flush()
+        profiles = [Psychologist(user_id=owner.id, experience=1) for owner in owners]
+        db.add_all(profiles)
+        db.flush()
+        # круглосуточное расписание на всю неделю, чтобы конфликтовали только записи между собой
+        db.add_all(
+            Schedule(psychologist_id=profile.id, day_of_week=day, start_time=dt_time(0), end_time=dt_time(0))
+            for profile in profiles for day in range(7)
+        )
+        db.commit()
+        return [client.id for client in clients], [profile.id for profile in profiles]
+
+async def writer(client: httpx.AsyncClient, token: str, psychologist_ids: list[int], slots: list[datetime], attempts: int, stats: dict):
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(attempts):
+        start = random.choice(slots)
+        # длительность 30 или 60 минут: часть попыток пересекается частично, а не только целиком
+        end = start + timedelta(minutes=random.choice((30, 60)))
+        response = await client.post("/appointments/", headers=headers, json={
+            "psychologist_id": random.choice(psychologist_ids),
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat(),
+            "price": "1000",
+        })
+        stats[response.status_code] = stats.get(response.status_code, 0) + 1
+
+def count_overlaps(psychologist_ids: list[int]) -> int:
+    other = aliased(Appointment)
+    with SessionLocal() as db:
+        return db.execute(
+            select(func.count())
+            .select_from(Appointment)
+            .join(other, (other.psychologist_id == Appointment.psychologist_id) & (other.id > Appointment.id))
+            .where(
+                Appointment.psychologist_id.in_(psychologist_ids),
+                Appointment.status != AppointmentStatus.canceled,
+                other.status != AppointmentStatus.canceled,
+                other.start_time < Appointment.end_time,
+                other.end_time > Appointment.start_time,
+            )
+        ).scalar_one()
+
+async def main(writers: int, attempts: int, psychologists: int, slot_count: int):
+    client_ids, psychologist_ids = seed(writers, psychologists)
+    first_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=7)
+    slots = [first_day + timedelta(minutes=30 * i) for i in range(slot_count)]
+
+    stats: dict[int, int] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            writer(client, create_jwt_token(client_id), psychologist_ids, slots, attempts, stats)
+            for client_id in client_ids
+        ])
+        elapsed = time.perf_counter() - started
+
+    total = sum(stats.values())
+    overlaps = count_overlaps(psychologist_ids)
+    print(f"писателей: {writers}, попыток: {total}, время: {elapsed:.2f} с")
+    print(f"ответы: {dict(sorted(stats.items()))}")
+    print(f"пропускная способность: {total / elapsed:.1f} запросов/с, {stats.get(200, 0) / elapsed:.1f} броней/с")
+    print(f"пересекающихся активных записей: {overlaps}")
+    if overlaps:
+        raise SystemExit("обнаружено двойное бронирование")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--attempts", type=int, default=20, help="попыток бронирования на писателя")
+    parser.add_argument("--psychologists", type=int, default=3)
+    parser.add_argument("--slots", type=int, default=40, help="число получасовых стартов, за которые идёт борьба")
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.attempts, args.psychologists, args.slots))
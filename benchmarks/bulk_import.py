@@ -0,0 +1,105 @@
+"""Импорт недельного расписания: POST /schedule/ по строке против потокового /import/schedule/stream.
+
+Построчный путь меряется на --single строках и пересчитывается на весь объём;
+потоковый импортирует --rows строк целиком (CSV и NDJSON) кусками по 64 КиБ.
+
+    python -m benchmarks.bulk_import --rows 100000
+    IMPORT_CHUNK_SIZE=5000 python -m benchmarks.bulk_import --formats csv
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/bulk_import.db")
+
+import httpx
+from sqlalchemy import func, insert, select
+from app.main import app
+from app.core.database import Base, engine, SessionLocal
+from app.models.psychologist import Psychologist
+from app.models.schedule import Schedule
+from app.models.user import User
+
+BODY_CHUNK = 64 * 1024
+
+def prepare(psychologists: int) -> list[int]:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        stamp = time.time_ns()
+        first = (db.scalar(select(func.max(User.id))) or 0) + 1
+        db.execute(insert(User), [
+            {"id": first + i, "email": f"bulk{stamp}-{i}@bench.example.com", "password_hash": "-", "full_name": f"Психолог {i}", "phone": "0"}
+            for i in range(psychologists)
+        ])
+        ids = list(db.scalars(
+            insert(Psychologist).returning(Psychologist.id),
+            [{"user_id": first + i, "experience": 1} for i in range(psychologists)],
+        ))
+        db.commit()
+    return ids
+
+def schedule_rows(psychologist_ids: list[int], count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        start = rng.randint(7, 14)
+        rows.append({
+            "psychologist_id": rng.choice(psychologist_ids), "day_of_week": rng.randrange(7),
+            "start_time": f"{start:02d}:00", "end_time": f"{start + rng.randint(4, 8):02d}:00",
+        })
+    return rows
+
+def as_csv(rows: list[dict]) -> bytes:
+    lines = ["psychologist_id,day_of_week,start_time,end_time"]
+    lines += [f"{row['psychologist_id']},{row['day_of_week']},{row['start_time']},{row['end_time']}" for row in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+def as_ndjson(rows: list[dict]) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+async def _body(data: bytes):
+    for offset in range(0, len(data), BODY_CHUNK):
+        yield data[offset:offset + BODY_CHUNK]
+
+async def run(args) -> None:
+    psychologist_ids = prepare(args.psychologists)
+    rows = schedule_rows(psychologist_ids, args.rows, args.seed)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        sample = rows[:args.single]
+        started = time.perf_counter()
+        for row in sample:
+            response = await client.post("/schedule/", json=row)
+            response.raise_for_status()
+        per_row = (time.perf_counter() - started) / len(sample)
+        print(f"POST /schedule/ по строке: {per_row * 1000:.2f} мс/строка, "
+              f"{len(rows)} строк ≈ {per_row * len(rows):.0f} c (по {len(sample)} строкам)")
+
+        formats = {"csv": ("text/csv", as_csv), "ndjson": ("application/x-ndjson", as_ndjson)}
+        for name in args.formats:
+            media_type, encode = formats[name]
+            data = encode(rows)
+            started = time.perf_counter()
+            response = await client.post("/import/schedule/stream", content=_body(data), headers={"content-type": media_type})
+            elapsed = time.perf_counter() - started
+            report = response.json()
+            print(f"/import/schedule/stream {name:<6} {len(data) / 2**20:6.1f} МиБ: {elapsed:6.2f} c, "
+                  f"{report['imported'] / elapsed:,.0f} строк/с, импортировано {report['imported']}, ошибок {report['failed']}")
+
+    with SessionLocal() as db:
+        print(f"строк расписания в БД: {db.scalar(select(func.count()).select_from(Schedule))}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--psychologists", type=int, default=10_000)
+    parser.add_argument("--single", type=int, default=500, help="строк для замера построчного POST")
+    parser.add_argument("--formats", nargs="+", choices=("csv", "ndjson"), default=["csv", "ndjson"])
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
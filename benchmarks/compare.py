@@ -0,0 +1,41 @@
+"""Сравнение двух прогонов benchmarks.load: изменение p50/p95/p99 и пропускной способности.
+
+    python -m benchmarks.compare benchmarks/results/abc1234-….json benchmarks/results/def5678-….json
+"""
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "     —"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+def compare(before: dict, after: dict) -> None:
+    print(f"{before['commit']} ({before['started_at']}) -> {after['commit']} ({after['started_at']})")
+    # чат и записи растут от пишущих сценариев, поэтому сверяем только базовые объёмы
+    base = ("users", "psychologists")
+    if [before["dataset"].get(key) for key in base] != [after["dataset"].get(key) for key in base]:
+        print(f"внимание: разные данные {before['dataset']} и {after['dataset']}")
+    print(f"{'сценарий':<26}{'конк.':>6}" + "".join(f"{metric:>24}" for metric in METRICS))
+    for name, levels in after["results"].items():
+        for concurrency, stats in levels.items():
+            old = before["results"].get(name, {}).get(concurrency)
+            if old is None:
+                continue
+            cells = "".join(
+                f"{old[metric]:>9.1f} → {stats[metric]:<7.1f}{_change(old[metric], stats[metric])}" for metric in METRICS
+            )
+            print(f"{name:<26}{concurrency:>6}{cells}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    args = parser.parse_args()
+    compare(json.loads(args.before.read_text()), json.loads(args.after.read_text()))
+
+if __name__ == "__main__":
+    main()
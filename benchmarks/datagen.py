@@ -0,0 +1,257 @@
+"""Генератор синтетических данных для нагрузочных прогонов: пакетные INSERT в SQLite или Postgres.
+
+Объёмы задаются профилем (--scale) и переопределяются по отдельности; при одном --seed
+данные одинаковые. Пароль всех сгенерированных пользователей — PASSWORD.
+
+    python -m benchmarks.datagen --scale small
+    DB_ADMIN=postgresql://... python -m benchmarks.datagen --scale full --seed 7
+    python -m benchmarks.datagen --scale medium --messages 0
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, time as day_time
+from decimal import Decimal
+from itertools import accumulate
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.gettempdir()}/specialist_bench.db")
+
+from sqlalchemy import bindparam, func, insert, select, update
+import app.main  # noqa: F401 — регистрирует все модели
+from app.core.database import Base, engine
+from app.core.security import hash_password
+from app.models.appointment import Appointment
+from app.models.chat import Chat
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.review import Review
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.schemas.enums import AppointmentStatus
+from app.services.ratings import decay_weight
+from app.services.weekly_availability import encode_week
+
+PASSWORD = "bench-password"
+CHUNK = 5000
+
+SCALES = {
+    "small": {"clients": 2_000, "psychologists": 500, "reviews": 20_000, "messages": 50_000, "appointments": 20_000},
+    "medium": {"clients": 20_000, "psychologists": 2_000, "reviews": 200_000, "messages": 1_000_000, "appointments": 100_000},
+    "full": {"clients": 100_000, "psychologists": 10_000, "reviews": 1_000_000, "messages": 5_000_000, "appointments": 500_000},
+}
+
+TOPICS = [
+    "Тревожность", "Депрессия", "Семейная терапия", "Отношения в паре", "Детская психология",
+    "Подростковый возраст", "Выгорание", "Самооценка", "Панические атаки", "Горе и утрата",
+    "Зависимости", "Расстройства пищевого поведения", "ПТСР", "Карьера", "Стресс",
+    "Сон", "Родительство", "Эмоциональный интеллект", "Кризис среднего возраста", "Мигранты и адаптация",
+]
+RATING_WEIGHTS = [4, 5, 11, 30, 50]  # доли оценок 1..5, %
+COMMENTS = ["Очень помогла", "Спокойно и по делу", "Не подошёл подход", "Рекомендую", None, "Стало легче уже после второй встречи"]
+
+def _chunks(rows, size: int = CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _bulk_insert(conn, table, rows, label: str) -> int:
+    started = time.perf_counter()
+    total = 0
+    for batch in _chunks(rows):
+        conn.execute(insert(table), batch)
+        total += len(batch)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {total:>10} строк за {elapsed:7.1f} c ({total / elapsed if elapsed else 0:,.0f} строк/с)")
+    return total
+
+def _next_id(conn, column) -> int:
+    return (conn.scalar(select(func.max(column))) or 0) + 1
+
+def generate(scale: dict, seed: int = 42) -> dict:
+    """Заполняет БД и возвращает сводку: сколько строк каждого вида и диапазоны id."""
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    Base.metadata.create_all(engine)
+    password_hash = hash_password(PASSWORD)
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+
+        first_user = _next_id(conn, User.id)
+        stamp = f"{seed}-{first_user}"
+        psychologist_users = list(range(first_user, first_user + scale["psychologists"]))
+        clients = list(range(first_user + scale["psychologists"], first_user + scale["psychologists"] + scale["clients"]))
+        _bulk_insert(conn, User.__table__, (
+            {
+                "id": user_id, "email": f"bench{stamp}-{user_id}@bench.example.com", "password_hash": password_hash,
+                "full_name": f"{'Психолог' if user_id < first_user + scale['psychologists'] else 'Клиент'} {user_id}",
+                "phone": f"+7{rng.randrange(10**9, 10**10)}", "created_at": now - timedelta(days=rng.randrange(730)),
+            }
+            for user_id in psychologist_users + clients
+        ), "users")
+
+        existing = set(conn.scalars(select(Specialization.name)))
+        missing = [name for name in TOPICS if name not in existing]
+        if missing:
+            conn.execute(insert(Specialization), [{"name": name, "description": f"Работа с темой «{name}»"} for name in missing])
+        specialization_ids = list(conn.scalars(select(Specialization.id).where(Specialization.name.in_(TOPICS))))
+
+        first_psychologist = _next_id(conn, Psychologist.id)
+        psychologists = list(range(first_psychologist, first_psychologist + scale["psychologists"]))
+        prices = {psychologist_id: Decimal(rng.randrange(1500, 9001, 500)) for psychologist_id in psychologists}
+        _bulk_insert(conn, Psychologist.__table__, (
+            {
+                "id": psychologist_id, "user_id": user_id, "experience": rng.randrange(41),
+                "bio": "Практикующий психолог. " * rng.randrange(1, 6), "price_per_hour": prices[psychologist_id],
+                "rating_sum": 0, "rating_count": 0, "rating": 0.0,
+            }
+            for psychologist_id, user_id in zip(psychologists, psychologist_users)
+        ), "psychologists")
+        _bulk_insert(conn, psychologist_specializations, (
+            {"psychologist_id": psychologist_id, "specialization_id": specialization_id}
+            for psychologist_id in psychologists
+            for specialization_id in rng.sample(specialization_ids, rng.randint(1, min(3, len(specialization_ids))))
+        ), "psychologist_specializations")
+
+        working_days = {}
+        schedule_rows = []
+        for psychologist_id in psychologists:
+            days = sorted(rng.sample(range(7), rng.randint(3, 6)))
+            start = rng.randint(8, 12)
+            end = min(start + rng.randint(6, 9), 23)
+            working_days[psychologist_id] = (days, start, end)
+            schedule_rows += [
+                {"psychologist_id": psychologist_id, "day_of_week": day, "start_time": day_time(start), "end_time": day_time(end)}
+                for day in days
+            ]
+        _bulk_insert(conn, Schedule.__table__, schedule_rows, "schedule")
+        if working_days:
+            # карты доступности — из тех же правил, без повторного чтения расписания
+            table = Psychologist.__table__
+            conn.execute(
+                update(table).where(table.c.id == bindparam("psychologist_id")).values(availability=bindparam("week")),
+                [
+                    {"psychologist_id": psychologist_id, "week": encode_week((day, day_time(start), day_time(end)) for day in days)}
+                    for psychologist_id, (days, start, end) in working_days.items()
+                ],
+            )
+
+        # популярность психологов неравномерна: немногие собирают большую часть отзывов и записей
+        popularity = list(accumulate(rng.paretovariate(1.2) for _ in psychologists))
+        rating_sum = dict.fromkeys(psychologists, 0)
+        rating_count = dict.fromkeys(psychologists, 0)
+        histogram = {psychologist_id: [0] * 5 for psychologist_id in psychologists}
+        decayed = {psychologist_id: [0.0, 0.0] for psychologist_id in psychologists}
+
+        def reviews():
+            for _ in range(scale["reviews"]):
+                psychologist_id = rng.choices(psychologists, cum_weights=popularity)[0]
+                rating = rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+                created_at = now - timedelta(minutes=rng.randrange(730 * 24 * 60))
+                weight = decay_weight(created_at)
+                rating_sum[psychologist_id] += rating
+                rating_count[psychologist_id] += 1
+                histogram[psychologist_id][rating - 1] += 1
+                decayed[psychologist_id][0] += weight
+                decayed[psychologist_id][1] += rating * weight
+                yield {
+                    "client_id": rng.choice(clients), "psychologist_id": psychologist_id, "rating": rating,
+                    "comment": rng.choice(COMMENTS), "created_at": created_at,
+                }
+        if psychologists and clients:
+            _bulk_insert(conn, Review.__table__, reviews(), "reviews")
+            # агрегат рейтинга считаем по ходу генерации, а не пересчётом по таблице отзывов
+            rated = [
+                {
+                    "psychologist_id": psychologist_id, "sum": rating_sum[psychologist_id], "count": count, "avg": rating_sum[psychologist_id] / count,
+                    **{f"count_{rating}": histogram[psychologist_id][rating - 1] for rating in range(1, 6)},
+                    "weight_sum": decayed[psychologist_id][0], "weighted_sum": decayed[psychologist_id][1],
+                }
+                for psychologist_id, count in rating_count.items() if count
+            ]
+            if rated:
+                table = Psychologist.__table__
+                conn.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("psychologist_id"))
+                    .values(
+                        rating_sum=bindparam("sum"), rating_count=bindparam("count"), rating=bindparam("avg"),
+                        **{f"rating_count_{rating}": bindparam(f"count_{rating}") for rating in range(1, 6)},
+                        decayed_weight_sum=bindparam("weight_sum"), decayed_rating_sum=bindparam("weighted_sum"),
+                    ),
+                    rated,
+                )
+
+            user_of = dict(zip(psychologists, psychologist_users))
+            dialogues = [(rng.choice(clients), user_of[rng.choices(psychologists, cum_weights=popularity)[0]])
+                         for _ in range(max(1, scale["messages"] // 25))]
+
+            def messages():
+                for _ in range(scale["messages"]):
+                    client_id, psychologist_user = rng.choice(dialogues)
+                    sender, receiver = (client_id, psychologist_user) if rng.random() < 0.55 else (psychologist_user, client_id)
+                    yield {
+                        "sender_id": sender, "receiver_id": receiver, "message": rng.choice(("Здравствуйте!", "Можно перенести встречу?", "Спасибо за сессию", "Подтверждаю время")),
+                        "sent_at": now - timedelta(seconds=rng.randrange(365 * 24 * 3600)),
+                    }
+            _bulk_insert(conn, Chat.__table__, messages(), "chat")
+
+            # записи идут подряд без пересечений, внутри рабочих часов психолога
+            next_free = {psychologist_id: now - timedelta(days=180) for psychologist_id in psychologists}
+
+            def appointments():
+                for _ in range(scale["appointments"]):
+                    psychologist_id = rng.choices(psychologists, cum_weights=popularity)[0]
+                    days, day_start, day_end = working_days[psychologist_id]
+                    start = next_free[psychologist_id] + timedelta(hours=rng.randint(1, 30))
+                    while start.weekday() not in days or not day_start <= start.hour < day_end:
+                        start += timedelta(hours=1)
+                    end = start + timedelta(hours=1)
+                    next_free[psychologist_id] = end
+                    if end <= now:
+                        status = AppointmentStatus.canceled if rng.random() < 0.1 else AppointmentStatus.confirmed
+                    else:
+                        status = rng.choice((AppointmentStatus.pending, AppointmentStatus.confirmed))
+                    yield {
+                        "client_id": rng.choice(clients), "psychologist_id": psychologist_id, "start_time": start,
+                        "end_time": end, "price": prices[psychologist_id], "status": status,
+                    }
+            _bulk_insert(conn, Appointment.__table__, appointments(), "appointments")
+
+        if engine.dialect.name == "postgresql":
+            # id пользователей и психологов заданы явно — сдвигаем последовательности, иначе приложение упрётся в дубликаты
+            for table in ("users", "psychologists"):
+                conn.exec_driver_sql(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+
+    return {
+        "seed": seed,
+        "scale": scale,
+        "users": [first_user, first_user + scale["psychologists"] + scale["clients"] - 1],
+        "psychologists": [first_psychologist, first_psychologist + scale["psychologists"] - 1],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"переопределить число {name}")
+    args = parser.parse_args()
+    scale = {name: getattr(args, name) if getattr(args, name) is not None else value for name, value in SCALES[args.scale].items()}
+
+    print(f"БД: {engine.url.render_as_string(hide_password=True)}, профиль {args.scale}, seed {args.seed}")
+    started = time.perf_counter()
+    summary = generate(scale, args.seed)
+    print(f"готово за {time.perf_counter() - started:.1f} c: пользователи {summary['users']}, психологи {summary['psychologists']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Пропускная способность БД-слоя: синхронные сессии в threadpool против AsyncSession.
+
+Синхронный путь повторяет прежнюю схему (sync-роут в threadpool FastAPI на 40 потоков),
+асинхронный — текущие роутеры. На каждую операцию — чтение профиля психолога и его отзывов.
+
+    python -m benchmarks.db_throughput --concurrency 10 100 500 --requests 2000
+    DB_ADMIN=postgresql://... python -m benchmarks.db_throughput
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/throughput.db")
+
+import anyio.to_thread
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+import app.main  # noqa: F401 — регистрирует все модели
+from app.core.database import Base, engine, SessionLocal, AsyncSessionLocal, DB_POOL_SIZE, DB_MAX_OVERFLOW
+from app.models.psychologist import Psychologist
+from app.models.review import Review
+from app.models.user import User
+
+def seed(psychologists: int, reviews_per_psychologist: int) -> list[int]:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        stamp = time.time_ns()
+        users = [User(email=f"tp{stamp}-{i}@bench.local", password_hash="-", full_name=f"P {i}", phone="0") for i in range(psychologists)]
+        db.add_all(users)
+        db.flush()
+        profiles = [Psychologist(user_id=user.id, experience=i % 30) for i, user in enumerate(users)]
+        db.add_all(profiles)
+        db.flush()
+        db.add_all(
+            Review(client_id=users[0].id, psychologist_id=profile.id, rating=1 + j % 5)
+            for profile in profiles for j in range(reviews_per_psychologist)
+        )
+        db.commit()
+        return [profile.id for profile in profiles]
+
+def sync_operation(psychologist_id: int) -> None:
+    with SessionLocal() as db:
+        db.get(Psychologist, psychologist_id)
+        db.scalars(select(Review).where(Review.psychologist_id == psychologist_id)).all()
+
+async def async_operation(psychologist_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.get(Psychologist, psychologist_id)
+        (await db.scalars(select(Review).where(Review.psychologist_id == psychologist_id))).all()
+
+async def run(mode: str, ids: list[int], concurrency: int, requests: int) -> float:
+    queue = iter(range(requests))
+
+    async def worker():
+        for i in queue:
+            psychologist_id = ids[i % len(ids)]
+            if mode == "sync":
+                await run_in_threadpool(sync_operation, psychologist_id)
+            else:
+                await async_operation(psychologist_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return requests / (time.perf_counter() - started)
+
+async def main(concurrency_levels: list[int], requests: int):
+    ids = seed(200, 10)
+    # как у FastAPI по умолчанию: sync-роуты делят 40 потоков
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 40
+    print(f"пул: {DB_POOL_SIZE} + {DB_MAX_OVERFLOW}, запросов на прогон: {requests}")
+    for concurrency in concurrency_levels:
+        sync_rps = await run("sync", ids, concurrency, requests)
+        async_rps = await run("async", ids, concurrency, requests)
+        print(f"конкурентность {concurrency:>4}: sync {sync_rps:8.1f} оп/с, async {async_rps:8.1f} оп/с")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests))
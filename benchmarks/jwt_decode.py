@@ -0,0 +1,24 @@
+"""Стоимость разбора JWT: полная проверка HS256 против попадания в кэш проверенных токенов.
+
+    python -m benchmarks.jwt_decode --number 20000
+"""
+import argparse
+import timeit
+from app.core.security import create_jwt_token, decode_jwt_claims, _verify_jwt, jwt_cache
+
+def main(number: int):
+    token = create_jwt_token(42)
+    decode_jwt_claims(token)  # прогрев кэша
+
+    uncached = min(timeit.repeat(lambda: _verify_jwt(token), number=number, repeat=5)) / number
+    cached = min(timeit.repeat(lambda: decode_jwt_claims(token), number=number, repeat=5)) / number
+
+    print(f"без кэша: {uncached * 1e6:8.2f} мкс/токен")
+    print(f"из кэша:  {cached * 1e6:8.2f} мкс/токен (x{uncached / cached:.1f})")
+    print(f"кэш: {jwt_cache.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.number)
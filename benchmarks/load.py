@@ -0,0 +1,141 @@
+"""Нагрузочный прогон сценариев: p50/p95/p99 и пропускная способность на нескольких уровнях конкурентности.
+
+Результаты пишутся в JSON (по умолчанию benchmarks/results/<коммит>-<время>.json), чтобы
+сравнивать прогоны между коммитами: python -m benchmarks.compare старый.json новый.json.
+По умолчанию приложение вызывается в процессе (ASGI), с --base-url — по сети.
+
+    python -m benchmarks.datagen --scale small
+    python -m benchmarks.load --concurrency 1 10 50 --duration 5
+    python -m benchmarks.load --scenarios chat.dialogue chat.send --concurrency 100
+    RESPONSE_CACHE_BACKEND=none python -m benchmarks.load --router psychologist specialization
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.gettempdir()}/specialist_bench.db")
+os.environ.setdefault("METRICS_ENABLED", "1")  # сценарий metrics.get
+
+import httpx
+from app.main import app
+from app.core.database import engine
+from benchmarks.scenarios import SCENARIOS, Scenario, load_context
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+def summarize(latencies: list[float], statuses: dict[int, int], errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
+
+async def run_level(client: httpx.AsyncClient, scenario: Scenario, ctx, concurrency: int, duration: float, seed: int) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    errors = 0
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def worker(worker_seed: int):
+        nonlocal errors
+        rng = random.Random(worker_seed)
+        while time.perf_counter() < deadline:
+            request_started = time.perf_counter()
+            try:
+                response = await scenario.call(client, ctx, rng)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - request_started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code not in scenario.ok:
+                errors += 1
+
+    await asyncio.gather(*(worker(seed * 10_000 + i) for i in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+def git_revision() -> tuple[str, bool]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+async def main_async(args) -> dict:
+    names = args.scenarios or [
+        name for name, scenario in SCENARIOS.items()
+        if (not args.router or scenario.router in args.router) and (args.heavy or not scenario.heavy)
+    ]
+    ctx = load_context()
+    transport = None if args.base_url else httpx.ASGITransport(app=app)
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "target": args.base_url or "asgi",
+        "python": platform.python_version(),
+        "dataset": ctx.counts,
+        "settings": {"concurrency": args.concurrency, "duration": args.duration, "seed": args.seed},
+        "results": {},
+    }
+    print(f"коммит {commit}{' (есть изменения)' if dirty else ''}, БД {engine.dialect.name}, данные {ctx.counts}")
+    async with httpx.AsyncClient(transport=transport, base_url=args.base_url or "http://bench", timeout=60) as client:
+        for name in names:
+            scenario = SCENARIOS[name]
+            await run_level(client, scenario, ctx, 1, args.warmup, args.seed)  # прогрев: пул, кэши, планы запросов
+            report["results"][name] = {}
+            for concurrency in args.concurrency:
+                stats = await run_level(client, scenario, ctx, concurrency, args.duration, args.seed)
+                report["results"][name][str(concurrency)] = stats
+                print(
+                    f"{name:<26} x{concurrency:<4} {stats['throughput_rps']:8.1f} rps  p50 {stats['p50_ms']:8.2f}  "
+                    f"p95 {stats['p95_ms']:8.2f}  p99 {stats['p99_ms']:8.2f} мс  ошибок {stats['errors']}  {stats['statuses']}"
+                )
+    return report
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, help="по умолчанию — все, кроме тяжёлых")
+    parser.add_argument("--router", nargs="+", help="только сценарии этих роутеров (user, chat, ...)")
+    parser.add_argument("--heavy", action="store_true", help="включить тяжёлые сценарии (логин через bcrypt)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд на уровень конкурентности")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", help="например http://127.0.0.1:8000; по умолчанию — приложение в процессе")
+    parser.add_argument("--out", type=Path, help="файл результатов JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    out = args.out or RESULTS_DIR / f"{report['commit']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"результаты: {out}")
+
+if __name__ == "__main__":
+    main()
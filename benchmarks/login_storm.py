@@ -0,0 +1,90 @@
+"""Шторм логинов: p50/p99 входа в зависимости от конкурентности и задержка дешёвого эндпоинта рядом.
+
+Во время каждого прогона параллельно опрашивается GET /psychologists/ — его задержка
+не должна расти вместе с очередью bcrypt. Ответы 503 — сработавшая защита от перегрузки.
+
+    python -m benchmarks.login_storm --concurrency 1 8 32 128 --duration 5
+    BCRYPT_ROUNDS=12 HASH_WORKERS=4 HASH_QUEUE_LIMIT=32 python -m benchmarks.login_storm
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/login.db")
+
+import httpx
+from app.main import app
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import hash_password, BCRYPT_ROUNDS, HASH_WORKERS, HASH_QUEUE_LIMIT
+from app.models.user import User
+
+PASSWORD = "benchmark-password"
+
+def seed(users: int) -> list[str]:
+    Base.metadata.create_all(engine)
+    password_hash = hash_password(PASSWORD)
+    stamp = time.time_ns()
+    emails = [f"login{stamp}-{i}@bench.example.com" for i in range(users)]
+    with SessionLocal() as db:
+        db.add_all(User(email=email, password_hash=password_hash, full_name="Bench", phone="0") for email in emails)
+        db.commit()
+    return emails
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+async def login_worker(client: httpx.AsyncClient, email: str, deadline: float, latencies: list[float], statuses: dict):
+    body = {"email": email, "full_name": "Bench", "phone": "0", "password": PASSWORD}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post("/users/login", json=body)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        elif response.status_code == 503:
+            await asyncio.sleep(0.05)
+
+async def probe_worker(client: httpx.AsyncClient, deadline: float, latencies: list[float]):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/psychologists/", params={"limit": 5})
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+async def main(concurrency_levels: list[int], duration: float):
+    emails = seed(max(concurrency_levels))
+    transport = httpx.ASGITransport(app=app)
+    print(f"BCRYPT_ROUNDS={BCRYPT_ROUNDS}, HASH_WORKERS={HASH_WORKERS}, HASH_QUEUE_LIMIT={HASH_QUEUE_LIMIT}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        baseline: list[float] = []
+        await probe_worker(client, time.perf_counter() + duration / 2, baseline)
+        print(f"без нагрузки: GET /psychologists/ p50 {percentile(baseline, 50) * 1000:.1f} мс, p99 {percentile(baseline, 99) * 1000:.1f} мс")
+
+        for concurrency in concurrency_levels:
+            logins: list[float] = []
+            probes: list[float] = []
+            statuses: dict[int, int] = {}
+            deadline = time.perf_counter() + duration
+            await asyncio.gather(
+                probe_worker(client, deadline, probes),
+                *[login_worker(client, emails[i], deadline, logins, statuses) for i in range(concurrency)],
+            )
+            print(
+                f"конкурентность {concurrency:>4}: логин p50 {percentile(logins, 50) * 1000:7.1f} мс, "
+                f"p99 {percentile(logins, 99) * 1000:7.1f} мс, {len(logins) / duration:6.1f} вход/с, ответы {statuses}; "
+                f"GET /psychologists/ p50 {percentile(probes, 50) * 1000:.1f} мс, p99 {percentile(probes, 99) * 1000:.1f} мс"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд на уровень конкурентности")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.duration))
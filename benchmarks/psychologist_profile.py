@@ -0,0 +1,125 @@
+"""Загрузка профиля психолога: прежний joinedload всех коллекций против selectin + последние N отзывов.
+
+Психолог с --reviews отзывами, --schedule строками расписания и --specializations
+специализациями. Для каждой стратегии — число запросов, строк из БД, размер JSON
+ответа и задержка загрузки с сериализацией (медиана и p95).
+
+    python -m benchmarks.psychologist_profile --reviews 5000 --schedule 20 --repeat 10
+    DB_ADMIN=postgresql://... python -m benchmarks.psychologist_profile
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import time as day_time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/profile.db")
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, joinedload
+import app.main  # noqa: F401 — регистрирует все модели
+from app.core.database import Base, engine, SessionLocal, AsyncSessionLocal
+from app.models.psychologist import Psychologist
+from app.models.review import Review
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.schemas.psychologist import PsychologistRead
+from app.services.psychologists import load_profile
+from app.services.ratings import recompute_ratings
+
+class RowCounter:
+    """Считает запросы и строки, которые ORM получил из БД (до дедупликации joinedload)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        event.listen(Session, "do_orm_execute", self._count)
+
+    def _count(self, state):
+        if not state.is_select:
+            return None
+        frozen = state.invoke_statement().freeze()
+        self.queries += 1
+        self.rows += len(frozen.data)
+        return frozen()
+
+    def reset(self) -> None:
+        self.queries = self.rows = 0
+
+def seed(reviews: int, schedule: int, specializations: int) -> int:
+    Base.metadata.create_all(engine)
+    stamp = time.time_ns()
+    with SessionLocal() as db:
+        owner = User(email=f"profile{stamp}@bench.example.com", password_hash="-", full_name="Bench", phone="0")
+        client = User(email=f"client{stamp}@bench.example.com", password_hash="-", full_name="Client", phone="0")
+        topics = [Specialization(name=f"Тема {stamp}-{i}", description="-") for i in range(specializations)]
+        db.add_all([owner, client, *topics])
+        db.flush()
+        psychologist = Psychologist(user_id=owner.id, experience=10, specializations=topics)
+        db.add(psychologist)
+        db.flush()
+        db.add_all(
+            Schedule(psychologist_id=psychologist.id, day_of_week=i % 7, start_time=day_time(8 + i // 7), end_time=day_time(9 + i // 7))
+            for i in range(schedule)
+        )
+        db.add_all(
+            Review(client_id=client.id, psychologist_id=psychologist.id, rating=1 + i % 5, comment="Отзыв " * 20)
+            for i in range(reviews)
+        )
+        db.commit()
+        recompute_ratings(db, [psychologist.id])
+        return psychologist.id
+
+async def legacy_profile(db, psychologist_id: int) -> Psychologist | None:
+    result = await db.execute(
+        select(Psychologist)
+        .options(
+            joinedload(Psychologist.user),
+            joinedload(Psychologist.specializations),
+            joinedload(Psychologist.schedule),
+            joinedload(Psychologist.reviews),
+        )
+        .where(Psychologist.id == psychologist_id)
+    )
+    return result.unique().scalar_one_or_none()
+
+STRATEGIES = {
+    "joinedload (было)": legacy_profile,
+    "selectin + последние N": load_profile,
+}
+
+async def measure(loader, psychologist_id: int, repeat: int, counter: RowCounter) -> tuple[int, int, int, float, float]:
+    timings = []
+    for _ in range(repeat):
+        counter.reset()
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            payload = PsychologistRead.model_validate(await loader(db, psychologist_id)).model_dump_json()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return counter.queries, counter.rows, len(payload), statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+async def main_async(args) -> None:
+    psychologist_id = seed(args.reviews, args.schedule, args.specializations)
+    counter = RowCounter()
+    print(f"отзывов {args.reviews}, расписание {args.schedule}, специализаций {args.specializations}")
+    for name, loader in STRATEGIES.items():
+        queries, rows, size, p50, p95 = await measure(loader, psychologist_id, args.repeat, counter)
+        print(
+            f"{name:<24} запросов {queries:>2}, строк {rows:>8}, ответ {size / 1024:8.1f} КиБ, "
+            f"p50 {p50 * 1000:8.2f} мс, p95 {p95 * 1000:8.2f} мс"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--schedule", type=int, default=20)
+    parser.add_argument("--specializations", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
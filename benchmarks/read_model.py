@@ -0,0 +1,93 @@
+"""Каталог из БД против модели чтения в памяти (CATALOG_READ_MODEL) на --psychologists психологах.
+
+Одни и те же запросы каталога, страниц специализаций и расписания выполняются
+через приложение дважды: с выгруженной моделью (чтение из БД) и с загруженной.
+В конце — сколько памяти занимает модель и сколько длится полная пересборка.
+
+    python -m benchmarks.read_model
+    DB_ADMIN=postgresql://... python -m benchmarks.read_model --psychologists 20000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/read_model.db")
+os.environ["CATALOG_READ_MODEL"] = "1"
+
+import httpx
+from sqlalchemy import func, select
+from app.main import app
+from app.core.database import Base, SessionLocal, engine
+from app.core.response_cache import response_cache
+from app.models.psychologist import Psychologist
+from app.services.catalog_cache import SCHEDULE
+from app.services.read_model import catalog
+from benchmarks.datagen import generate
+
+REQUESTS = {
+    "каталог, -rating": ("/psychologists/", {}),
+    "каталог, цена 2000–4000": ("/psychologists/", {"min_price": 2000, "max_price": 4000, "sort": "price"}),
+    "каталог, 3-я страница": ("/psychologists/", {"sort": "-price", "pages": 3}),
+    "специализация, рейтинг ≥ 4": ("/psychologists/", {"specialization_id": 3, "min_rating": 4}),
+    "/specializations/{id}/psychologists": ("/specializations/5/psychologists", {}),
+    "/schedule/{id}": ("/schedule/{psychologist_id}", {}),
+}
+
+async def _get(client: httpx.AsyncClient, path: str, params: dict, psychologist_id: int) -> None:
+    params = dict(params)
+    pages = params.pop("pages", 1)
+    cursor = None
+    for _ in range(pages):
+        response = await client.get(path.format(psychologist_id=psychologist_id), params={**params, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        cursor = response.json().get("next_cursor") if path.startswith("/psychologists") else None
+
+async def measure(client: httpx.AsyncClient, repeat: int, psychologist_ids: list[int]) -> dict[str, float]:
+    medians = {}
+    for name, (path, params) in REQUESTS.items():
+        timings = []
+        for attempt in range(repeat):
+            psychologist_id = psychologist_ids[attempt % len(psychologist_ids)]
+            await response_cache.invalidate(SCHEDULE, psychologist_id)  # меряем построение ответа, а не кэш
+            started = time.perf_counter()
+            await _get(client, path, params, psychologist_id)
+            timings.append((time.perf_counter() - started) * 1000)
+        medians[name] = statistics.median(timings)
+    return medians
+
+async def run(repeat: int) -> None:
+    with SessionLocal() as db:
+        psychologist_ids = list(db.scalars(select(Psychologist.id).order_by(Psychologist.id).limit(repeat)))
+    async with catalog.running(), httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        stats = catalog.stats()
+        snapshot, catalog.data = catalog.data, None
+        from_db = await measure(client, repeat, psychologist_ids)
+        catalog.data = snapshot
+        from_memory = await measure(client, repeat, psychologist_ids)
+
+        print(f"{'запрос (p50, мс)':<40}{'БД':>8}{'память':>9}{'ускорение':>11}")
+        for name in REQUESTS:
+            print(f"{name:<40}{from_db[name]:>8.2f}{from_memory[name]:>9.2f}{from_db[name] / from_memory[name]:>10.1f}x")
+        print(f"модель: {stats['psychologists']} психологов, {stats['schedule_rules']} правил расписания, "
+              f"≈{stats['memory_bytes'] / 2**20:.1f} МиБ, полная сборка {stats['last_resync_seconds']:.2f} c")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--psychologists", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Psychologist))
+    if existing < args.psychologists:
+        generate({"clients": 1_000, "psychologists": args.psychologists - existing, "reviews": 50_000,
+                  "messages": 0, "appointments": 0}, args.seed)
+    asyncio.run(run(args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Рекомендации /psychologists/recommendations на --psychologists психологах (по умолчанию 50k).
+
+Данные — генератор benchmarks.datagen (специализации, цены, недельное расписание,
+отзывы). Меряются: полная сборка матрицы признаков, ранжирование на матрице
+(без БД), весь запрос через приложение и точечное обновление после изменений.
+
+    python -m benchmarks.recommendations
+    DB_ADMIN=postgresql://... python -m benchmarks.recommendations --psychologists 50000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import time as day_time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/recommendations.db")
+
+import httpx
+from sqlalchemy import func, select
+from app.main import app
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, engine
+from app.models.psychologist import Psychologist
+from app.services.recommendations import RecommendationQuery, recommendations, window_mask
+from benchmarks.datagen import generate
+
+QUERIES = {
+    "без условий": {},
+    "1 специализация": {"specialization_ids": [1]},
+    "3 специализации + бюджет": {"specialization_ids": [1, 4, 7], "budget": 4000},
+    "бюджет + вечера будней": {"budget": 3000, "days": [0, 1, 2, 3, 4], "from": "18:00", "to": "22:00"},
+    "всё сразу": {"specialization_ids": [2, 5], "budget": 5000, "days": [5, 6], "from": "10:00", "to": "14:00"},
+}
+
+def _percentiles(timings: list[float]) -> tuple[float, float]:
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[-1]
+
+def _query(params: dict) -> RecommendationQuery:
+    return RecommendationQuery(
+        specialization_ids=tuple(params.get("specialization_ids", ())),
+        budget=params.get("budget"),
+        days=tuple(params.get("days", ())),
+        start=day_time.fromisoformat(params["from"]) if "from" in params else None,
+        end=day_time.fromisoformat(params["to"]) if "to" in params else None,
+    )
+
+async def run(args) -> None:
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await recommendations.refresh(db)
+        print(f"сборка матрицы: {recommendations.matrix.size} психологов за {time.perf_counter() - started:.2f} c, "
+              f"{recommendations.matrix.nbytes / 2**20:.1f} МиБ")
+
+    matrix = recommendations.matrix
+    print(f"{'запрос':<28}{'матрица p50':>13}{'p95, мс':>9}{'HTTP p50':>10}{'p95, мс':>9}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, params in QUERIES.items():
+            query = _query(params)
+            window = window_mask(query.days, query.start, query.end)
+            ranking = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                matrix.top(query, window, 20)
+                ranking.append((time.perf_counter() - started) * 1000)
+            http = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = await client.get("/psychologists/recommendations", params=params)
+                http.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            (ranking_p50, ranking_p95), (http_p50, http_p95) = _percentiles(ranking), _percentiles(http)
+            print(f"{name:<28}{ranking_p50:>13.1f}{ranking_p95:>9.1f}{http_p50:>10.1f}{http_p95:>9.1f}")
+
+    with SessionLocal() as db:
+        changed = list(db.scalars(select(Psychologist.id).order_by(Psychologist.id).limit(args.changed)))
+    recommendations.mark_dirty(changed)
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await recommendations.refresh(db)
+        print(f"обновление {len(changed)} изменённых психологов: {(time.perf_counter() - started) * 1000:.1f} мс")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--psychologists", type=int, default=50_000)
+    parser.add_argument("--reviews", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--changed", type=int, default=500, help="психологов в точечном обновлении")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Psychologist))
+    if existing < args.psychologists:
+        generate({"clients": 1_000, "psychologists": args.psychologists - existing, "reviews": args.reviews,
+                  "messages": 0, "appointments": 0}, args.seed)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
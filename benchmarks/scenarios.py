@@ -0,0 +1,193 @@
+"""Сценарии нагрузки по роутерам app/main.py: один вызов сценария — один HTTP-запрос.
+
+Идентификаторы берутся из уже заполненной БД (python -m benchmarks.datagen), выборкой
+до SAMPLE_SIZE штук каждого вида. Сценарий возвращает ответ; допустимые коды — в Scenario.ok.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+import httpx
+from sqlalchemy import func, select
+from app.core.database import SessionLocal
+from app.core.security import create_jwt_token
+from app.models.appointment import Appointment
+from app.models.chat import Chat
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.schedule import Schedule
+from app.models.user import User
+from benchmarks.datagen import PASSWORD
+
+SAMPLE_SIZE = 1000
+
+@dataclass
+class Context:
+    psychologists: list[int]
+    specializations: list[int]
+    clients: list[tuple[int, str]]  # (id, email)
+    dialogues: list[tuple[int, int]]
+    appointments: list[tuple[int, int]]  # (id, client_id)
+    working_hours: dict[int, list[tuple[int, int, int]]]  # psychologist_id -> [(день недели, с, до)]
+    counts: dict[str, int]
+    _tokens: dict[int, str] = field(default_factory=dict)
+
+    def auth(self, user_id: int) -> dict:
+        token = self._tokens.get(user_id)
+        if token is None:
+            token = self._tokens[user_id] = create_jwt_token(user_id)
+        return {"Authorization": f"Bearer {token}"}
+
+def _sample(db, query, size: int = SAMPLE_SIZE) -> list:
+    return list(db.execute(query.order_by(func.random()).limit(size)).all())
+
+def load_context() -> Context:
+    with SessionLocal() as db:
+        counts = {
+            model.__tablename__: db.scalar(select(func.count()).select_from(model))
+            for model in (User, Psychologist, Chat, Appointment)
+        }
+        if not counts["psychologists"]:
+            raise SystemExit("БД пуста: сначала python -m benchmarks.datagen")
+        psychologists = [row.id for row in _sample(db, select(Psychologist.id))]
+        working_hours: dict[int, list[tuple[int, int, int]]] = {}
+        for row in db.execute(
+            select(Schedule.psychologist_id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time)
+            .where(Schedule.psychologist_id.in_(psychologists))
+        ):
+            if row.end_time > row.start_time:
+                working_hours.setdefault(row.psychologist_id, []).append((row.day_of_week, row.start_time.hour, row.end_time.hour))
+        return Context(
+            psychologists=psychologists,
+            specializations=list(db.scalars(select(psychologist_specializations.c.specialization_id).distinct())),
+            clients=[tuple(row) for row in _sample(db, select(User.id, User.email).where(~User.psychologist.has()))],
+            dialogues=[tuple(row) for row in _sample(db, select(Chat.sender_id, Chat.receiver_id))],
+            appointments=[tuple(row) for row in _sample(db, select(Appointment.id, Appointment.client_id))],
+            working_hours=working_hours,
+            counts=counts,
+        )
+
+def _future_slot(rng: random.Random, hours: list[tuple[int, int, int]]) -> tuple[datetime, datetime]:
+    """Час внутри рабочего окна в ближайшие 60 дней — бронь пройдёт или упрётся в 409."""
+    day_of_week, start_hour, end_hour = rng.choice(hours)
+    day = datetime.utcnow().date() + timedelta(days=rng.randint(1, 60))
+    day += timedelta(days=(day_of_week - day.weekday()) % 7)
+    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.randrange(start_hour, end_hour))
+    return start, start + timedelta(hours=1)
+
+Call = Callable[[httpx.AsyncClient, Context, random.Random], Awaitable[httpx.Response]]
+
+@dataclass(frozen=True)
+class Scenario:
+    router: str
+    call: Call
+    ok: frozenset[int] = frozenset({200})
+    heavy: bool = False  # не входит в прогон по умолчанию
+
+async def _login(client, ctx, rng):
+    _, email = rng.choice(ctx.clients)
+    return await client.post("/users/login", json={"email": email, "full_name": "-", "phone": "-", "password": PASSWORD})
+
+async def _me(client, ctx, rng):
+    return await client.get("/users/me", headers=ctx.auth(rng.choice(ctx.clients)[0]))
+
+async def _catalog(client, ctx, rng):
+    params = {"sort": rng.choice(("-rating", "price", "-price")), "limit": 20}
+    if rng.random() < 0.5:
+        params["specialization_id"] = rng.choice(ctx.specializations)
+    return await client.get("/psychologists/", params=params)
+
+async def _profile(client, ctx, rng):
+    return await client.get(f"/psychologists/{rng.choice(ctx.psychologists)}")
+
+async def _slots(client, ctx, rng):
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return await client.get(
+        f"/psychologists/{rng.choice(ctx.psychologists)}/slots",
+        params={"from": start.isoformat(), "to": (start + timedelta(days=7)).isoformat(), "duration": 60},
+    )
+
+async def _specialization(client, ctx, rng):
+    return await client.get(f"/specializations/{rng.choice(ctx.specializations)}")
+
+async def _members(client, ctx, rng):
+    return await client.get(f"/specializations/{rng.choice(ctx.specializations)}/psychologists", params={"limit": 20})
+
+async def _schedule(client, ctx, rng):
+    return await client.get(f"/schedule/{rng.choice(ctx.psychologists)}")
+
+async def _reviews(client, ctx, rng):
+    return await client.get(f"/reviews/{rng.choice(ctx.psychologists)}")
+
+async def _review_create(client, ctx, rng):
+    return await client.post("/reviews/", json={
+        "client_id": rng.choice(ctx.clients)[0], "psychologist_id": rng.choice(ctx.psychologists),
+        "rating": rng.randint(1, 5), "comment": "Нагрузочный отзыв",
+    })
+
+async def _conversations(client, ctx, rng):
+    user_id, _ = rng.choice(ctx.dialogues)
+    return await client.get("/chat/conversations", headers=ctx.auth(user_id))
+
+async def _dialogue(client, ctx, rng):
+    user_id, peer_id = rng.choice(ctx.dialogues)
+    return await client.get(f"/chat/conversations/{peer_id}", headers=ctx.auth(user_id))
+
+async def _history(client, ctx, rng):
+    user_id, _ = rng.choice(ctx.dialogues)
+    return await client.get("/chat/", headers=ctx.auth(user_id))
+
+async def _send(client, ctx, rng):
+    user_id, peer_id = rng.choice(ctx.dialogues)
+    return await client.post("/chat/", json={"sender_id": user_id, "receiver_id": peer_id, "message": "Нагрузка"}, headers=ctx.auth(user_id))
+
+async def _book(client, ctx, rng):
+    psychologist_id = rng.choice([pid for pid in ctx.psychologists if pid in ctx.working_hours])
+    start, end = _future_slot(rng, ctx.working_hours[psychologist_id])
+    return await client.post(
+        "/appointments/",
+        json={"psychologist_id": psychologist_id, "start_time": start.isoformat(), "end_time": end.isoformat(), "price": "1000"},
+        headers=ctx.auth(rng.choice(ctx.clients)[0]),
+    )
+
+async def _appointment(client, ctx, rng):
+    appointment_id, client_id = rng.choice(ctx.appointments)
+    return await client.get(f"/appointments/{appointment_id}", headers=ctx.auth(client_id))
+
+async def _appointments(client, ctx, rng):
+    _, client_id = rng.choice(ctx.appointments)
+    return await client.get("/appointments/", params={"limit": 20}, headers=ctx.auth(client_id))
+
+async def _calendar(client, ctx, rng):
+    _, client_id = rng.choice(ctx.appointments)
+    start = datetime.utcnow().date() - timedelta(days=rng.randrange(180))
+    return await client.get(
+        "/appointments/calendar",
+        params={"from": start.isoformat(), "to": (start + timedelta(days=31)).isoformat()},
+        headers=ctx.auth(client_id),
+    )
+
+async def _metrics(client, ctx, rng):
+    return await client.get("/metrics/", headers=ctx.auth(rng.choice(ctx.clients)[0]))
+
+SCENARIOS: dict[str, Scenario] = {
+    "users.login": Scenario("user", _login, heavy=True),  # bcrypt: сотни мс на запрос
+    "users.me": Scenario("user", _me),
+    "psychologists.catalog": Scenario("psychologist", _catalog),
+    "psychologists.profile": Scenario("psychologist", _profile),
+    "psychologists.slots": Scenario("psychologist", _slots),
+    "specializations.get": Scenario("specialization", _specialization),
+    "specializations.members": Scenario("specialization", _members),
+    "schedule.get": Scenario("schedule", _schedule, ok=frozenset({200, 404})),
+    "reviews.list": Scenario("review", _reviews, ok=frozenset({200, 404})),
+    "reviews.create": Scenario("review", _review_create),
+    "chat.conversations": Scenario("chat", _conversations),
+    "chat.dialogue": Scenario("chat", _dialogue),
+    "chat.history": Scenario("chat", _history),
+    "chat.send": Scenario("chat", _send),
+    "appointments.create": Scenario("appointment", _book, ok=frozenset({200, 409})),
+    "appointments.get": Scenario("appointment", _appointment),
+    "appointments.list": Scenario("appointment", _appointments),
+    "appointments.calendar": Scenario("appointment", _calendar),
+    "metrics.get": Scenario("metrics", _metrics),
+}
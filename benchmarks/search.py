@@ -0,0 +1,107 @@
+"""Полнотекстовый поиск /psychologists/search на --psychologists психологах (по умолчанию 100k).
+
+Био собираются из словаря тем, поэтому запросы дают и редкие, и массовые совпадения.
+Индекс строится командой пересборки (app.services.search.rebuild), затем каждый
+запрос выполняется --repeat раз через приложение в процессе.
+
+    python -m benchmarks.search
+    DB_ADMIN=postgresql://... python -m benchmarks.search --psychologists 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/search.db")
+
+import httpx
+from sqlalchemy import func, insert, select
+from app.main import app
+from app.core.database import Base, engine, SessionLocal
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.services.search import rebuild
+from benchmarks.datagen import TOPICS, _bulk_insert
+
+PHRASES = [
+    "когнитивно-поведенческая терапия", "работаю с тревогой", "подростки и их родители", "панические атаки",
+    "семейные конфликты", "гештальт-терапия", "психоанализ", "выгорание на работе", "проблемы со сном",
+    "горе и утрата", "самооценка", "зависимости", "отношения в паре", "эмоциональный интеллект",
+    "схема-терапия", "EMDR", "арт-терапия", "кризисное консультирование", "детская психология", "ПТСР",
+]
+NAMES = ["Анна", "Борис", "Вера", "Глеб", "Дина", "Егор", "Жанна", "Захар", "Ирина", "Кирилл", "Лидия", "Максим"]
+QUERIES = [
+    "тревог",                        # массовое совпадение
+    "подростки кпт",
+    "когнитивно поведенческая терапия",
+    "EMDR птср",                     # редкое сочетание
+    "Ирина",
+    "выгорание сон",
+    "несуществующееслово",
+]
+
+def populate(psychologists: int, seed: int) -> None:
+    rng = random.Random(seed)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        if conn.scalar(select(func.count()).select_from(Psychologist)):
+            return
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.execute(insert(Specialization), [{"name": name, "description": f"Работа с темой «{name}»"} for name in TOPICS])
+        specialization_ids = list(conn.scalars(select(Specialization.id)))
+        _bulk_insert(conn, User.__table__, (
+            {"id": i, "email": f"s{i}@bench.example.com", "password_hash": "-", "full_name": f"{rng.choice(NAMES)} {i}", "phone": "0"}
+            for i in range(1, psychologists + 1)
+        ), "users")
+        _bulk_insert(conn, Psychologist.__table__, (
+            {"id": i, "user_id": i, "experience": rng.randrange(30), "bio": ". ".join(rng.sample(PHRASES, rng.randint(2, 5))).capitalize()}
+            for i in range(1, psychologists + 1)
+        ), "psychologists")
+        _bulk_insert(conn, psychologist_specializations, (
+            {"psychologist_id": i, "specialization_id": specialization_id}
+            for i in range(1, psychologists + 1)
+            for specialization_id in rng.sample(specialization_ids, rng.randint(1, 3))
+        ), "psychologist_specializations")
+
+async def measure(repeat: int) -> None:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        print(f"{'запрос':<36}{'найдено на стр.':>16}{'p50, мс':>10}{'p95, мс':>10}{'стр. 2, мс':>12}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = await client.get("/psychologists/search", params={"q": query, "limit": 20})
+                timings.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            page = response.json()
+            second = 0.0
+            if page["next_cursor"]:
+                started = time.perf_counter()
+                await client.get("/psychologists/search", params={"q": query, "limit": 20, "cursor": page["next_cursor"]})
+                second = (time.perf_counter() - started) * 1000
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            print(f"{query:<36}{len(page['items']):>16}{statistics.median(timings):>10.1f}{p95:>10.1f}{second:>12.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--psychologists", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"БД: {engine.url.render_as_string(hide_password=True)}")
+    populate(args.psychologists, args.seed)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        indexed = rebuild(db)
+    print(f"пересборка индекса: {indexed} документов за {time.perf_counter() - started:.1f} c")
+    asyncio.run(measure(args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Сериализация ответов по схемам app/schemas: прежний путь против однопроходного.
+
+Для каждой схемы из --items объектов замеряются:
+    model_validate + FastAPI — обработчик сам вызывает model_validate, FastAPI валидирует результат ещё раз;
+    jsonable_encoder + json  — путь FastAPI при своём response_class (dict -> json.dumps);
+    один проход              — FastAPI по response_model из ORM-объектов: validate + dump_json в Rust.
+Отдельно — чтение списка отзывов из БД ORM-объектами и колонками projection(...),
+и рендер ответа-словаря JSONResponse против FastJSONResponse.
+
+    python -m benchmarks.serialization --items 1000 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, time as day_time
+from decimal import Decimal
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/serialization.db")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+import app.main  # noqa: F401 — регистрирует все модели
+from app.core.database import Base, engine, SessionLocal
+from app.core.metrics import route_metrics
+from app.core.serialization import FastJSONResponse, projection
+from app.models.appointment import Appointment
+from app.models.chat import Chat
+from app.models.psychologist import Psychologist
+from app.models.review import Review
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.schemas.appointment import AppointmentRead
+from app.schemas.chat import ChatRead
+from app.schemas.enums import AppointmentStatus
+from app.schemas.psychologist import PsychologistRead, PsychologistSummary
+from app.schemas.review import ReviewRead
+from app.schemas.schedule import ScheduleRead
+from app.schemas.specialization import SpecializationShort
+from app.schemas.user import UserRead
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+def _user(i: int) -> User:
+    return User(id=i, email=f"user{i}@bench.example.com", password_hash="-", full_name=f"Пользователь {i}", phone="+70000000000", created_at=NOW)
+
+def _review(i: int) -> Review:
+    return Review(id=i, client_id=1, psychologist_id=1, rating=1 + i % 5, comment="Хороший специалист " * 5, created_at=NOW)
+
+def _schedule(i: int) -> Schedule:
+    return Schedule(id=i, psychologist_id=1, day_of_week=i % 7, start_time=day_time(9), end_time=day_time(18))
+
+def _psychologist(i: int) -> Psychologist:
+    return Psychologist(
+        id=i, user_id=i, experience=i % 30, bio="Био " * 30, price_per_hour=Decimal("2500.00"),
+        rating=4.5, rating_sum=45, rating_count=10, user=_user(i),
+        specializations=[Specialization(id=j, name=f"Тема {j}", description="-") for j in range(3)],
+        schedule=[_schedule(j) for j in range(5)],
+        reviews=[_review(j) for j in range(10)],
+    )
+
+# схема -> фабрика исходного объекта (как его отдаёт БД)
+SAMPLES = {
+    UserRead: _user,
+    ReviewRead: _review,
+    ScheduleRead: _schedule,
+    ChatRead: lambda i: Chat(id=i, sender_id=1, receiver_id=2, message="Здравствуйте! " * 5, sent_at=NOW),
+    AppointmentRead: lambda i: Appointment(
+        id=i, client_id=1, psychologist_id=1, start_time=NOW, end_time=NOW, price=Decimal("2500.00"), status=AppointmentStatus.pending
+    ),
+    SpecializationShort: lambda i: Specialization(id=i, name=f"Тема {i}", description="Описание " * 10),
+    PsychologistSummary: lambda i: {
+        "id": i, "full_name": f"Психолог {i}", "experience": 10, "price_per_hour": Decimal("2500.00"), "rating": 4.5, "review_count": 10,
+    },
+    PsychologistRead: _psychologist,
+}
+
+def timed(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def schema_suite(items: int, repeat: int) -> None:
+    print(f"сериализация списка из {items} объектов, медиана, мс")
+    print(f"{'схема':<22}{'model_validate+FastAPI':>24}{'jsonable_encoder+json':>24}{'один проход':>14}")
+    for schema, factory in SAMPLES.items():
+        objects = [factory(i) for i in range(1, items + 1)]
+        adapter = TypeAdapter(list[schema])
+
+        def validate_twice():
+            models = [schema.model_validate(obj, from_attributes=True) for obj in objects]
+            adapter.dump_json(adapter.validate_python(models, from_attributes=True))
+
+        def encoder():
+            models = [schema.model_validate(obj, from_attributes=True) for obj in objects]
+            json.dumps(jsonable_encoder(models), ensure_ascii=False)
+
+        def single_pass():
+            adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+        results = [timed(func, repeat) * 1000 for func in (validate_twice, encoder, single_pass)]
+        print(f"{schema.__name__:<22}" + "".join(f"{value:>24.2f}" for value in results[:2]) + f"{results[2]:>14.2f}")
+
+def projection_suite(items: int, repeat: int) -> None:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        stamp = time.time_ns()
+        user_id = db.scalar(insert(User).returning(User.id), {"email": f"s{stamp}@bench.example.com", "password_hash": "-", "full_name": "-", "phone": "0"})
+        psychologist_id = db.scalar(insert(Psychologist).returning(Psychologist.id), {"user_id": user_id, "experience": 1})
+        db.execute(insert(Review), [
+            {"client_id": user_id, "psychologist_id": psychologist_id, "rating": 5, "comment": "Хороший специалист " * 5, "created_at": NOW}
+            for _ in range(items)
+        ])
+        db.commit()
+
+    adapter = TypeAdapter(list[ReviewRead])
+
+    def orm_entities():
+        with SessionLocal() as db:
+            rows = db.scalars(select(Review).where(Review.psychologist_id == psychologist_id)).all()
+            adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def column_rows():
+        with SessionLocal() as db:
+            rows = db.execute(select(*projection(Review, ReviewRead)).where(Review.psychologist_id == psychologist_id)).all()
+            adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    print(f"\nGET /reviews/{{id}} из БД, {items} отзывов: "
+          f"ORM-объекты {timed(orm_entities, repeat) * 1000:.2f} мс, projection {timed(column_rows, repeat) * 1000:.2f} мс")
+
+def dict_suite(repeat: int) -> None:
+    for i in range(200):
+        route_metrics.add(f"GET /bench/{i}", type("Stats", (), {"query_count": 3, "db_time": 0.01, "pool_wait": 0.0, "slowest": []})(), 0.02)
+    content = jsonable_encoder(route_metrics.snapshot())
+    route_metrics.reset()
+    standard = timed(lambda: JSONResponse(content), repeat) * 1000
+    fast = timed(lambda: FastJSONResponse(content), repeat) * 1000
+    print(f"ответ-словарь (снимок /metrics на 200 маршрутов): JSONResponse {standard:.3f} мс, FastJSONResponse {fast:.3f} мс")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    schema_suite(args.items, args.repeat)
+    projection_suite(args.items, args.repeat)
+    dict_suite(args.repeat)
+
+if __name__ == "__main__":
+    main()
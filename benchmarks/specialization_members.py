@@ -0,0 +1,120 @@
+"""Ответ GET /specializations/{id} для специализации с тысячами психологов: размер и задержка.
+
+Сравниваются прежняя вложенность (полные профили со всеми отзывами), компактный ответ,
+?expand=psychologists, ?expand=psychologists.profile и страница /{id}/psychologists.
+Замеряется сборка ответа (запросы + сериализация) без кэша ответов.
+
+    python -m benchmarks.specialization_members --members 2000 --reviews 10 --schedule 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import time as day_time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/members.db")
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload, selectinload
+import app.main  # noqa: F401 — регистрирует все модели
+from app.api.specialization import _build_specialization
+from app.core.database import Base, engine, SessionLocal, AsyncSessionLocal
+from app.models.psychologist import Psychologist
+from app.models.psychologist_specialization import psychologist_specializations
+from app.models.review import Review
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import User
+from app.schemas.psychologist import PsychologistRead
+from app.schemas.specialization import SpecializationBase
+from app.services.psychologists import psychologist_page
+from app.services.ratings import recompute_ratings
+
+def seed(members: int, reviews: int, schedule: int) -> int:
+    Base.metadata.create_all(engine)
+    stamp = time.time_ns()
+    with SessionLocal() as db:
+        specialization = Specialization(name=f"Тема {stamp}", description="-")
+        db.add(specialization)
+        db.flush()
+        user_ids = db.scalars(insert(User).returning(User.id), [
+            {"email": f"member{stamp}-{i}@bench.example.com", "password_hash": "-", "full_name": f"Психолог {i}", "phone": "0"}
+            for i in range(members)
+        ]).all()
+        psychologist_ids = db.scalars(insert(Psychologist).returning(Psychologist.id), [
+            {"user_id": user_id, "experience": i % 30, "price_per_hour": 1000 + i % 50 * 100, "bio": "Био " * 30}
+            for i, user_id in enumerate(user_ids)
+        ]).all()
+        db.execute(insert(psychologist_specializations), [
+            {"psychologist_id": psychologist_id, "specialization_id": specialization.id} for psychologist_id in psychologist_ids
+        ])
+        db.execute(insert(Schedule), [
+            {"psychologist_id": psychologist_id, "day_of_week": day % 7, "start_time": day_time(9), "end_time": day_time(18)}
+            for psychologist_id in psychologist_ids for day in range(schedule)
+        ])
+        db.execute(insert(Review), [
+            {"client_id": user_ids[0], "psychologist_id": psychologist_id, "rating": 1 + j % 5, "comment": "Отзыв " * 20}
+            for psychologist_id in psychologist_ids for j in range(reviews)
+        ])
+        db.commit()
+        recompute_ratings(db)
+        return specialization.id
+
+class LegacySpecializationRead(SpecializationBase):
+    id: int
+    psychologists: list[PsychologistRead] = []
+
+    class Config:
+        from_attributes = True
+
+async def legacy(db, specialization_id: int) -> bytes:
+    """Как было: все психологи полными профилями, со всеми отзывами."""
+    specialization = await db.scalar(
+        select(Specialization)
+        .options(
+            selectinload(Specialization.psychologists).options(
+                joinedload(Psychologist.user),
+                selectinload(Psychologist.specializations),
+                selectinload(Psychologist.schedule),
+                selectinload(Psychologist.reviews),
+            )
+        )
+        .where(Specialization.id == specialization_id)
+    )
+    return LegacySpecializationRead.model_validate(specialization).model_dump_json().encode()
+
+async def page(db, specialization_id: int) -> bytes:
+    return (await psychologist_page(db, specialization_id=specialization_id, limit=20)).model_dump_json().encode()
+
+VARIANTS = {
+    "как было (все профили)": legacy,
+    "компактный": lambda db, sid: _build_specialization(db, sid, None),
+    "expand=psychologists": lambda db, sid: _build_specialization(db, sid, "psychologists"),
+    "expand=psychologists.profile": lambda db, sid: _build_specialization(db, sid, "psychologists.profile"),
+    "/{id}/psychologists, 20": page,
+}
+
+async def main_async(args) -> None:
+    specialization_id = seed(args.members, args.reviews, args.schedule)
+    print(f"участников {args.members}, отзывов на психолога {args.reviews}, строк расписания {args.schedule}")
+    for name, build in VARIANTS.items():
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                body = await build(db, specialization_id)
+            timings.append(time.perf_counter() - started)
+        print(f"{name:<30} ответ {len(body) / 1024:9.1f} КиБ, p50 {statistics.median(timings) * 1000:9.2f} мс, max {max(timings) * 1000:9.2f} мс")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--reviews", type=int, default=10)
+    parser.add_argument("--schedule", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Тысячи простаивающих WebSocket-соединений чата: память сервера на соединение и задержка доставки.
+
+Сервер (uvicorn) запускается отдельным процессом, его RSS читается из /proc (только Linux).
+После того как все соединения открыты, отправляется --messages сообщений случайным
+получателям и замеряется время от ответа POST /chat/ до прихода сообщения в сокет.
+
+    python -m benchmarks.ws_idle_connections --connections 1000 5000 --messages 200
+    python -m benchmarks.ws_idle_connections --uvicorn-args="--ws-per-message-deflate false"
+
+Основная часть памяти соединения — буферы транспорта, а не подписка в брокере: без
+permessage-deflate (zlib-состояние на каждое соединение) расход примерно вдвое ниже.
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/ws.db")
+
+import httpx
+import websockets
+import app.main  # noqa: F401 — регистрирует все модели
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import create_jwt_token
+from app.models.user import User
+
+HOST = "127.0.0.1"
+
+def seed(users: int) -> list[int]:
+    Base.metadata.create_all(engine)
+    stamp = time.time_ns()
+    with SessionLocal() as db:
+        rows = [User(email=f"ws{stamp}-{i}@bench.example.com", password_hash="-", full_name="Bench", phone="0") for i in range(users)]
+        db.add_all(rows)
+        db.commit()
+        return [row.id for row in rows]
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS не найден")
+
+def raise_fd_limit(needed: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+async def wait_ready(base_url: str) -> None:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                await client.get("/metrics/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("Сервер не поднялся")
+
+async def run(connections: int, messages: int, port: int, server_pid: int, user_ids: list[int]) -> None:
+    base_url = f"http://{HOST}:{port}"
+    idle_rss = rss_kib(server_pid)
+    receivers = user_ids[1:connections + 1]
+    sockets = {}
+    started = time.perf_counter()
+    for chunk_start in range(0, len(receivers), 200):
+        chunk = receivers[chunk_start:chunk_start + 200]
+        opened = await asyncio.gather(*(
+            websockets.connect(f"ws://{HOST}:{port}/chat/ws?token={create_jwt_token(user_id)}", max_queue=None)
+            for user_id in chunk
+        ))
+        sockets.update(zip(chunk, opened))
+    connect_time = time.perf_counter() - started
+    await asyncio.sleep(1)
+    loaded_rss = rss_kib(server_pid)
+
+    sender = user_ids[0]
+    latencies = []
+    async with httpx.AsyncClient(base_url=base_url, headers={"Authorization": f"Bearer {create_jwt_token(sender)}"}) as client:
+        for receiver in random.sample(receivers, min(messages, len(receivers))):
+            response = await client.post("/chat/", json={"sender_id": sender, "receiver_id": receiver, "message": "ping"})
+            response.raise_for_status()
+            sent = time.perf_counter()
+            await asyncio.wait_for(sockets[receiver].recv(), timeout=5)
+            latencies.append(time.perf_counter() - sent)
+
+    await asyncio.gather(*(ws.close() for ws in sockets.values()))
+    latencies.sort()
+    per_connection = (loaded_rss - idle_rss) * 1024 / connections
+    print(
+        f"соединений {connections:>6}: открыты за {connect_time:6.2f} c, "
+        f"RSS {idle_rss / 1024:7.1f} -> {loaded_rss / 1024:7.1f} МиБ, "
+        f"~{per_connection / 1024:5.1f} КиБ на соединение; "
+        f"доставка p50 {latencies[len(latencies) // 2] * 1000:6.2f} мс, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} мс"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--uvicorn-args", default="", help="дополнительные флаги uvicorn для сравнения настроек")
+    args = parser.parse_args()
+
+    raise_fd_limit(max(args.connections) * 2 + 256)  # лимит наследует и процесс сервера
+    user_ids = seed(max(args.connections) + 1)
+    for connections in args.connections:
+        # свежий сервер на каждый прогон, чтобы прошлые соединения не искажали RSS
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", HOST, "--port", str(args.port),
+             "--log-level", "warning", "--no-access-log", *shlex.split(args.uvicorn_args)],
+            env=os.environ.copy(),
+        )
+        try:
+            asyncio.run(wait_ready(f"http://{HOST}:{args.port}"))
+            asyncio.run(run(connections, args.messages, args.port, server.pid, user_ids))
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# БД задаётся до импорта приложения: движок создаётся при импорте app.core.database
+os.environ.setdefault("DB_ADMIN", f"sqlite:///{tempfile.mkdtemp()}/tests.db")
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.database import Base, engine
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(engine)
+    with TestClient(app) as test_client:
+        yield test_client
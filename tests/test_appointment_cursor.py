@@ -0,0 +1,39 @@
+import base64
+import json
+import pytest
+from datetime import datetime
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.core.security import create_jwt_token
+from app.models.user import User
+
+def raw_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+GARBAGE = [
+    raw_cursor("2024-01-01T00:00:00", 1e400),
+    raw_cursor("2024-01-01T00:00:00", True),
+    raw_cursor("2024-01-01T00:00:00", 1.7),
+    raw_cursor("2024-01-01T00:00:00", "1"),
+    raw_cursor("2024-01-01T00:00:00+03:00", 1),
+    raw_cursor("вчера", 1),
+    raw_cursor(1704067200, 1),
+    raw_cursor("2024-01-01T00:00:00"),
+]
+
+@pytest.fixture(scope="module")
+def auth(client):
+    with SessionLocal() as db:
+        user = User(email="cursor-appointments@example.com", password_hash="-", full_name="Курсор", phone="0")
+        db.add(user)
+        db.commit()
+        return {"Authorization": f"Bearer {create_jwt_token(user.id)}"}
+
+@pytest.mark.parametrize("cursor", GARBAGE)
+def test_appointments_reject_garbage_cursor(client, auth, cursor):
+    response = client.get("/appointments/", params={"cursor": cursor}, headers=auth)
+    assert response.status_code == 400
+
+def test_appointments_accept_own_cursor(client, auth):
+    response = client.get("/appointments/", params={"cursor": encode_cursor(datetime(2024, 1, 1), 1)}, headers=auth)
+    assert response.status_code == 200
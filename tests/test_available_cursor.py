@@ -0,0 +1,18 @@
+import base64
+import json
+import pytest
+from app.core.pagination import encode_cursor
+
+def raw_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+WINDOW = {"days": [1], "from": "18:00", "to": "20:00"}
+
+@pytest.mark.parametrize("cursor", [raw_cursor("abc"), raw_cursor(1.5), raw_cursor(None), raw_cursor(True), raw_cursor(1, 2)])
+def test_available_rejects_garbage_cursor(client, cursor):
+    response = client.get("/psychologists/available", params={**WINDOW, "cursor": cursor})
+    assert response.status_code == 400
+
+def test_available_accepts_valid_cursor(client):
+    response = client.get("/psychologists/available", params={**WINDOW, "cursor": encode_cursor(10)})
+    assert response.status_code == 200
@@ -0,0 +1,76 @@
+import base64
+import json
+import pytest
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.models.specialization import Specialization
+from app.services.read_model import catalog, CatalogData
+
+def raw_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+GARBAGE = [
+    raw_cursor("abc", 1),
+    raw_cursor({"a": 1}, 1),
+    raw_cursor([1], 1),
+    raw_cursor("NaN", 1),
+    raw_cursor(4.5, "1"),
+    raw_cursor(4.5, None),
+    raw_cursor(4.5, True),
+    raw_cursor(4.5),
+    "не base64",
+]
+
+@pytest.mark.parametrize("sort", ["-rating", "rating", "-price", "price"])
+@pytest.mark.parametrize("cursor", GARBAGE)
+def test_catalog_rejects_garbage_cursor(client, sort, cursor):
+    response = client.get("/psychologists/", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400
+
+@pytest.fixture(scope="module")
+def specialization_id(client):
+    with SessionLocal() as db:
+        specialization = Specialization(name="Курсоры", description="Для тестов пагинации")
+        db.add(specialization)
+        db.commit()
+        return specialization.id
+
+@pytest.mark.parametrize("cursor", GARBAGE)
+def test_specialization_members_reject_garbage_cursor(client, specialization_id, cursor):
+    response = client.get(f"/specializations/{specialization_id}/psychologists", params={"cursor": cursor})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("-rating", encode_cursor(4.5, 10)),
+    ("price", encode_cursor(None, 10)),
+    ("-price", raw_cursor("2500", 10)),
+])
+def test_catalog_accepts_valid_cursor(client, sort, cursor):
+    response = client.get("/psychologists/", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 200
+
+@pytest.fixture
+def read_model():
+    """Каталог из модели чтения вместо БД, как при CATALOG_READ_MODEL=1."""
+    catalog.data = CatalogData()
+    yield
+    catalog.data = None
+
+@pytest.mark.parametrize("sort", ["-rating", "price"])
+@pytest.mark.parametrize("cursor", GARBAGE)
+def test_read_model_rejects_garbage_cursor(client, read_model, sort, cursor):
+    response = client.get("/psychologists/", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("cursor", GARBAGE + [
+    raw_cursor(1.0, [1]),
+    raw_cursor(None, 1),
+    raw_cursor(1e400, 1),
+])
+def test_search_rejects_garbage_cursor(client, cursor):
+    response = client.get("/psychologists/search", params={"q": "тревога", "cursor": cursor})
+    assert response.status_code == 400
+
+def test_search_accepts_valid_cursor(client):
+    response = client.get("/psychologists/search", params={"q": "тревога", "cursor": encode_cursor(-1.5, 10)})
+    assert response.status_code == 200
@@ -0,0 +1,75 @@
+import base64
+import json
+import pytest
+from datetime import datetime
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.core.security import create_jwt_token
+from app.models.chat import Chat
+from app.models.user import User
+
+def raw_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+GARBAGE = [
+    raw_cursor("2024-01-01T00:00:00", 1e400),
+    raw_cursor("2024-01-01T00:00:00", True),
+    raw_cursor("2024-01-01T00:00:00", 1.7),
+    raw_cursor("2024-01-01T00:00:00", "1"),
+    raw_cursor("2024-01-01T00:00:00+03:00", 1),
+    raw_cursor("вчера", 1),
+    raw_cursor(None, 1),
+    raw_cursor("2024-01-01T00:00:00"),
+    "не base64",
+]
+
+# get_current_user не ходит в БД, пользователь из токена может и не существовать
+AUTH = {"Authorization": f"Bearer {create_jwt_token(7001)}"}
+
+@pytest.mark.parametrize("path", ["/chat/", "/chat/conversations", "/chat/conversations/7002"])
+@pytest.mark.parametrize("cursor", GARBAGE)
+def test_chat_rejects_garbage_cursor(client, path, cursor):
+    response = client.get(path, params={"cursor": cursor}, headers=AUTH)
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("path", ["/chat/conversations", "/chat/conversations/7002"])
+def test_chat_accepts_own_cursor(client, path):
+    response = client.get(path, params={"cursor": encode_cursor(datetime(2024, 1, 1), 1)}, headers=AUTH)
+    assert response.status_code == 200
+
+def test_history_pages_cover_all_messages_once(client):
+    with SessionLocal() as db:
+        me, peer, other = (
+            User(email=f"history-{name}@example.com", password_hash="-", full_name=name, phone="0")
+            for name in ("me", "peer", "other")
+        )
+        db.add_all([me, peer, other])
+        db.flush()
+        # одинаковое время у нескольких сообщений — порядок решает id; сообщение себе — один раз
+        pairs = [(me, peer), (peer, me), (me, me), (other, me), (peer, other), (me, other), (peer, me)]
+        messages = [
+            Chat(sender_id=sender.id, receiver_id=receiver.id, message=str(number), sent_at=datetime(2024, 1, 1 + number // 3))
+            for number, (sender, receiver) in enumerate(pairs)
+        ]
+        db.add_all(messages)
+        db.commit()
+        expected = sorted(
+            (message.id for message in messages if me.id in (message.sender_id, message.receiver_id)),
+            key=lambda message_id: (db.get(Chat, message_id).sent_at, message_id), reverse=True,
+        )
+        auth = {"Authorization": f"Bearer {create_jwt_token(me.id)}"}
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/chat/", params={"limit": 2, "cursor": cursor}, headers=auth)
+        assert response.status_code == 200
+        page = response.json()
+        seen += [message["id"] for message in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+def test_history_without_messages_is_404(client):
+    response = client.get("/chat/", headers={"Authorization": f"Bearer {create_jwt_token(7003)}"})
+    assert response.status_code == 404
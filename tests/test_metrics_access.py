@@ -0,0 +1,22 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import metrics
+from app.core.security import create_jwt_token
+
+def test_metrics_not_mounted_by_default(client):
+    assert client.get("/metrics/").status_code == 404
+    assert client.delete("/metrics/").status_code == 404
+
+@pytest.fixture(scope="module")
+def metrics_client():
+    app = FastAPI()
+    app.include_router(metrics.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.mark.parametrize("method", ["get", "delete"])
+def test_metrics_require_token(metrics_client, method):
+    assert getattr(metrics_client, method)("/metrics/").status_code in (401, 403)
+    headers = {"Authorization": f"Bearer {create_jwt_token(1)}"}
+    assert getattr(metrics_client, method)("/metrics/", headers=headers).status_code == 200
@@ -0,0 +1,49 @@
+import base64
+import json
+import pytest
+from datetime import datetime
+from app.core.pagination import encode_cursor
+
+def raw_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+BY_DATE = [
+    raw_cursor("2024-01-01T00:00:00", 1e400),
+    raw_cursor("2024-01-01T00:00:00", True),
+    raw_cursor("2024-01-01T00:00:00", 1.7),
+    raw_cursor("2024-01-01T00:00:00+03:00", 1),
+    raw_cursor("вчера", 1),
+    raw_cursor(5, "2024-01-01T00:00:00", 1),
+]
+
+BY_RATING = [
+    raw_cursor(1e400, "2024-01-01T00:00:00", 1),
+    raw_cursor(True, "2024-01-01T00:00:00", 1),
+    raw_cursor(4.5, "2024-01-01T00:00:00", 1),
+    raw_cursor("5", "2024-01-01T00:00:00", 1),
+    raw_cursor(5, "2024-01-01T00:00:00", 1e400),
+    raw_cursor(5, "2024-01-01T00:00:00", True),
+    raw_cursor(5, "2024-01-01T00:00:00", 1.7),
+    raw_cursor(5, None, 1),
+    raw_cursor("2024-01-01T00:00:00", 1),
+]
+
+@pytest.mark.parametrize("sort", ["-created_at", "created_at"])
+@pytest.mark.parametrize("cursor", BY_DATE)
+def test_reviews_by_date_reject_garbage_cursor(client, sort, cursor):
+    response = client.get("/reviews/1", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("sort", ["-rating", "rating"])
+@pytest.mark.parametrize("cursor", BY_RATING)
+def test_reviews_by_rating_reject_garbage_cursor(client, sort, cursor):
+    response = client.get("/reviews/1", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("-created_at", encode_cursor(datetime(2024, 1, 1), 1)),
+    ("-rating", encode_cursor(5, datetime(2024, 1, 1), 1)),
+])
+def test_reviews_accept_valid_cursor(client, sort, cursor):
+    response = client.get("/reviews/1", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 200
@@ -0,0 +1,14 @@
+import pytest
+from fastapi import HTTPException
+from app.core.security import create_jwt_token, decode_jwt_claims, revoke_user_tokens
+
+def test_token_issued_right_after_revocation_is_accepted():
+    old = create_jwt_token(42)
+    decode_jwt_claims(old)  # попадает в кэш проверенных токенов
+    revoke_user_tokens(42)
+    # тот же момент, что и смена пароля: повторный вход сразу после неё
+    fresh = create_jwt_token(42)
+    assert decode_jwt_claims(fresh)["sub"] == "42"
+    with pytest.raises(HTTPException) as revoked:
+        decode_jwt_claims(old)
+    assert revoked.value.detail == "Token revoked"